@@ -1,9 +1,17 @@
 from dependencies import container
 from engines import PostgresEngine
-from repositories import TasksRepository
+from repositories import (
+    IdempotencyKeysRepository,
+    OutboxRepository,
+    TaskResultsRepository,
+    TasksRepository,
+)
 
 
 def init_container() -> None:
     container.add_instance(PostgresEngine())
 
     container.add_scoped(TasksRepository)
+    container.add_scoped(OutboxRepository)
+    container.add_scoped(TaskResultsRepository)
+    container.add_scoped(IdempotencyKeysRepository)
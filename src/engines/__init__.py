@@ -1,5 +1,23 @@
+from .cache_storage import CacheEngine, idempotency_cache, tasks_cache
+from .metrics import MetricsRegistry, metrics
 from .postgres_storage import PostgresEngine
-from .rabbitmq_storage import ProducerEngine
-from .rabbitmq_storage import producer
+from .rabbitmq_storage import ProducerEngine, SubscriberEngine
+from .rabbitmq_storage import producer, subscriber
+from .tracing import SpanContext, Tracer, setup_tracing, tracer
 
-__all__ = ["PostgresEngine", "ProducerEngine", "producer"]
+__all__ = [
+    "CacheEngine",
+    "MetricsRegistry",
+    "PostgresEngine",
+    "ProducerEngine",
+    "SpanContext",
+    "SubscriberEngine",
+    "Tracer",
+    "idempotency_cache",
+    "metrics",
+    "producer",
+    "setup_tracing",
+    "subscriber",
+    "tasks_cache",
+    "tracer",
+]
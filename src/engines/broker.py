@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from aio_pika.abc import AbstractChannel
+
+
+class BrokerEngine(ABC):
+    @property
+    @abstractmethod
+    def channel_pool(self) -> Any: ...
+
+    @abstractmethod
+    async def get_channel(self) -> AbstractChannel: ...
+
+    @abstractmethod
+    async def close(self) -> None: ...
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Optional
+
+from settings import settings
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: Hashable) -> Any | None: ...
+
+    @abstractmethod
+    async def set(self, key: Hashable, value: Any, ttl: float | None) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: Hashable) -> None: ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+
+    async def get(self, key: Hashable) -> Any | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._items[key]
+            return None
+
+        self._items.move_to_end(key)
+        return value
+
+    async def set(self, key: Hashable, value: Any, ttl: float | None) -> None:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._items[key] = (value, expires_at)
+        self._items.move_to_end(key)
+
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    async def delete(self, key: Hashable) -> None:
+        self._items.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class CacheEngine:
+    def __init__(
+        self, local: CacheBackend, shared: Optional[CacheBackend] = None
+    ) -> None:
+        self.local = local
+        self.shared = shared
+        self._loads: dict[Hashable, asyncio.Task] = {}
+
+    async def get(self, key: Hashable) -> Any | None:
+        value = await self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(key)
+        return value
+
+    async def set(self, key: Hashable, value: Any, ttl: float | None) -> None:
+        await self.local.set(key, value, ttl)
+        if self.shared is not None:
+            await self.shared.set(key, value, ttl)
+
+    async def invalidate(self, key: Hashable) -> None:
+        self._loads.pop(key, None)
+        await self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any | None]],
+        ttl: Callable[[Any], float | None],
+    ) -> Any | None:
+        if (value := await self.get(key)) is not None:
+            return value
+
+        load = self._loads.get(key)
+        if load is None:
+            load = asyncio.create_task(self._load(key, loader, ttl))
+            self._loads[key] = load
+            load.add_done_callback(lambda _: self._forget_load(key, load))
+
+        return await asyncio.shield(load)
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any | None]],
+        ttl: Callable[[Any], float | None],
+    ) -> Any | None:
+        value = await loader()
+        if value is not None and self._loads.get(key) is asyncio.current_task():
+            await self.set(key, value, ttl(value))
+        return value
+
+    def _forget_load(self, key: Hashable, load: asyncio.Task) -> None:
+        if self._loads.get(key) is load:
+            del self._loads[key]
+
+
+tasks_cache = CacheEngine(local=MemoryCacheBackend(max_size=settings.TASKS_CACHE_SIZE))
+idempotency_cache = CacheEngine(
+    local=MemoryCacheBackend(max_size=settings.TASKS_IDEMPOTENCY_CACHE_SIZE)
+)
@@ -0,0 +1,495 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import sys
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+from uuid import uuid4
+
+from aio_pika.abc import ExchangeType as pika_exchange_type
+
+from engines.broker import BrokerEngine
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+
+class QueuedMessage:
+    __slots__ = (
+        "sequence",
+        "body",
+        "headers",
+        "priority",
+        "exchange",
+        "routing_key",
+        "redelivered",
+    )
+
+    def __init__(
+        self,
+        sequence: int,
+        body: bytes,
+        headers: dict,
+        priority: int,
+        exchange: str,
+        routing_key: str,
+    ) -> None:
+        self.sequence = sequence
+        self.body = body
+        self.headers = headers
+        self.priority = priority
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.redelivered = False
+
+
+class MemoryIncomingMessage:
+    def __init__(
+        self,
+        channel: "MemoryChannel",
+        delivery_tag: int,
+        message: QueuedMessage,
+        no_ack: bool,
+    ) -> None:
+        self.channel = channel
+        self.delivery_tag = delivery_tag
+        self.body = message.body
+        self.headers = message.headers
+        self.priority = message.priority
+        self.exchange = message.exchange
+        self.routing_key = message.routing_key
+        self.redelivered = message.redelivered
+        self.processed = no_ack
+
+    async def ack(self, multiple: bool = False) -> None:
+        self.processed = True
+        self.channel.ack(self.delivery_tag, multiple)
+
+    async def reject(self, requeue: bool = False) -> None:
+        self.processed = True
+        self.channel.reject(self.delivery_tag, requeue)
+
+    async def nack(self, multiple: bool = False, requeue: bool = True) -> None:
+        self.processed = True
+        self.channel.reject(self.delivery_tag, requeue, multiple)
+
+    @asynccontextmanager
+    async def process(
+        self,
+        requeue: bool = False,
+        reject_on_redelivered: bool = False,
+        ignore_processed: bool = False,
+    ) -> AsyncIterator["MemoryIncomingMessage"]:
+        try:
+            yield self
+        except BaseException:
+            if not ignore_processed or not self.processed:
+                await self.reject(
+                    requeue=requeue and not (reject_on_redelivered and self.redelivered)
+                )
+            raise
+
+        if not ignore_processed or not self.processed:
+            await self.ack()
+
+
+class MemoryConsumer:
+    def __init__(
+        self,
+        tag: str,
+        channel: "MemoryChannel",
+        queue: "MemoryQueue",
+        callback: Callable[[MemoryIncomingMessage], Awaitable[Any]],
+        no_ack: bool,
+    ) -> None:
+        self.tag = tag
+        self.channel = channel
+        self.queue = queue
+        self.callback = callback
+        self.no_ack = no_ack
+        self.unacked = 0
+
+    @property
+    def has_capacity(self) -> bool:
+        prefetch_count = self.channel.prefetch_count
+        if self.no_ack or not prefetch_count:
+            return True
+        if self.channel.global_qos:
+            return len(self.channel.unacked) < prefetch_count
+        return self.unacked < prefetch_count
+
+
+class MemoryQueue:
+    def __init__(
+        self,
+        name: str,
+        max_priority: int = 0,
+        exclusive_owner: Optional["MemoryChannel"] = None,
+        auto_delete: bool = False,
+    ) -> None:
+        self.name = name
+        self.max_priority = max_priority
+        self.exclusive_owner = exclusive_owner
+        self.auto_delete = auto_delete
+        self.messages: list[tuple[int, int, QueuedMessage]] = []
+        self.consumers: list[MemoryConsumer] = []
+        self._next_consumer = 0
+
+    def put(self, message: QueuedMessage) -> None:
+        priority = min(message.priority, self.max_priority) if self.max_priority else 0
+        heapq.heappush(self.messages, (-priority, message.sequence, message))
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        while self.messages and self.consumers:
+            consumer = self._pick_consumer()
+            if consumer is None:
+                return
+
+            _, _, message = heapq.heappop(self.messages)
+            consumer.channel.deliver(consumer, message)
+
+    def _pick_consumer(self) -> Optional[MemoryConsumer]:
+        for offset in range(len(self.consumers)):
+            index = (self._next_consumer + offset) % len(self.consumers)
+            consumer = self.consumers[index]
+            if consumer.has_capacity:
+                self._next_consumer = index + 1
+                return consumer
+        return None
+
+
+class MemoryExchange:
+    def __init__(
+        self, broker: "MemoryBrokerEngine", name: str, type: pika_exchange_type
+    ) -> None:
+        self.broker = broker
+        self.name = name
+        self.type = pika_exchange_type(type)
+        self.bindings: list[tuple[MemoryQueue, str]] = []
+
+    def bind(self, queue: MemoryQueue, routing_key: str) -> None:
+        if (queue, routing_key) not in self.bindings:
+            self.bindings.append((queue, routing_key))
+
+    def unbind(self, queue: MemoryQueue, routing_key: Optional[str] = None) -> None:
+        self.bindings = [
+            (bound, key)
+            for bound, key in self.bindings
+            if bound is not queue or (routing_key is not None and key != routing_key)
+        ]
+
+    async def publish(self, message: Any, routing_key: str, **kwargs: Any) -> None:
+        queues: dict[str, MemoryQueue] = {}
+        for queue, binding_key in self.bindings:
+            if self._matches(binding_key, routing_key):
+                queues[queue.name] = queue
+
+        for queue in queues.values():
+            queue.put(
+                QueuedMessage(
+                    sequence=next(self.broker.sequence),
+                    body=message.body,
+                    headers=dict(message.headers or {}),
+                    priority=message.priority or 0,
+                    exchange=self.name,
+                    routing_key=routing_key,
+                )
+            )
+
+    def _matches(self, binding_key: str, routing_key: str) -> bool:
+        if self.type == pika_exchange_type.FANOUT:
+            return True
+        if self.type == pika_exchange_type.TOPIC:
+            return self._topic_matches(binding_key.split("."), routing_key.split("."))
+        return binding_key == routing_key
+
+    @classmethod
+    def _topic_matches(cls, pattern: list[str], words: list[str]) -> bool:
+        if not pattern:
+            return not words
+        if pattern[0] == "#":
+            return cls._topic_matches(pattern[1:], words) or (
+                bool(words) and cls._topic_matches(pattern, words[1:])
+            )
+        if not words or pattern[0] not in ("*", words[0]):
+            return False
+        return cls._topic_matches(pattern[1:], words[1:])
+
+
+class MemoryBoundQueue:
+    def __init__(self, channel: "MemoryChannel", queue: MemoryQueue) -> None:
+        self.channel = channel
+        self.queue = queue
+
+    @property
+    def name(self) -> str:
+        return self.queue.name
+
+    async def bind(
+        self, exchange: MemoryExchange | str, routing_key: Optional[str] = None
+    ) -> None:
+        exchange = self.channel.broker.get_exchange(getattr(exchange, "name", exchange))
+        exchange.bind(
+            self.queue, self.queue.name if routing_key is None else routing_key
+        )
+
+    async def unbind(
+        self, exchange: MemoryExchange | str, routing_key: Optional[str] = None
+    ) -> None:
+        exchange = self.channel.broker.get_exchange(getattr(exchange, "name", exchange))
+        exchange.unbind(self.queue, routing_key)
+
+    async def consume(
+        self,
+        callback: Callable[[MemoryIncomingMessage], Awaitable[Any]],
+        no_ack: bool = False,
+        **kwargs: Any,
+    ) -> str:
+        return self.channel.consume(self.queue, callback, no_ack)
+
+    async def cancel(self, consumer_tag: str, **kwargs: Any) -> None:
+        self.channel.cancel(consumer_tag)
+
+
+class MemoryChannel:
+    def __init__(self, broker: "MemoryBrokerEngine", number: int) -> None:
+        self.broker = broker
+        self.number = number
+        self.is_closed = False
+        self.prefetch_count = 0
+        self.global_qos = False
+        self.consumers: dict[str, MemoryConsumer] = {}
+        self.unacked: dict[int, tuple[MemoryConsumer, QueuedMessage]] = {}
+        self._delivery_tags = itertools.count(1)
+        self._callbacks: set[asyncio.Task] = set()
+
+    async def declare_exchange(
+        self,
+        name: str,
+        type: pika_exchange_type = pika_exchange_type.DIRECT,
+        **kwargs: Any,
+    ) -> MemoryExchange:
+        return self.broker.declare_exchange(name, type)
+
+    async def get_exchange(self, name: str, ensure: bool = True) -> MemoryExchange:
+        return self.broker.get_exchange(name)
+
+    async def declare_queue(
+        self,
+        name: Optional[str] = None,
+        *,
+        exclusive: bool = False,
+        auto_delete: bool = False,
+        arguments: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> MemoryBoundQueue:
+        queue = self.broker.declare_queue(
+            name=name or f"amq.gen-{uuid4().hex}",
+            max_priority=(arguments or {}).get("x-max-priority") or 0,
+            exclusive_owner=self if exclusive else None,
+            auto_delete=auto_delete,
+        )
+        return MemoryBoundQueue(self, queue)
+
+    async def get_queue(self, name: str, ensure: bool = True) -> MemoryBoundQueue:
+        return MemoryBoundQueue(self, self.broker.get_queue(name))
+
+    async def set_qos(
+        self, prefetch_count: int = 0, global_: bool = False, **kwargs: Any
+    ) -> None:
+        self.prefetch_count = prefetch_count
+        self.global_qos = global_
+        self._dispatch_consumed()
+
+    def consume(
+        self,
+        queue: MemoryQueue,
+        callback: Callable[[MemoryIncomingMessage], Awaitable[Any]],
+        no_ack: bool,
+    ) -> str:
+        tag = f"ctag{self.number}.{uuid4().hex}"
+        consumer = MemoryConsumer(tag, self, queue, callback, no_ack)
+        self.consumers[tag] = consumer
+        queue.consumers.append(consumer)
+        queue.dispatch()
+        return tag
+
+    def cancel(self, consumer_tag: str) -> None:
+        consumer = self.consumers.pop(consumer_tag, None)
+        if consumer is None:
+            return
+
+        consumer.queue.consumers.remove(consumer)
+        if consumer.queue.auto_delete and not consumer.queue.consumers:
+            self.broker.delete_queue(consumer.queue)
+
+    def deliver(self, consumer: MemoryConsumer, message: QueuedMessage) -> None:
+        delivery_tag = next(self._delivery_tags)
+        if not consumer.no_ack:
+            self.unacked[delivery_tag] = (consumer, message)
+            consumer.unacked += 1
+
+        incoming = MemoryIncomingMessage(self, delivery_tag, message, consumer.no_ack)
+        task = asyncio.create_task(self._run_callback(consumer.callback, incoming))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    def ack(self, delivery_tag: int, multiple: bool = False) -> None:
+        for consumer, _ in self._settle(delivery_tag, multiple):
+            consumer.queue.dispatch()
+
+    def reject(self, delivery_tag: int, requeue: bool, multiple: bool = False) -> None:
+        for consumer, message in self._settle(delivery_tag, multiple):
+            if requeue:
+                message.redelivered = True
+                consumer.queue.put(message)
+            else:
+                consumer.queue.dispatch()
+
+    async def close(self, exc: Any = None) -> None:
+        if self.is_closed:
+            return
+
+        self.is_closed = True
+        for consumer_tag in list(self.consumers):
+            self.cancel(consumer_tag)
+
+        unacked, self.unacked = self.unacked, {}
+        for consumer, message in unacked.values():
+            consumer.unacked -= 1
+            message.redelivered = True
+            consumer.queue.put(message)
+
+        self.broker.release_channel(self)
+
+    def _settle(
+        self, delivery_tag: int, multiple: bool
+    ) -> list[tuple[MemoryConsumer, QueuedMessage]]:
+        if multiple:
+            delivery_tags = [tag for tag in self.unacked if tag <= delivery_tag]
+        elif delivery_tag in self.unacked:
+            delivery_tags = [delivery_tag]
+        else:
+            log.error(f"Неизвестный delivery_tag {delivery_tag} в канале {self.number}")
+            return []
+
+        settled = []
+        for tag in delivery_tags:
+            consumer, message = self.unacked.pop(tag)
+            consumer.unacked -= 1
+            settled.append((consumer, message))
+        return settled
+
+    def _dispatch_consumed(self) -> None:
+        for consumer in list(self.consumers.values()):
+            consumer.queue.dispatch()
+
+    @staticmethod
+    async def _run_callback(
+        callback: Callable[[MemoryIncomingMessage], Awaitable[Any]],
+        message: MemoryIncomingMessage,
+    ) -> None:
+        try:
+            await callback(message)
+        except Exception as e:
+            log.error(f"Ошибка обработки сообщения из очереди в памяти: {e}")
+
+
+class MemoryChannelPool:
+    def __init__(self, broker: "MemoryBrokerEngine") -> None:
+        self.broker = broker
+        self.free: list[MemoryChannel] = []
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[MemoryChannel]:
+        channel = None
+        while self.free and channel is None:
+            if not (candidate := self.free.pop()).is_closed:
+                channel = candidate
+        channel = channel or await self.broker.get_channel()
+
+        try:
+            yield channel
+        finally:
+            if not channel.is_closed:
+                self.free.append(channel)
+
+    async def close(self) -> None:
+        self.free.clear()
+
+
+class MemoryBrokerEngine(BrokerEngine):
+    def __init__(self) -> None:
+        self.exchanges: dict[str, MemoryExchange] = {}
+        self.queues: dict[str, MemoryQueue] = {}
+        self.channels: dict[int, MemoryChannel] = {}
+        self.sequence = itertools.count()
+        self._channel_numbers = itertools.count(1)
+        self._channel_pool: Optional[MemoryChannelPool] = None
+        self.declare_exchange("", pika_exchange_type.DIRECT)
+
+    @property
+    def channel_pool(self) -> MemoryChannelPool:
+        if self._channel_pool is None:
+            self._channel_pool = MemoryChannelPool(self)
+        return self._channel_pool
+
+    async def get_channel(self) -> MemoryChannel:
+        channel = MemoryChannel(self, next(self._channel_numbers))
+        self.channels[channel.number] = channel
+        return channel
+
+    def release_channel(self, channel: MemoryChannel) -> None:
+        self.channels.pop(channel.number, None)
+        for queue in list(self.queues.values()):
+            if queue.exclusive_owner is channel:
+                self.delete_queue(queue)
+
+    def declare_exchange(self, name: str, type: pika_exchange_type) -> MemoryExchange:
+        if (exchange := self.exchanges.get(name)) is None:
+            exchange = self.exchanges[name] = MemoryExchange(self, name, type)
+        return exchange
+
+    def get_exchange(self, name: str) -> MemoryExchange:
+        if (exchange := self.exchanges.get(name)) is None:
+            raise LookupError(f"Обменник '{name}' не объявлен")
+        return exchange
+
+    def declare_queue(
+        self,
+        name: str,
+        max_priority: int = 0,
+        exclusive_owner: Optional[MemoryChannel] = None,
+        auto_delete: bool = False,
+    ) -> MemoryQueue:
+        if (queue := self.queues.get(name)) is None:
+            queue = self.queues[name] = MemoryQueue(
+                name=name,
+                max_priority=max_priority,
+                exclusive_owner=exclusive_owner,
+                auto_delete=auto_delete,
+            )
+            self.exchanges[""].bind(queue, name)
+        return queue
+
+    def get_queue(self, name: str) -> MemoryQueue:
+        if (queue := self.queues.get(name)) is None:
+            raise LookupError(f"Очередь '{name}' не объявлена")
+        return queue
+
+    def delete_queue(self, queue: MemoryQueue) -> None:
+        self.queues.pop(queue.name, None)
+        for exchange in self.exchanges.values():
+            exchange.unbind(queue)
+
+    async def close(self) -> None:
+        for channel in list(self.channels.values()):
+            await channel.close()
+        if self._channel_pool is not None:
+            await self._channel_pool.close()
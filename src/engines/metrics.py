@@ -0,0 +1,254 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable
+from math import inf
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+STREAM_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 14400.0)
+EVENT_STREAM_CONTENT_TYPE = b"text/event-stream"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+class Metric(ABC):
+    type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+    @abstractmethod
+    def samples(self) -> list[str]: ...
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, label_values)} {value}"
+            for label_values, value in self.values.items()
+        ]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+        self.collect = collect
+
+    def set(self, value: float, *label_values: str) -> None:
+        self.values[label_values] = value
+
+    def samples(self) -> list[str]:
+        values = self.collect() if self.collect is not None else self.values
+        return [
+            f"{self.name}{_format_labels(self.labels, label_values)} {value}"
+            for label_values, value in values.items()
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: dict[tuple[str, ...], list[int]] = {}
+        self.sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        counts = self.counts.get(label_values)
+        if counts is None:
+            counts = self.counts[label_values] = [0] * (len(self.buckets) + 1)
+            self.sums[label_values] = 0.0
+
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[label_values] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        bucket_labels = (*self.labels, "le")
+        for label_values, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, inf), counts):
+                cumulative += count
+                le = "+Inf" if bound == inf else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(bucket_labels, (*label_values, le))} {cumulative}"
+                )
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {self.sums[label_values]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def counter(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labels, collect))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+
+        self.metrics[metric.name] = metric
+        return metric
+
+
+metrics = MetricsRegistry()
+
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    labels=("method", "route", "status"),
+)
+http_stream_duration = metrics.histogram(
+    "http_stream_duration_seconds",
+    "Время жизни потоковых HTTP-ответов (text/event-stream)",
+    labels=("method", "route", "status"),
+    buckets=STREAM_BUCKETS,
+)
+publish_duration = metrics.histogram(
+    "rabbitmq_publish_duration_seconds",
+    "Время публикации сообщений в RabbitMQ",
+    labels=("exchange",),
+)
+db_checkout_duration = metrics.histogram(
+    "db_pool_checkout_duration_seconds",
+    "Время ожидания соединения из пула SQLAlchemy",
+)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+        streaming = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                streaming = any(
+                    name.lower() == b"content-type"
+                    and value.startswith(EVENT_STREAM_CONTENT_TYPE)
+                    for name, value in message.get("headers", ())
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            # Длительность SSE-потока равна времени жизни подписки,
+            # поэтому она не смешивается с временем обработки запросов.
+            histogram = http_stream_duration if streaming else http_request_duration
+            histogram.observe(
+                time.perf_counter() - started_at,
+                scope["method"],
+                route.path if route else "unmatched",
+                str(status_code),
+            )
@@ -1,5 +1,9 @@
 import logging
 import sys
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Any
 
 from sqlalchemy.exc import (
@@ -9,12 +13,16 @@ from sqlalchemy.exc import (
     ProgrammingError,
 )
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncResult,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
+from engines.metrics import db_checkout_duration
+from engines.sqlite_storage import create_sqlite_engine
+from enums import DatabaseBackend
 from models.base import Base
 from settings import settings
 
@@ -23,17 +31,28 @@ stream_handler = logging.StreamHandler(sys.stderr)
 stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
 log.addHandler(stream_handler)
 
+current_session: ContextVar[AsyncSession | None] = ContextVar(
+    "current_session", default=None
+)
+
+
+def create_engine() -> AsyncEngine:
+    if settings.DATABASE_BACKEND == DatabaseBackend.SQLITE:
+        return create_sqlite_engine()
+
+    return create_async_engine(
+        url=settings.get_postgres_uri_asyncpg,
+        echo=False,
+        echo_pool=False,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_pre_ping=True,
+    )
+
 
 class PostgresEngine:
     def __init__(self) -> None:
-        self.engine = create_async_engine(
-            url=settings.get_postgres_uri_asyncpg,
-            echo=False,
-            echo_pool=False,
-            pool_size=settings.POSTGRES_POOL_SIZE,
-            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
-            pool_pre_ping=True,
-        )
+        self.engine = create_engine()
         self.async_session = async_sessionmaker(
             bind=self.engine,
             class_=AsyncSession,
@@ -42,18 +61,39 @@ class PostgresEngine:
             autoflush=False,
         )
 
+    @asynccontextmanager
+    async def transaction(
+        self, isolation_level: str | None = None
+    ) -> AsyncIterator[AsyncSession]:
+        if (session := current_session.get()) is not None:
+            yield session
+            return
+
+        if settings.DATABASE_BACKEND == DatabaseBackend.SQLITE:
+            isolation_level = None
+
+        async with self.async_session() as session:
+            async with session.begin():
+                await self._checkout(session, isolation_level)
+                token = current_session.set(session)
+                try:
+                    yield session
+                finally:
+                    current_session.reset(token)
+
     async def execute(
         self, stmt: Base, no_return: bool = False, return_many: bool = False
     ) -> Any:
+        if (session := current_session.get()) is not None:
+            cursor: AsyncResult = await self._execute_joined(session, stmt)
+            return self._fetch(cursor, no_return, return_many)
+
         try:
             async with self.async_session() as session:
+                await self._checkout(session)
                 cursor: AsyncResult = await session.execute(stmt)  # noqa
                 await session.commit()
-                if no_return:
-                    return None
-                if return_many:
-                    return cursor.scalars().all()
-                return cursor.scalar_one_or_none()
+                return self._fetch(cursor, no_return, return_many)
         except (
             IntegrityError,
             OperationalError,
@@ -65,8 +105,13 @@ class PostgresEngine:
             await session.close()
 
     async def select_one(self, stmt: Base) -> Any:
+        if (session := current_session.get()) is not None:
+            cursor: AsyncResult = await self._execute_joined(session, stmt)
+            return cursor.scalar_one_or_none()
+
         try:
             async with self.async_session() as session:
+                await self._checkout(session)
                 cursor: AsyncResult = await session.execute(stmt)  # noqa
                 return cursor.scalar_one_or_none()
         except (OperationalError, ProgrammingError, InterfaceError) as err:
@@ -75,8 +120,15 @@ class PostgresEngine:
             await session.close()
 
     async def select(self, stmt: Base, no_scalars: bool = False) -> Any:
+        if (session := current_session.get()) is not None:
+            cursor: AsyncResult = await self._execute_joined(session, stmt)
+            if no_scalars:
+                return cursor.all() or None
+            return cursor.scalars().all() or None
+
         try:
             async with self.async_session() as session:
+                await self._checkout(session)
                 cursor: AsyncResult = await session.execute(stmt)  # noqa
                 if no_scalars:
                     return cursor.all() or None
@@ -85,3 +137,41 @@ class PostgresEngine:
             log.error(f"{err.orig}")
         finally:
             await session.close()
+
+    async def create_schema(self) -> None:
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    @staticmethod
+    async def _checkout(
+        session: AsyncSession, isolation_level: str | None = None
+    ) -> None:
+        started_at = time.perf_counter()
+        if isolation_level:
+            await session.connection(
+                execution_options={"isolation_level": isolation_level}
+            )
+        else:
+            await session.connection()
+        db_checkout_duration.observe(time.perf_counter() - started_at)
+
+    @staticmethod
+    async def _execute_joined(session: AsyncSession, stmt: Base) -> AsyncResult:
+        try:
+            return await session.execute(stmt)  # noqa
+        except (
+            IntegrityError,
+            OperationalError,
+            ProgrammingError,
+            InterfaceError,
+        ) as err:
+            log.error(f"{err.orig}")
+            raise
+
+    @staticmethod
+    def _fetch(cursor: AsyncResult, no_return: bool, return_many: bool) -> Any:
+        if no_return:
+            return None
+        if return_many:
+            return cursor.scalars().all()
+        return cursor.scalar_one_or_none()
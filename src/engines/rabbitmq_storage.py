@@ -1,14 +1,33 @@
+import asyncio
 import json
+import logging
+import sys
+import time
+from collections.abc import Awaitable, Callable
 from typing import Optional
 
-from aio_pika import connect_robust, Message
-from aio_pika.abc import AbstractChannel, AbstractRobustConnection
+from aio_pika import connect_robust, DeliveryMode, Message
+from aio_pika.abc import (
+    AbstractChannel,
+    AbstractIncomingMessage,
+    AbstractRobustConnection,
+    ExchangeType as pika_exchange_type,
+)
 from aio_pika.pool import Pool
 
+from engines.broker import BrokerEngine
+from engines.memory_broker import MemoryBrokerEngine
+from engines.metrics import publish_duration
+from enums import BrokerBackend
 from settings import settings
 
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
 
-class RabbitMQEngine:
+
+class RabbitMQEngine(BrokerEngine):
     def __init__(self, amqp_url: str) -> None:
         self.amqp_url = amqp_url
         self._connection_pool: Optional[Pool] = None
@@ -40,23 +59,111 @@ class RabbitMQEngine:
             await self._connection_pool.close()
 
 
-rabbit_manager = RabbitMQEngine(settings.get_rabbitmq_uri)
+def create_broker() -> BrokerEngine:
+    if settings.BROKER_BACKEND == BrokerBackend.MEMORY:
+        return MemoryBrokerEngine()
+    return RabbitMQEngine(settings.get_rabbitmq_uri)
+
+
+broker_manager = create_broker()
 
 
 class ProducerEngine:
     def __init__(self) -> None:
-        self.connector = rabbit_manager
+        self.connector = broker_manager
+
+    async def setup_exchange(
+        self,
+        exchange_name: str,
+        exchange_type: pika_exchange_type,
+        durable: bool = True,
+    ) -> None:
+        async with self.connector.channel_pool.acquire() as channel:
+            await channel.declare_exchange(
+                exchange_name, exchange_type, durable=durable
+            )
 
     async def publish(
-        self, exchange: str, routing_key: str, priority: int, body: dict
+        self,
+        exchange: str,
+        routing_key: str,
+        priority: int,
+        body: dict,
+        headers: Optional[dict] = None,
     ) -> None:
         body_bytes = json.dumps(body).encode("utf-8")
 
+        started_at = time.perf_counter()
         async with self.connector.channel_pool.acquire() as channel:
             exchange_obj = await channel.get_exchange(exchange, ensure=True)
             await exchange_obj.publish(
-                Message(body=body_bytes, priority=priority), routing_key=routing_key
+                Message(body=body_bytes, priority=priority, headers=headers),
+                routing_key=routing_key,
+            )
+        publish_duration.observe(time.perf_counter() - started_at, exchange)
+
+    async def publish_batch(self, messages: list[dict]) -> None:
+        started_at = time.perf_counter()
+        exchange_names = sorted({message["exchange"] for message in messages})
+        async with self.connector.channel_pool.acquire() as channel:
+            exchanges = {
+                name: await channel.get_exchange(name, ensure=True)
+                for name in exchange_names
+            }
+            await asyncio.gather(
+                *(
+                    exchanges[message["exchange"]].publish(
+                        Message(
+                            body=json.dumps(message["body"]).encode("utf-8"),
+                            priority=message["priority"],
+                            headers=message.get("headers"),
+                            delivery_mode=DeliveryMode.PERSISTENT,
+                        ),
+                        routing_key=message["routing_key"],
+                    )
+                    for message in messages
+                )
             )
+        publish_duration.observe(
+            time.perf_counter() - started_at, ",".join(exchange_names)
+        )
 
 
 producer = ProducerEngine()
+
+
+class SubscriberEngine:
+    def __init__(self) -> None:
+        self.connector = broker_manager
+        self.channels: list[AbstractChannel] = []
+
+    async def subscribe(
+        self, exchange_name: str, callback: Callable[[dict], Awaitable[None]]
+    ) -> None:
+        async def message_handler(message: AbstractIncomingMessage) -> None:
+            try:
+                await callback(json.loads(message.body.decode()))
+            except json.JSONDecodeError as e:
+                log.error(
+                    f"Ошибка декодирования JSON: {e}, body: {message.body.decode()}"
+                )
+            except Exception as e:
+                log.error(f"Ошибка обработки события: {e}")
+
+        channel = await self.connector.get_channel()
+        exchange = await channel.declare_exchange(
+            exchange_name, pika_exchange_type.FANOUT, durable=True
+        )
+        queue = await channel.declare_queue(exclusive=True)
+        await queue.bind(exchange)
+        await queue.consume(message_handler, no_ack=True)
+
+        self.channels.append(channel)
+
+    async def close(self) -> None:
+        for channel in self.channels:
+            await channel.close()
+        self.channels.clear()
+
+
+subscriber = SubscriberEngine()
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+class SpanContext:
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True) -> None:
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def child(self) -> "SpanContext":
+        return SpanContext(self.trace_id, os.urandom(8).hex(), self.sampled)
+
+    def to_headers(self) -> dict[str, str]:
+        flags = "01" if self.sampled else "00"
+        return {TRACEPARENT_HEADER: f"00-{self.trace_id}-{self.span_id}-{flags}"}
+
+    @classmethod
+    def from_headers(
+        cls, headers: Optional[Mapping[str, Any]]
+    ) -> Optional["SpanContext"]:
+        if not headers or not (traceparent := headers.get(TRACEPARENT_HEADER)):
+            return None
+
+        if isinstance(traceparent, bytes):
+            traceparent = traceparent.decode()
+
+        parts = traceparent.split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+
+        return cls(trace_id=parts[1], span_id=parts[2], sampled=parts[3] == "01")
+
+
+current_span_context: ContextVar[Optional[SpanContext]] = ContextVar(
+    "current_span_context", default=None
+)
+
+
+class Span:
+    __slots__ = ("name", "context", "parent_id", "start_time", "end_time", "attributes")
+
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_id: Optional[str] = None,
+        start_time: Optional[float] = None,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.start_time = start_time or time.time()
+        self.end_time: Optional[float] = None
+        self.attributes = attributes or {}
+
+    @classmethod
+    def from_parent(cls, name: str, parent: SpanContext, **attributes: Any) -> "Span":
+        return cls(
+            name=name,
+            context=parent.child(),
+            parent_id=parent.span_id,
+            attributes=attributes,
+        )
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, end_time: Optional[float] = None) -> "Span":
+        if self.end_time is None:
+            self.end_time = end_time or time.time()
+        return self
+
+    def to_dict(self) -> dict[str, Any]:
+        end_time = self.end_time or time.time()
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "end_time": end_time,
+            "duration_ms": round((end_time - self.start_time) * 1000, 3),
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, spans: list[dict[str, Any]]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+SPAN_EXPORTERS = {
+    "jsonl": lambda: JsonLinesSpanExporter(settings.TRACING_JSONL_PATH),
+}
+
+
+class Tracer:
+    def __init__(self, sample_rate: float, buffer_size: int) -> None:
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self.exporter: Optional[SpanExporter] = None
+        self.buffer: list[dict[str, Any]] = []
+        self.exports: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def set_exporter(self, exporter: Optional[SpanExporter]) -> None:
+        self._close_exporter()
+        self.exporter = exporter
+
+    def start_trace(self, name: str, **attributes: Any) -> Optional[Span]:
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+
+        context = SpanContext(os.urandom(16).hex(), os.urandom(8).hex())
+        return Span(name=name, context=context, attributes=attributes)
+
+    def start_span(
+        self, name: str, parent: Optional[SpanContext] = None, **attributes: Any
+    ) -> Optional[Span]:
+        parent = parent or current_span_context.get()
+        if not self.enabled or parent is None or not parent.sampled:
+            return None
+
+        return Span.from_parent(name, parent, **attributes)
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        with self._activate(self.start_trace(name, **attributes)) as span:
+            yield span
+
+    @contextmanager
+    def span(
+        self, name: str, parent: Optional[SpanContext] = None, **attributes: Any
+    ) -> Iterator[Optional[Span]]:
+        with self._activate(self.start_span(name, parent, **attributes)) as span:
+            yield span
+
+    def end_span(self, span: Optional[Span], **attributes: Any) -> None:
+        if span is None:
+            return
+
+        span.attributes.update(attributes)
+        self.record(span.end().to_dict())
+
+    def record(self, span: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+
+        self.buffer.append(span)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buffer or self.exporter is None:
+            return
+
+        spans, self.buffer = self.buffer, []
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._export(self.exporter, spans)
+            return
+
+        export = loop.create_task(asyncio.to_thread(self._export, self.exporter, spans))
+        self.exports.add(export)
+        export.add_done_callback(self.exports.discard)
+
+    async def close(self) -> None:
+        if self.exports:
+            _, pending = await asyncio.wait(
+                self.exports, timeout=settings.TRACING_CLOSE_TIMEOUT
+            )
+            if pending:
+                log.warning(f"Не завершен экспорт {len(pending)} пакетов спанов")
+
+        self._close_exporter()
+
+    def _close_exporter(self) -> None:
+        if self.exporter is None:
+            return
+
+        if self.buffer:
+            spans, self.buffer = self.buffer, []
+            self._export(self.exporter, spans)
+        self.exporter.close()
+
+    @staticmethod
+    def _export(exporter: SpanExporter, spans: list[dict[str, Any]]) -> None:
+        try:
+            exporter.export(spans)
+        except Exception as e:
+            log.error(f"Ошибка экспорта спанов трассировки: {e}")
+
+    @contextmanager
+    def _activate(self, span: Optional[Span]) -> Iterator[Optional[Span]]:
+        if span is None:
+            yield None
+            return
+
+        token = current_span_context.set(span.context)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_attribute("error", repr(e))
+            raise
+        finally:
+            current_span_context.reset(token)
+            self.end_span(span)
+
+
+tracer = Tracer(
+    sample_rate=settings.TRACING_SAMPLE_RATE, buffer_size=settings.TRACING_BUFFER_SIZE
+)
+
+
+def setup_tracing() -> None:
+    if factory := SPAN_EXPORTERS.get(settings.TRACING_EXPORTER):
+        tracer.set_exporter(factory())
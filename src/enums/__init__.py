@@ -1,5 +1,18 @@
-from .tasks import PriorityType, StatusType, Priority
+from .tasks import PriorityType, StatusType, Priority, TaskField, TERMINAL_STATUSES
 from .producer import ExchangeType, RoutingType
+from .pagination import CountType
+from .backends import BrokerBackend, DatabaseBackend
 
 
-__all__ = ("PriorityType", "StatusType", "Priority", "ExchangeType", "RoutingType")
+__all__ = (
+    "PriorityType",
+    "StatusType",
+    "Priority",
+    "TaskField",
+    "ExchangeType",
+    "RoutingType",
+    "CountType",
+    "BrokerBackend",
+    "DatabaseBackend",
+    "TERMINAL_STATUSES",
+)
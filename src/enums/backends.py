@@ -0,0 +1,11 @@
+from enum import StrEnum
+
+
+class BrokerBackend(StrEnum):
+    RABBITMQ = "rabbitmq"
+    MEMORY = "memory"
+
+
+class DatabaseBackend(StrEnum):
+    POSTGRES = "postgres"
+    SQLITE = "sqlite"
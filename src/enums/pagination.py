@@ -0,0 +1,7 @@
+from enum import StrEnum
+
+
+class CountType(StrEnum):
+    EXACT = "EXACT"
+    ESTIMATE = "ESTIMATE"
+    NONE = "NONE"
@@ -3,8 +3,20 @@ from enum import StrEnum
 
 class ExchangeType(StrEnum):
     TASKS = "tasks"
+    TASK_EVENTS = "task_events"
+    TASK_CANCELS = "task_cancels"
 
 
 class RoutingType(StrEnum):
     TASK = "task"
     TASK_CANCELED = "task_canceled"
+
+    @staticmethod
+    def get_task_routing_key(priority_type: str) -> str:
+        return f"{RoutingType.TASK}.{priority_type.lower()}"
+
+    @staticmethod
+    def is_task_routing_key(routing_key: str) -> bool:
+        return routing_key == RoutingType.TASK or routing_key.startswith(
+            f"{RoutingType.TASK}."
+        )
@@ -23,9 +23,41 @@ class Priority(IntEnum):
 
 
 class StatusType(StrEnum):
+    SCHEDULED = "SCHEDULED"
     NEW = "NEW"
     PENDING = "PENDING"
     IN_PROGRESS = "IN_PROGRESS"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
     CANCELLED = "CANCELLED"
+
+
+TERMINAL_STATUSES = frozenset(
+    {StatusType.COMPLETED, StatusType.FAILED, StatusType.CANCELLED}
+)
+
+
+class TaskField(StrEnum):
+    ID = "id"
+    NAME = "name"
+    DESCRIPTION = "description"
+    PRIORITY = "priority"
+    STATUS = "status"
+    CREATED_AT = "created_at"
+    SCHEDULED_AT = "scheduled_at"
+    STARED_AT = "stared_at"
+    COMPLETED_AT = "completed_at"
+    RESULT = "result"
+    RESULT_REF = "result_ref"
+    RESULT_SIZE = "result_size"
+    ERROR_INFO = "error_info"
+
+    @classmethod
+    def parse(cls, value: str) -> list["TaskField"]:
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        if unknown := [name for name in names if name not in cls._value2member_map_]:
+            raise ValueError(f"Неизвестные поля задачи: {', '.join(unknown)}")
+        if not names:
+            raise ValueError("Не указано ни одного поля задачи")
+
+        return list(dict.fromkeys(cls(name) for name in names))
@@ -0,0 +1,90 @@
+import asyncio
+import importlib
+import sys
+from concurrent import futures
+from multiprocessing import get_context
+from pathlib import Path
+from types import SimpleNamespace
+
+import uvicorn
+
+from engines.rabbitmq_storage import broker_manager
+from main import app
+from settings import settings
+
+WORKERS_ROOT = Path(__file__).resolve().parent.parent / "workers"
+WORKER_PACKAGES = {
+    path.stem for path in WORKERS_ROOT.iterdir() if not path.name.startswith("_")
+}
+
+
+def _is_worker_module(name: str) -> bool:
+    return name.split(".")[0] in WORKER_PACKAGES
+
+
+def import_worker_tree() -> SimpleNamespace:
+    shadowed = {
+        name: module for name, module in sys.modules.items() if _is_worker_module(name)
+    }
+    for name in shadowed:
+        del sys.modules[name]
+
+    sys.path.insert(0, str(WORKERS_ROOT))
+    try:
+        worker = SimpleNamespace(
+            main=importlib.import_module("main"),
+            consumer=importlib.import_module("services.consumer"),
+            handlers=importlib.import_module("services.handlers"),
+            rabbitmq=importlib.import_module("engines.rabbitmq_storage"),
+            enums=importlib.import_module("enums"),
+            settings=importlib.import_module("settings").settings,
+        )
+    finally:
+        sys.path.remove(str(WORKERS_ROOT))
+        for name in [name for name in sys.modules if _is_worker_module(name)]:
+            del sys.modules[name]
+        sys.modules.update(shadowed)
+
+    worker.rabbitmq.consumer.connector = broker_manager
+    worker.rabbitmq.producer.connector = broker_manager
+    return worker
+
+
+def enter_worker_tree() -> None:
+    for name in [name for name in sys.modules if _is_worker_module(name)]:
+        del sys.modules[name]
+    sys.path.insert(0, str(WORKERS_ROOT))
+
+
+def create_task_consumer(worker: SimpleNamespace):
+    task_consumer = worker.consumer.TaskConsumer(
+        queue_name=worker.enums.ExchangeType.TASKS,
+        max_workers=worker.settings.WORKERS,
+    )
+    task_consumer.executor.shutdown(wait=False)
+    task_consumer.executor = futures.ProcessPoolExecutor(
+        max_workers=task_consumer.max_workers,
+        mp_context=get_context("spawn"),
+        initializer=enter_worker_tree,
+    )
+    return task_consumer
+
+
+async def serve() -> None:
+    worker = import_worker_tree()
+    worker_app = worker.main.WorkerApplication(create_task_consumer(worker))
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app=app,
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
+            log_level=settings.LOG_LEVEL,
+        )
+    )
+
+    async with worker_app.lifespan():
+        await server.serve()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -1,21 +1,54 @@
 from contextlib import asynccontextmanager
 
 import uvicorn
+from aio_pika.abc import ExchangeType as pika_exchange_type
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
+from dependencies import container
 from depends import init_container
-from routers import router
+from engines import PostgresEngine, producer, setup_tracing, tracer
+from engines.metrics import RequestMetricsMiddleware
+from enums import DatabaseBackend, ExchangeType
+from routers import metrics_router, router
+from services import (
+    idempotency_keys_cleaner,
+    outbox_relay,
+    task_events_listener,
+    task_partition_manager,
+    task_scheduler,
+)
 from settings import settings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # noqa
     init_container()
+    if settings.DATABASE_BACKEND == DatabaseBackend.SQLITE:
+        await container.resolve(PostgresEngine).create_schema()
+    else:
+        await task_partition_manager.start()
+    setup_tracing()
+    await producer.setup_exchange(
+        exchange_name=ExchangeType.TASK_CANCELS,
+        exchange_type=pika_exchange_type.FANOUT,
+        durable=False,
+    )
+    await outbox_relay.start()
+    await task_scheduler.start()
+    await task_events_listener.start()
+    await idempotency_keys_cleaner.start()
 
     yield
 
+    await idempotency_keys_cleaner.stop()
+    await task_events_listener.stop()
+    await task_scheduler.stop()
+    await outbox_relay.stop()
+    await task_partition_manager.stop()
+    await tracer.close()
+
 
 app = FastAPI(
     title=settings.TITLE,
@@ -34,7 +67,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(RequestMetricsMiddleware)
+
+
 app.include_router(router)
+app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,6 @@
+import os
+import re
+import sys
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -5,19 +8,31 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from src.models import TasksDB
-from src.models.base import Base
-from src.settings import settings
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base  # noqa: E402
+from settings import settings  # noqa: E402
 
 config = context.config
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-config.set_main_option("sqlalchemy.url", settings.get_postgres_alembic_uri_asyncpg + "?async_fallback=True")
+config.set_main_option(
+    "sqlalchemy.url", settings.get_postgres_alembic_uri_asyncpg + "?async_fallback=True"
+)
 
 target_metadata = Base.metadata
 
+PARTITION_NAME = re.compile(r"^tasks_p\d{8}$")
+EXCLUDED_TABLES = {"tasks_legacy"}
+
+
+def include_name(name, type_, parent_names) -> bool:
+    if type_ == "table":
+        return name not in EXCLUDED_TABLES and not PARTITION_NAME.match(name)
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -26,6 +41,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -41,7 +57,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,76 @@
+"""create outbox
+
+Revision ID: 3f7a1c9e2b58
+Revises: 5d2a9c4e7f13
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f7a1c9e2b58"
+down_revision: Union[str, Sequence[str], None] = "5d2a9c4e7f13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "outbox",
+        sa.Column(
+            "id",
+            sa.BigInteger(),
+            autoincrement=True,
+            nullable=False,
+            comment="Уникальный идентификатор",
+        ),
+        sa.Column(
+            "task_id", sa.BigInteger(), nullable=True, comment="Идентификатор задачи"
+        ),
+        sa.Column("exchange", sa.String(255), nullable=False, comment="Обменник"),
+        sa.Column(
+            "routing_key",
+            sa.String(255),
+            nullable=False,
+            comment="Ключ маршрутизации",
+        ),
+        sa.Column(
+            "priority", sa.SmallInteger(), nullable=False, comment="Приоритет сообщения"
+        ),
+        sa.Column("body", sa.JSON(), nullable=False, comment="Тело сообщения"),
+        sa.Column("headers", sa.JSON(), nullable=True, comment="Заголовки сообщения"),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=False),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время создания",
+        ),
+        sa.Column(
+            "create_date",
+            sa.TIMESTAMP(timezone=False),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Дата и время создания записи",
+        ),
+        sa.Column(
+            "update_date",
+            sa.TIMESTAMP(timezone=False),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Дата и время обновления записи",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("outbox", if_exists=True)
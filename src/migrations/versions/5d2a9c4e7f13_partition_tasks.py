@@ -0,0 +1,178 @@
+"""partition tasks by created_at
+
+Revision ID: 5d2a9c4e7f13
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2a9c4e7f13"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "tasks"
+LEGACY = f"{TABLE}_legacy"
+SEQUENCE = f"{TABLE}_id_seq"
+INTERVAL = timedelta(days=1)
+PRECREATE = 7
+
+COLUMN_COMMENTS = {
+    "id": "Уникальный идентификатор",
+    "name": "Название",
+    "description": "Описание",
+    "priority": "Приоритет",
+    "status": "Статус",
+    "created_at": "Время создания",
+    "stared_at": "Время начала",
+    "completed_at": "Время завершения",
+    "result": "Результат выполнения",
+    "error_info": "Информация об ошибках",
+    "create_date": "Дата и время создания записи",
+    "update_date": "Дата и время обновления записи",
+}
+
+
+def partition_bounds(
+    moment: datetime, interval: timedelta
+) -> tuple[datetime, datetime]:
+    epoch = datetime(1970, 1, 1)
+    start = epoch + (moment - epoch) // interval * interval
+    return start, start + interval
+
+
+def create_enum(name: str, values: tuple[str, ...]) -> None:
+    labels = ", ".join(f"'{value}'" for value in values)
+    op.execute(
+        f"DO $$ BEGIN CREATE TYPE {name} AS ENUM ({labels}); "
+        f"EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+    )
+
+
+def create_baseline_table() -> None:
+    create_enum("prioritytype", ("LOW", "MEDIUM", "HIGH"))
+    create_enum(
+        "statustype",
+        ("NEW", "PENDING", "IN_PROGRESS", "COMPLETED", "FAILED", "CANCELLED"),
+    )
+    op.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE} (
+            id BIGSERIAL NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            priority prioritytype NOT NULL,
+            status statustype NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            stared_at TIMESTAMP WITHOUT TIME ZONE,
+            completed_at TIMESTAMP WITHOUT TIME ZONE,
+            result VARCHAR,
+            error_info TEXT,
+            create_date TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            update_date TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    for column, comment in COLUMN_COMMENTS.items():
+        op.execute(f"COMMENT ON COLUMN {TABLE}.{column} IS '{comment}'")
+
+
+def drop_secondary_indexes(table: str) -> None:
+    op.execute(
+        f"""
+        DO $$
+        DECLARE index_name text;
+        BEGIN
+            FOR index_name IN
+                SELECT indexname FROM pg_indexes
+                WHERE schemaname = current_schema()
+                  AND tablename = '{table}'
+                  AND indexname <> '{table}_pkey'
+            LOOP
+                EXECUTE format('DROP INDEX %I', index_name);
+            END LOOP;
+        END $$
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_baseline_table()
+
+    boundary = partition_bounds(datetime.now(), INTERVAL)[1]
+
+    drop_secondary_indexes(TABLE)
+    op.rename_table(TABLE, LEGACY)
+    op.execute(f"ALTER TABLE {LEGACY} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY}_pkey")
+    op.execute(
+        f"CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS INCLUDING COMMENTS) "
+        f"PARTITION BY RANGE (created_at)"
+    )
+    op.execute(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, created_at)"
+    )
+    op.execute(f"ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id")
+
+    op.execute(f"ALTER TABLE {LEGACY} DROP CONSTRAINT {LEGACY}_pkey")
+    op.execute(
+        f"ALTER TABLE {LEGACY} ADD CONSTRAINT {LEGACY}_pkey PRIMARY KEY (id, created_at)"
+    )
+    op.execute(
+        f"ALTER TABLE {LEGACY} ADD CONSTRAINT {LEGACY}_created_at_check "
+        f"CHECK (created_at < '{boundary.isoformat(sep=' ')}')"
+    )
+    op.execute(
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat(sep=' ')}')"
+    )
+    op.execute(f"ALTER TABLE {LEGACY} DROP CONSTRAINT {LEGACY}_created_at_check")
+
+    for offset in range(PRECREATE + 1):
+        start, end = partition_bounds(boundary + offset * INTERVAL, INTERVAL)
+        op.execute(
+            f"CREATE TABLE {TABLE}_p{start:%Y%m%d} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') "
+            f"TO ('{end.isoformat(sep=' ')}')"
+        )
+
+
+def drop_partitions(table: str) -> None:
+    op.execute(
+        f"""
+        DO $$
+        DECLARE partition_name text;
+        BEGIN
+            FOR partition_name IN
+                SELECT child.relname FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = '{table}'
+                  AND parent.relnamespace = current_schema()::regnamespace
+            LOOP
+                EXECUTE format('DROP TABLE %I', partition_name);
+            END LOOP;
+        END $$
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {LEGACY}")
+    op.execute(f"INSERT INTO {LEGACY} SELECT * FROM {TABLE}")
+    op.execute(f"ALTER SEQUENCE {SEQUENCE} OWNED BY {LEGACY}.id")
+    drop_partitions(TABLE)
+    op.drop_table(TABLE)
+
+    op.execute(f"ALTER TABLE {LEGACY} DROP CONSTRAINT {LEGACY}_pkey")
+    op.rename_table(LEGACY, TABLE)
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)")
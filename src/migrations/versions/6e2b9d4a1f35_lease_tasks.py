@@ -0,0 +1,59 @@
+"""lease tasks to workers
+
+Revision ID: 6e2b9d4a1f35
+Revises: a4c8e2f61d07
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6e2b9d4a1f35"
+down_revision: Union[str, Sequence[str], None] = "a4c8e2f61d07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "worker_id",
+            sa.String(length=255),
+            nullable=True,
+            comment="Идентификатор воркера, выполняющего задачу",
+        ),
+        if_not_exists=True,
+    )
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "lease_expires_at",
+            sa.DateTime(),
+            nullable=True,
+            comment="Время истечения аренды задачи воркером",
+        ),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_tasks_in_progress_lease_expires_at",
+        "tasks",
+        ["lease_expires_at"],
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_tasks_in_progress_lease_expires_at", table_name="tasks", if_exists=True
+    )
+    op.drop_column("tasks", "lease_expires_at", if_exists=True)
+    op.drop_column("tasks", "worker_id", if_exists=True)
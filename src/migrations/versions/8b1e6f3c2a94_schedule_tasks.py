@@ -0,0 +1,43 @@
+"""schedule tasks
+
+Revision ID: 8b1e6f3c2a94
+Revises: e7a2d6c9b481
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b1e6f3c2a94"
+down_revision: Union[str, Sequence[str], None] = "e7a2d6c9b481"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "ALTER TYPE statustype ADD VALUE IF NOT EXISTS 'SCHEDULED' BEFORE 'NEW'"
+        )
+
+    op.execute(
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS scheduled_at TIMESTAMP WITHOUT TIME ZONE"
+    )
+    op.execute(
+        "COMMENT ON COLUMN tasks.scheduled_at IS 'Время запланированного запуска'"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_scheduled_at_id ON tasks (scheduled_at, id) "
+        "WHERE status = 'SCHEDULED'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_tasks_scheduled_at_id")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS scheduled_at")
@@ -0,0 +1,68 @@
+"""index task list filters
+
+Revision ID: 9f3e7b2c5a10
+Revises: c1d5a8e3b726
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9f3e7b2c5a10"
+down_revision: Union[str, Sequence[str], None] = "c1d5a8e3b726"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_tasks_status_created_at_id",
+        "tasks",
+        ["status", "created_at", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_tasks_priority_created_at_id",
+        "tasks",
+        ["priority", "created_at", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_tasks_active_created_at_id",
+        "tasks",
+        ["created_at", "id"],
+        postgresql_where=sa.text("status IN ('NEW', 'PENDING', 'IN_PROGRESS')"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_tasks_name_pattern",
+        "tasks",
+        ["name"],
+        postgresql_ops={"name": "varchar_pattern_ops"},
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_tasks_completed_at_id",
+        "tasks",
+        ["completed_at", "id"],
+        postgresql_where=sa.text("completed_at IS NOT NULL"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name in (
+        "ix_tasks_completed_at_id",
+        "ix_tasks_name_pattern",
+        "ix_tasks_active_created_at_id",
+        "ix_tasks_priority_created_at_id",
+        "ix_tasks_status_created_at_id",
+    ):
+        op.drop_index(index_name, table_name="tasks", if_exists=True)
@@ -0,0 +1,33 @@
+"""index tasks by created_at and id
+
+Revision ID: a4c8e2f61d07
+Revises: 3f7a1c9e2b58
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c8e2f61d07"
+down_revision: Union[str, Sequence[str], None] = "3f7a1c9e2b58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_tasks_created_at_id",
+        "tasks",
+        ["created_at", "id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_created_at_id", table_name="tasks", if_exists=True)
@@ -0,0 +1,92 @@
+"""store large task results out of row
+
+Revision ID: c1d5a8e3b726
+Revises: 6e2b9d4a1f35
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c1d5a8e3b726"
+down_revision: Union[str, Sequence[str], None] = "6e2b9d4a1f35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_results",
+        sa.Column(
+            "digest",
+            sa.String(64),
+            nullable=False,
+            comment="SHA-256 несжатого результата",
+        ),
+        sa.Column(
+            "size",
+            sa.BigInteger(),
+            nullable=False,
+            comment="Размер несжатого результата в байтах",
+        ),
+        sa.Column(
+            "data", sa.LargeBinary(), nullable=False, comment="Результат, сжатый zlib"
+        ),
+        sa.Column(
+            "create_date",
+            sa.TIMESTAMP(timezone=False),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Дата и время создания записи",
+        ),
+        sa.Column(
+            "update_date",
+            sa.TIMESTAMP(timezone=False),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Дата и время обновления записи",
+        ),
+        sa.PrimaryKeyConstraint("digest"),
+        if_not_exists=True,
+    )
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "result_ref",
+            sa.String(64),
+            nullable=True,
+            comment="Ссылка на результат в хранилище task_results",
+        ),
+        if_not_exists=True,
+    )
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "result_size",
+            sa.BigInteger(),
+            nullable=True,
+            comment="Размер результата в байтах",
+        ),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_tasks_result_ref",
+        "tasks",
+        ["result_ref"],
+        postgresql_where=sa.text("result_ref IS NOT NULL"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_result_ref", table_name="tasks", if_exists=True)
+    op.drop_column("tasks", "result_size", if_exists=True)
+    op.drop_column("tasks", "result_ref", if_exists=True)
+    op.drop_table("task_results", if_exists=True)
@@ -0,0 +1,86 @@
+"""create task idempotency keys
+
+Revision ID: e7a2d6c9b481
+Revises: 9f3e7b2c5a10
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a2d6c9b481"
+down_revision: Union[str, Sequence[str], None] = "9f3e7b2c5a10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_idempotency_keys",
+        sa.Column(
+            "key",
+            sa.String(255),
+            nullable=False,
+            comment="Ключ идемпотентности из заголовка Idempotency-Key",
+        ),
+        sa.Column(
+            "request_hash",
+            sa.String(64),
+            nullable=False,
+            comment="SHA-256 тела запроса",
+        ),
+        sa.Column(
+            "task_id",
+            sa.BigInteger(),
+            nullable=False,
+            comment="Идентификатор созданной задачи",
+        ),
+        sa.Column(
+            "response", sa.JSON(), nullable=False, comment="Ответ на исходный запрос"
+        ),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=False),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время создания",
+        ),
+        sa.Column(
+            "create_date",
+            sa.TIMESTAMP(timezone=False),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Дата и время создания записи",
+        ),
+        sa.Column(
+            "update_date",
+            sa.TIMESTAMP(timezone=False),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Дата и время обновления записи",
+        ),
+        sa.PrimaryKeyConstraint("key"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_task_idempotency_keys_created_at",
+        "task_idempotency_keys",
+        ["created_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_task_idempotency_keys_created_at",
+        table_name="task_idempotency_keys",
+        if_exists=True,
+    )
+    op.drop_table("task_idempotency_keys", if_exists=True)
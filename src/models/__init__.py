@@ -1,4 +1,7 @@
 from .base import Base
+from .idempotency import TaskIdempotencyKeysDB
+from .outbox import OutboxDB
+from .results import TaskResultsDB
 from .tasks import TasksDB
 
-__all__ = ("Base", "TasksDB")
+__all__ = ("Base", "OutboxDB", "TaskIdempotencyKeysDB", "TaskResultsDB", "TasksDB")
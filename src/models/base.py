@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BIGINT, TIMESTAMP, String, func
+from sqlalchemy import BIGINT, INTEGER, TIMESTAMP, String, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -8,9 +8,9 @@ class Base(DeclarativeBase):
     __abstract__ = True
 
     type_annotation_map = {
-        int: BIGINT,
+        int: BIGINT().with_variant(INTEGER(), "sqlite"),
         str: String(),
-        datetime: TIMESTAMP(timezone=False)
+        datetime: TIMESTAMP(timezone=False),
     }
 
     create_date: Mapped[datetime] = mapped_column(
@@ -18,6 +18,7 @@ class Base(DeclarativeBase):
         comment="Дата и время создания записи",
     )
     update_date: Mapped[datetime] = mapped_column(
-        server_default=func.now(), onupdate=func.now(),
+        server_default=func.now(),
+        onupdate=func.now(),
         comment="Дата и время обновления записи",
     )
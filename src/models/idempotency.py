@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base
+
+
+class TaskIdempotencyKeysDB(Base):
+    __tablename__ = "task_idempotency_keys"
+    __table_args__ = (Index("ix_task_idempotency_keys_created_at", "created_at"),)
+
+    key: Mapped[str] = mapped_column(
+        String(255),
+        primary_key=True,
+        comment="Ключ идемпотентности из заголовка Idempotency-Key",
+    )
+    request_hash: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        comment="SHA-256 тела запроса",
+    )
+    task_id: Mapped[int] = mapped_column(
+        nullable=False,
+        comment="Идентификатор созданной задачи",
+    )
+    response: Mapped[dict[str, Any]] = mapped_column(
+        JSON,
+        nullable=False,
+        comment="Ответ на исходный запрос",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        nullable=False,
+        comment="Время создания",
+    )
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, SmallInteger, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base
+
+
+class OutboxDB(Base):
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(
+        primary_key=True,
+        autoincrement=True,
+        comment="Уникальный идентификатор",
+    )
+    task_id: Mapped[int] = mapped_column(
+        nullable=True,
+        comment="Идентификатор задачи",
+    )
+    exchange: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        comment="Обменник",
+    )
+    routing_key: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        comment="Ключ маршрутизации",
+    )
+    priority: Mapped[int] = mapped_column(
+        SmallInteger,
+        nullable=False,
+        comment="Приоритет сообщения",
+    )
+    body: Mapped[dict[str, Any]] = mapped_column(
+        JSON,
+        nullable=False,
+        comment="Тело сообщения",
+    )
+    headers: Mapped[dict[str, Any]] = mapped_column(
+        JSON,
+        nullable=True,
+        comment="Заголовки сообщения",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        nullable=False,
+        comment="Время создания",
+    )
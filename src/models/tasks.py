@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import func, Enum, String, Text
+from sqlalchemy import func, text, Enum, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from enums import PriorityType, StatusType
@@ -8,6 +8,44 @@ from models.base import Base
 
 class TasksDB(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index(
+            "ix_tasks_in_progress_lease_expires_at",
+            "lease_expires_at",
+            postgresql_where=text("status = 'IN_PROGRESS'"),
+        ),
+        Index("ix_tasks_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tasks_priority_created_at_id", "priority", "created_at", "id"),
+        Index(
+            "ix_tasks_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status IN ('NEW', 'PENDING', 'IN_PROGRESS')"),
+        ),
+        Index(
+            "ix_tasks_name_pattern",
+            "name",
+            postgresql_ops={"name": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_tasks_scheduled_at_id",
+            "scheduled_at",
+            "id",
+            postgresql_where=text("status = 'SCHEDULED'"),
+        ),
+        Index(
+            "ix_tasks_completed_at_id",
+            "completed_at",
+            "id",
+            postgresql_where=text("completed_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_tasks_result_ref",
+            "result_ref",
+            postgresql_where=text("result_ref IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         primary_key=True,
@@ -39,6 +77,10 @@ class TasksDB(Base):
         nullable=False,
         comment="Время создания",
     )
+    scheduled_at: Mapped[datetime] = mapped_column(
+        nullable=True,
+        comment="Время запланированного запуска",
+    )
     stared_at: Mapped[datetime] = mapped_column(
         nullable=True,
         comment="Время начала",
@@ -51,8 +93,26 @@ class TasksDB(Base):
         nullable=True,
         comment="Результат выполнения",
     )
+    result_ref: Mapped[str] = mapped_column(
+        String(64),
+        nullable=True,
+        comment="Ссылка на результат в хранилище task_results",
+    )
+    result_size: Mapped[int] = mapped_column(
+        nullable=True,
+        comment="Размер результата в байтах",
+    )
     error_info: Mapped[str] = mapped_column(
         Text,
         nullable=True,
         comment="Информация об ошибках",
     )
+    worker_id: Mapped[str] = mapped_column(
+        String(255),
+        nullable=True,
+        comment="Идентификатор воркера, выполняющего задачу",
+    )
+    lease_expires_at: Mapped[datetime] = mapped_column(
+        nullable=True,
+        comment="Время истечения аренды задачи воркером",
+    )
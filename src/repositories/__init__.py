@@ -1,4 +1,15 @@
 from .base import BaseRepository
+from .idempotency import IdempotencyKeysRepository
+from .outbox import OutboxRepository
+from .partitions import TaskPartitionsRepository
+from .results import TaskResultsRepository
 from .tasks import TasksRepository
 
-__all__ = ("BaseRepository", "TasksRepository")
+__all__ = (
+    "BaseRepository",
+    "IdempotencyKeysRepository",
+    "OutboxRepository",
+    "TaskPartitionsRepository",
+    "TaskResultsRepository",
+    "TasksRepository",
+)
@@ -1,5 +1,6 @@
 import sys
 import logging
+from contextlib import AbstractAsyncContextManager
 from uuid import UUID
 from typing import TypeVar, Generic
 
@@ -11,6 +12,7 @@ from sqlalchemy.exc import (
     ProgrammingError,
     InterfaceError,
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import InstrumentedAttribute
 
 from engines.postgres_storage import PostgresEngine
@@ -28,6 +30,11 @@ class BaseRepository(Generic[T]):
         self.db = db
         self.model = model
 
+    def transaction(
+        self, isolation_level: str | None = None
+    ) -> AbstractAsyncContextManager[AsyncSession]:
+        return self.db.transaction(isolation_level=isolation_level)
+
     async def get_by(self, **kwargs: str | UUID | bool | set[UUID] | None) -> T | None:
         if not self.model:
             raise ValueError("Model is not defined for this repository")
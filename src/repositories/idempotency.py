@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import delete, insert, select
+
+from engines import PostgresEngine
+from models import TaskIdempotencyKeysDB
+from repositories import BaseRepository
+
+
+class IdempotencyKeysRepository(BaseRepository):
+    def __init__(self):
+        db: PostgresEngine = PostgresEngine()
+        super().__init__(db, TaskIdempotencyKeysDB)
+
+    async def get_key(self, key: str) -> TaskIdempotencyKeysDB | None:
+        stmt = select(TaskIdempotencyKeysDB).where(TaskIdempotencyKeysDB.key == key)
+        return await self.db.execute(stmt)  # noqa
+
+    async def create_key(
+        self, key: str, request_hash: str, task_id: int, response: dict
+    ) -> None:
+        stmt = insert(TaskIdempotencyKeysDB).values(
+            key=key, request_hash=request_hash, task_id=task_id, response=response
+        )
+        await self.db.execute(stmt, no_return=True)  # noqa
+
+    async def purge_expired(self, older_than: datetime, limit: int) -> int:
+        expired = (
+            select(TaskIdempotencyKeysDB.key)
+            .where(TaskIdempotencyKeysDB.created_at < older_than)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            delete(TaskIdempotencyKeysDB)
+            .where(TaskIdempotencyKeysDB.key.in_(expired))
+            .returning(TaskIdempotencyKeysDB.key)
+        )
+        result = await self.db.execute(stmt, return_many=True)  # noqa
+        return len(result or [])
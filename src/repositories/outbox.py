@@ -0,0 +1,29 @@
+from sqlalchemy import delete, insert, select
+
+from engines import PostgresEngine
+from models import OutboxDB
+from repositories import BaseRepository
+
+
+class OutboxRepository(BaseRepository):
+    def __init__(self):
+        db: PostgresEngine = PostgresEngine()
+        super().__init__(db, OutboxDB)
+
+    async def create_messages(self, rows: list[dict]) -> None:
+        stmt = insert(OutboxDB).values(rows)
+        await self.db.execute(stmt, no_return=True)  # noqa
+
+    async def get_batch(self, limit: int) -> list[OutboxDB]:
+        stmt = (
+            select(OutboxDB)
+            .order_by(OutboxDB.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(stmt, return_many=True)  # noqa
+        return result or []
+
+    async def delete_messages(self, message_ids: list[int]) -> None:
+        stmt = delete(OutboxDB).where(OutboxDB.id.in_(message_ids))
+        await self.db.execute(stmt, no_return=True)  # noqa
@@ -0,0 +1,178 @@
+import re
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from sqlalchemy import ColumnElement, text
+
+from engines import PostgresEngine
+from models import TasksDB
+from repositories import BaseRepository
+
+PARTITION_BOUND_RE = re.compile(
+    r"FROM \((?:MINVALUE|'(?P<start>[^']+)')\) TO \((?:MAXVALUE|'(?P<end>[^']+)')\)"
+)
+PARTITION_NAME_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+MAINTENANCE_LOCK_ID = 0x7461736B73  # "tasks"
+
+
+class TaskPartition:
+    __slots__ = ("name", "start", "end", "sealed", "min_id", "max_id")
+
+    def __init__(
+        self,
+        name: str,
+        start: datetime | None,
+        end: datetime | None,
+        sealed: bool = False,
+        min_id: int | None = None,
+        max_id: int | None = None,
+    ) -> None:
+        self.name = name
+        self.start = start
+        self.end = end
+        self.sealed = sealed
+        self.min_id = min_id
+        self.max_id = max_id
+
+    @classmethod
+    def from_bound(cls, name: str, bound: str) -> "TaskPartition | None":
+        if not (match := PARTITION_BOUND_RE.search(bound)):
+            return None
+
+        start, end = match.group("start"), match.group("end")
+        return cls(
+            name=name,
+            start=datetime.fromisoformat(start) if start else None,
+            end=datetime.fromisoformat(end) if end else None,
+        )
+
+
+class TaskPartitionMap:
+    def __init__(self) -> None:
+        self.sealed: list[TaskPartition] = []
+        self.open: list[TaskPartition] = []
+
+    def update(self, partitions: list[TaskPartition]) -> None:
+        self.sealed = sorted(
+            (
+                partition
+                for partition in partitions
+                if partition.sealed and partition.min_id is not None
+            ),
+            key=lambda partition: partition.min_id,
+        )
+        self.open = [partition for partition in partitions if not partition.sealed]
+
+    def created_at_conditions(self, task_ids: list[int]) -> list[ColumnElement[bool]]:
+        if not self.sealed or not task_ids:
+            return []
+
+        ranges = [self._find_range(task_id) for task_id in task_ids]
+        starts = [start for start, _ in ranges]
+        ends = [end for _, end in ranges]
+
+        conditions = []
+        if None not in starts:
+            conditions.append(TasksDB.created_at >= min(starts))
+        if None not in ends:
+            conditions.append(TasksDB.created_at < max(ends))
+        return conditions
+
+    def _find_range(self, task_id: int) -> tuple[datetime | None, datetime | None]:
+        index = bisect_right(self.sealed, task_id, key=lambda p: p.min_id)
+        matches = [
+            partition
+            for partition in self.sealed[max(index - 2, 0) : index]
+            if partition.max_id >= task_id
+        ] or self.open
+        if not matches:
+            return None, None
+
+        starts = [match.start for match in matches]
+        ends = [match.end for match in matches]
+        return (
+            None if None in starts else min(starts),
+            None if None in ends else max(ends),
+        )
+
+
+task_partition_map = TaskPartitionMap()
+
+
+class TaskPartitionsRepository(BaseRepository):
+    def __init__(self):
+        db: PostgresEngine = PostgresEngine()
+        super().__init__(db, TasksDB)
+        self.table = TasksDB.__tablename__
+
+    async def try_lock(self) -> bool:
+        stmt = text("SELECT pg_try_advisory_xact_lock(:lock_id)").bindparams(
+            lock_id=MAINTENANCE_LOCK_ID
+        )
+        return bool(await self.db.execute(stmt))  # noqa
+
+    async def is_partitioned(self) -> bool:
+        stmt = text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(:table))"
+        ).bindparams(table=self.table)
+        return bool(await self.db.execute(stmt))  # noqa
+
+    async def get_partitions(self) -> list[TaskPartition]:
+        stmt = text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ).bindparams(table=self.table)
+        rows = await self.db.select(stmt, no_scalars=True)  # noqa
+        partitions = [
+            TaskPartition.from_bound(name, bound) for name, bound in rows or []
+        ]
+        return sorted(
+            (partition for partition in partitions if partition is not None),
+            key=lambda partition: partition.start or datetime.min,
+        )
+
+    async def load_id_range(self, partition: TaskPartition) -> None:
+        stmt = text(f"SELECT min(id), max(id) FROM {self._quote(partition.name)}")
+        rows = await self.db.select(stmt, no_scalars=True)  # noqa
+        partition.min_id, partition.max_id = rows[0] if rows else (None, None)
+
+    async def create_partition(self, name: str, start: datetime, end: datetime) -> None:
+        stmt = text(
+            f"CREATE TABLE IF NOT EXISTS {self._quote(name)} "
+            f"PARTITION OF {self.table} "
+            f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') "
+            f"TO ('{end.isoformat(sep=' ')}')"
+        )
+        await self.db.execute(stmt, no_return=True)  # noqa
+
+    async def detach_partition(self, name: str) -> None:
+        stmt = text(f"ALTER TABLE {self.table} DETACH PARTITION {self._quote(name)}")
+        await self.db.execute(stmt, no_return=True)  # noqa
+
+    async def archive_partition(self, name: str, schema: str) -> None:
+        for stmt in (
+            text(f"CREATE SCHEMA IF NOT EXISTS {self._quote(schema)}"),
+            text(f"ALTER TABLE {self._quote(name)} SET SCHEMA {self._quote(schema)}"),
+        ):
+            await self.db.execute(stmt, no_return=True)  # noqa
+
+    async def drop_partition(self, name: str) -> None:
+        stmt = text(f"DROP TABLE {self._quote(name)}")
+        await self.db.execute(stmt, no_return=True)  # noqa
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        if not PARTITION_NAME_RE.match(name):
+            raise ValueError(f"Недопустимое имя таблицы: {name}")
+        return f'"{name}"'
+
+
+def partition_bounds(
+    moment: datetime, interval: timedelta
+) -> tuple[datetime, datetime]:
+    epoch = datetime(1970, 1, 1)
+    start = epoch + (moment - epoch) // interval * interval
+    return start, start + interval
@@ -0,0 +1,30 @@
+from collections.abc import AsyncIterator
+
+from sqlalchemy import func, select
+
+from engines import PostgresEngine
+from models import TaskResultsDB
+from repositories import BaseRepository
+
+
+class TaskResultsRepository(BaseRepository):
+    def __init__(self):
+        db: PostgresEngine = PostgresEngine()
+        super().__init__(db, TaskResultsDB)
+
+    async def exists(self, digest: str) -> bool:
+        stmt = select(TaskResultsDB.digest).where(TaskResultsDB.digest == digest)
+        return await self.db.select_one(stmt) is not None  # noqa
+
+    async def iter_chunks(self, digest: str, chunk_size: int) -> AsyncIterator[bytes]:
+        offset = 1
+        while True:
+            stmt = select(func.substr(TaskResultsDB.data, offset, chunk_size)).where(
+                TaskResultsDB.digest == digest
+            )
+            chunk = await self.db.execute(stmt)  # noqa
+            if not chunk:
+                return
+
+            yield bytes(chunk)
+            offset += len(chunk)
@@ -1,10 +1,33 @@
+import json
+from datetime import datetime
+
 from pydantic import BaseModel
-from sqlalchemy import select, update, and_, func
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    insert,
+    select,
+    update,
+    and_,
+    func,
+    text,
+    tuple_,
+)
 
 from engines import PostgresEngine
+from enums import CountType, DatabaseBackend, StatusType, TaskField
 from models import TasksDB
 from repositories import BaseRepository
-from schemes.base import Pagination
+from repositories.partitions import task_partition_map
+from schemes.base import Pagination, PaginationCursor
+from settings import settings
+
+
+def _to_local_naive(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
 
 
 class TasksRepository(BaseRepository):
@@ -12,37 +35,254 @@ class TasksRepository(BaseRepository):
         db: PostgresEngine = PostgresEngine()
         super().__init__(db, TasksDB)
 
+    async def create_tasks(self, rows: list[dict]) -> list[TasksDB]:
+        if settings.DATABASE_BACKEND == DatabaseBackend.SQLITE:
+            return [
+                await self.db.execute(insert(TasksDB).values(row).returning(TasksDB))  # noqa
+                for row in rows
+            ]
+
+        task_ids = await self._allocate_ids(len(rows))
+        stmt = (
+            insert(TasksDB)
+            .values([{**row, "id": task_id} for task_id, row in zip(task_ids, rows)])
+            .returning(TasksDB)
+        )
+        result = await self.db.execute(stmt, return_many=True)  # noqa
+        if not result:
+            return []
+
+        tasks = {task.id: task for task in result}
+        return [tasks[task_id] for task_id in task_ids]
+
+    async def get_by(self, **kwargs) -> TasksDB | None:
+        if set(kwargs) != {"id"} or not (
+            conditions := task_partition_map.created_at_conditions([kwargs["id"]])
+        ):
+            return await super().get_by(**kwargs)
+
+        stmt = select(TasksDB).where(TasksDB.id == kwargs["id"], *conditions)
+        task = await self.db.execute(stmt)  # noqa
+        return task or await super().get_by(**kwargs)
+
     async def set_task_status(self, task_id: int, status: str) -> None:
         stmt = update(TasksDB).where(and_(TasksDB.id == task_id)).values(status=status)
         await self.db.execute(stmt, no_return=True)  # noqa
 
-    async def get_tasks(
-        self, pagination: BaseModel
-    ) -> tuple[list[TasksDB], Pagination]:
-        stmt = select(TasksDB)
+    async def set_tasks_status(
+        self, task_ids: list[int], status: str, from_status: str | None = None
+    ) -> None:
+        conditions = [
+            TasksDB.id.in_(task_ids),
+            *task_partition_map.created_at_conditions(task_ids),
+        ]
+        if from_status is not None:
+            conditions.append(TasksDB.status == from_status)
 
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        result = await self.db.execute(count_stmt, return_many=True)  # noqa
-        total_records = result[0] or 0
+        stmt = update(TasksDB).where(and_(*conditions)).values(status=status)
+        await self.db.execute(stmt, no_return=True)  # noqa
 
-        if not pagination.pagination_on or pagination.page_size <= 0:
-            page_count = 0
-        else:
-            page_count = (
-                total_records + pagination.page_size - 1
-            ) // pagination.page_size
+    async def get_tasks_by_ids(self, task_ids: list[int]) -> list[TasksDB]:
+        conditions = task_partition_map.created_at_conditions(task_ids)
+        stmt = select(TasksDB).where(TasksDB.id.in_(task_ids), *conditions)
+        result = await self.db.execute(stmt, return_many=True)  # noqa
+        tasks = list(result or [])
 
-        if pagination.count_only:
-            return [], Pagination(total=total_records, page_count=page_count)
+        found = {task.id for task in tasks}
+        if conditions and (missing := set(task_ids) - found):
+            stmt = select(TasksDB).where(TasksDB.id.in_(missing))
+            tasks.extend(await self.db.execute(stmt, return_many=True) or [])  # noqa
+        return tasks
 
-        stmt = stmt.order_by(TasksDB.created_at.desc())
+    async def get_scheduled_tasks(
+        self,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+        until: datetime | None = None,
+    ) -> list[Row]:
+        conditions = [TasksDB.status == StatusType.SCHEDULED]
+        if after is not None:
+            conditions.append(tuple_(TasksDB.scheduled_at, TasksDB.id) > after)
+        if until is not None:
+            conditions.append(TasksDB.scheduled_at <= until)
 
-        if pagination.pagination_on:
-            offset = (pagination.page - 1) * pagination.page_size
-            stmt = stmt.offset(offset).limit(pagination.page_size)
+        stmt = (
+            select(TasksDB.id, TasksDB.scheduled_at)
+            .where(and_(*conditions))
+            .order_by(TasksDB.scheduled_at, TasksDB.id)
+            .limit(limit)
+        )
+        result = await self.db.select(stmt, no_scalars=True)  # noqa
+        return result or []
 
+    async def release_scheduled_tasks(self, task_ids: list[int]) -> list[TasksDB]:
+        stmt = (
+            update(TasksDB)
+            .where(
+                and_(
+                    TasksDB.id.in_(task_ids),
+                    TasksDB.status == StatusType.SCHEDULED,
+                )
+            )
+            .values(status=StatusType.NEW)
+            .returning(TasksDB)
+        )
         result = await self.db.execute(stmt, return_many=True)  # noqa
+        return result or []
+
+    async def cancel_scheduled_task(self, task_id: int, completed_at: datetime) -> bool:
+        stmt = (
+            update(TasksDB)
+            .where(
+                and_(
+                    TasksDB.id == task_id,
+                    TasksDB.status == StatusType.SCHEDULED,
+                )
+            )
+            .values(status=StatusType.CANCELLED, completed_at=completed_at)
+            .returning(TasksDB.id)
+        )
+        return await self.db.execute(stmt) is not None  # noqa
+
+    async def get_tasks(
+        self,
+        pagination: BaseModel,
+        fields: list[TaskField] | None = None,
+        cursor: PaginationCursor | None = None,
+    ) -> tuple[list[TasksDB] | list[Row], Pagination]:
+        conditions = self._build_filters(pagination)
+        stmt = select(TasksDB).where(*conditions)
 
-        pagination_info = Pagination(total=total_records, page_count=page_count)
+        async with self.transaction(isolation_level="REPEATABLE READ"):
+            total_records, estimated = await self._count_tasks(
+                stmt, pagination.count_type
+            )
+
+            if (
+                total_records is None
+                or not pagination.pagination_on
+                or pagination.page_size <= 0
+            ):
+                page_count = None if total_records is None else 0
+            else:
+                page_count = (
+                    total_records + pagination.page_size - 1
+                ) // pagination.page_size
+
+            pagination_info = Pagination(
+                total=total_records, page_count=page_count, estimated=estimated
+            )
+
+            if pagination.count_only:
+                return [], pagination_info
+
+            if fields:
+                stmt = select(
+                    *(
+                        getattr(TasksDB, name)
+                        for name in dict.fromkeys(
+                            (TaskField.ID, TaskField.CREATED_AT, *fields)
+                        )
+                    )
+                ).where(*conditions)
+
+            stmt = stmt.order_by(TasksDB.created_at.desc(), TasksDB.id.desc())
+
+            if pagination.pagination_on:
+                if cursor is not None:
+                    stmt = stmt.where(
+                        tuple_(TasksDB.created_at, TasksDB.id)
+                        < tuple_(cursor.created_at, cursor.id)
+                    )
+                else:
+                    stmt = stmt.offset((pagination.page - 1) * pagination.page_size)
+                stmt = stmt.limit(pagination.page_size)
+
+            if fields:
+                result = await self.db.select(stmt, no_scalars=True)  # noqa
+            else:
+                result = await self.db.execute(stmt, return_many=True)  # noqa
 
         return result or [], pagination_info
+
+    async def _allocate_ids(self, count: int) -> list[int]:
+        sequence = func.pg_get_serial_sequence(TasksDB.__tablename__, "id")
+        stmt = select(func.nextval(sequence)).select_from(
+            func.generate_series(1, count)
+        )
+        return list(await self.db.execute(stmt, return_many=True))  # noqa
+
+    @staticmethod
+    def _build_filters(pagination: BaseModel) -> list[ColumnElement[bool]]:
+        conditions = []
+        if pagination.status:
+            conditions.append(TasksDB.status.in_(pagination.status))
+        if pagination.priority:
+            conditions.append(TasksDB.priority.in_(pagination.priority))
+        if pagination.name_prefix:
+            pattern = (
+                pagination.name_prefix.replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
+            conditions.append(TasksDB.name.like(f"{pattern}%", escape="\\"))
+        if pagination.created_from:
+            conditions.append(
+                TasksDB.created_at >= _to_local_naive(pagination.created_from)
+            )
+        if pagination.created_to:
+            conditions.append(
+                TasksDB.created_at < _to_local_naive(pagination.created_to)
+            )
+        if pagination.completed_from:
+            conditions.append(
+                TasksDB.completed_at >= _to_local_naive(pagination.completed_from)
+            )
+        if pagination.completed_to:
+            conditions.append(
+                TasksDB.completed_at < _to_local_naive(pagination.completed_to)
+            )
+        return conditions
+
+    async def _count_tasks(
+        self, stmt: Select, count_type: CountType
+    ) -> tuple[int | None, bool]:
+        if count_type == CountType.NONE:
+            return None, False
+
+        if (
+            count_type == CountType.ESTIMATE
+            and settings.DATABASE_BACKEND == DatabaseBackend.POSTGRES
+        ):
+            if stmt.whereclause is not None:
+                estimate = await self._explain_rows(stmt)
+            else:
+                estimate_stmt = text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = CAST(:table AS regclass)"
+                ).bindparams(table=TasksDB.__tablename__)
+                estimate = await self.db.execute(estimate_stmt)  # noqa
+            if (
+                estimate is not None
+                and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD
+            ):
+                return estimate, True
+
+        count_stmt = select(func.count()).select_from(stmt.subquery())
+        result = await self.db.execute(count_stmt, return_many=True)  # noqa
+        return result[0] or 0, False
+
+    async def _explain_rows(self, stmt: Select) -> int | None:
+        compiled = stmt.compile(
+            dialect=self.db.engine.dialect, compile_kwargs={"literal_binds": True}
+        )
+        explain_stmt = text(
+            "EXPLAIN (FORMAT JSON) " + str(compiled).replace(":", "\\:")
+        )
+        plan = await self.db.execute(explain_stmt)  # noqa
+        if plan is None:
+            return None
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
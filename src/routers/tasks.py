@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, Header, Query
+from fastapi.responses import StreamingResponse
 
 from enums import StatusType
 from schemes import (
     TaskCreateRequest,
     TaskCreateResponse,
     TaskResponse,
+    TasksBatchCreateResponse,
     BaseQueryPathFilters,
     TasksResponse,
+    TasksFieldsResponse,
     TaskId,
 )
 from services import TaskService
+from settings import settings
 
 router = APIRouter(
     prefix="/tasks",
@@ -20,19 +26,59 @@ router = APIRouter(
 @router.post("/", response_model=TaskCreateResponse)
 async def create_task(
     params: TaskCreateRequest,
+    idempotency_key: str | None = Header(
+        default=None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Ключ идемпотентности: повторный запрос с тем же ключом "
+        "вернёт исходную задачу без создания новой",
+    ),
     task_service: TaskService = Depends(),
 ) -> TaskCreateResponse:
-    return await task_service.create_task(params=params)
+    return await task_service.create_task(
+        params=params, idempotency_key=idempotency_key
+    )
+
+
+@router.post("/batch", response_model=TasksBatchCreateResponse)
+async def create_tasks(
+    items: list[dict[str, Any]] = Body(
+        min_length=1,
+        max_length=settings.TASKS_BATCH_MAX_SIZE,
+        description="Список задач в формате TaskCreateRequest",
+    ),
+    task_service: TaskService = Depends(),
+) -> TasksBatchCreateResponse:
+    return await task_service.create_tasks(items=items)
 
 
-@router.get("/", response_model=TasksResponse)
+@router.get("/", response_model=TasksResponse | TasksFieldsResponse)
 async def get_tasks(
     pagination: BaseQueryPathFilters = Depends(),
     task_service: TaskService = Depends(),
-) -> TasksResponse:
+) -> TasksResponse | TasksFieldsResponse:
     return await task_service.get_tasks(pagination=pagination)
 
 
+@router.get("/events", response_class=StreamingResponse)
+async def stream_task_events(
+    task_ids: list[TaskId] = Query(
+        alias="task_id",
+        min_length=1,
+        max_length=settings.TASKS_EVENTS_MAX_IDS,
+        description="ID задач для подписки на изменения статуса",
+    ),
+    task_service: TaskService = Depends(),
+) -> StreamingResponse:
+    events = await task_service.stream_task_events(task_ids=task_ids)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: TaskId,
@@ -41,6 +87,19 @@ async def get_task(
     return await task_service.get_task(task_id=task_id)
 
 
+@router.get("/{task_id}/result", response_class=StreamingResponse)
+async def get_task_result(
+    task_id: TaskId,
+    task_service: TaskService = Depends(),
+) -> StreamingResponse:
+    chunks, size = await task_service.get_task_result(task_id=task_id)
+    return StreamingResponse(
+        chunks,
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Length": str(size)},
+    )
+
+
 @router.delete("/{task_id}", response_model=bool)
 async def delete_task(
     task_id: TaskId,
@@ -2,7 +2,11 @@ from .tasks import (
     TaskCreateRequest,
     TaskCreateResponse,
     TaskResponse,
+    TaskFieldsResponse,
+    TaskBatchError,
+    TasksBatchCreateResponse,
     TasksResponse,
+    TasksFieldsResponse,
 )
 from .types.tasks import TaskId
 from .base import BaseQueryPathFilters, Pagination
@@ -11,8 +15,12 @@ __all__ = (
     "TaskCreateRequest",
     "TaskCreateResponse",
     "TaskResponse",
+    "TaskFieldsResponse",
+    "TaskBatchError",
+    "TasksBatchCreateResponse",
     "TaskId",
     "BaseQueryPathFilters",
     "TasksResponse",
+    "TasksFieldsResponse",
     "Pagination",
 )
@@ -1,18 +1,50 @@
-from pydantic import BaseModel, Field
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Self
+
+from pydantic import BaseModel, Field, ValidationError
 from fastapi import Query
 
+from enums import CountType, PriorityType, StatusType
 from settings import settings
 
 
 class Pagination(BaseModel):
-    total: int = Field(
+    total: int | None = Field(
         description="Общее количество объектов",
         examples=[100],
     )
-    page_count: int = Field(
+    page_count: int | None = Field(
         description="Общее количество страниц",
         examples=[10],
     )
+    estimated: bool = Field(
+        default=False,
+        description="Количество объектов получено из статистики планировщика",
+        examples=[False],
+    )
+
+
+class PaginationCursor(BaseModel):
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> Self:
+        try:
+            return cls.model_validate_json(base64.urlsafe_b64decode(cursor.encode()))
+        except (
+            binascii.Error,
+            ValueError,
+            ValidationError,
+            json.JSONDecodeError,
+        ) as e:
+            raise ValueError("Некорректный курсор страницы") from e
 
 
 class PaginationParams(BaseModel):
@@ -24,10 +56,50 @@ class PaginationParams(BaseModel):
             settings.PAGINATION_PAGE_SIZE, ge=1, le=1000, description="Размер страницы"
         )
     )
+    cursor: str | None = Field(
+        Query(
+            None,
+            description="Курсор следующей страницы, при указании page не учитывается",
+        )
+    )
 
 
 class BaseQueryPathFilters(PaginationParams):
     count_only: bool = Field(Query(False, description="Только подсчет записей"))
+    count_type: CountType = Field(
+        Query(
+            CountType.EXACT,
+            description="Способ подсчета записей: точный, оценка планировщика или без подсчета",
+        )
+    )
     pagination_on: bool = Field(
         Query(True, description="Pagination включить/выключить")
     )
+    status: list[StatusType] | None = Field(
+        Query(None, description="Статусы задач, можно указать несколько")
+    )
+    priority: list[PriorityType] | None = Field(
+        Query(None, description="Приоритеты задач, можно указать несколько")
+    )
+    name_prefix: str | None = Field(
+        Query(None, min_length=1, max_length=255, description="Начало названия задачи")
+    )
+    created_from: datetime | None = Field(
+        Query(None, description="Время создания не раньше указанного")
+    )
+    created_to: datetime | None = Field(
+        Query(None, description="Время создания раньше указанного")
+    )
+    completed_from: datetime | None = Field(
+        Query(None, description="Время завершения не раньше указанного")
+    )
+    completed_to: datetime | None = Field(
+        Query(None, description="Время завершения раньше указанного")
+    )
+    fields: str | None = Field(
+        Query(
+            None,
+            description="Поля объекта через запятую, например id,status,created_at; "
+            "по умолчанию возвращаются все поля",
+        )
+    )
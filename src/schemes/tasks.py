@@ -1,6 +1,14 @@
 from datetime import datetime
 
-from pydantic import BaseModel, Field, field_serializer
+from pydantic import (
+    BaseModel,
+    Field,
+    SerializerFunctionWrapHandler,
+    create_model,
+    field_serializer,
+    model_serializer,
+    model_validator,
+)
 
 from enums import PriorityType, StatusType
 from schemes.base import Pagination
@@ -22,7 +30,25 @@ class TaskCreate(BaseModel):
     )
 
 
-class TaskCreateRequest(TaskCreate): ...
+class TaskCreateRequest(TaskCreate):
+    run_at: datetime | None = Field(
+        default=None,
+        description="Время запуска; время без часового пояса считается "
+        "локальным временем сервера",
+        examples=["2025-12-04 14:00:00"],
+    )
+    delay: float | None = Field(
+        default=None,
+        ge=0,
+        description="Задержка запуска в секундах",
+        examples=[300],
+    )
+
+    @model_validator(mode="after")
+    def check_schedule(self) -> "TaskCreateRequest":
+        if self.run_at is not None and self.delay is not None:
+            raise ValueError("Нельзя одновременно указать run_at и delay")
+        return self
 
 
 class TaskResponse(TaskCreate):
@@ -38,6 +64,11 @@ class TaskResponse(TaskCreate):
         description="Время создания",
         examples=["2025-12-04 12:10:00"],
     )
+    scheduled_at: datetime | None = Field(
+        default=None,
+        description="Время запланированного запуска",
+        examples=["2025-12-04 14:00:00"],
+    )
     stared_at: datetime | None = Field(
         default=None,
         description="Время начала",
@@ -53,13 +84,24 @@ class TaskResponse(TaskCreate):
         description="Результат выполнения",
         examples=["Пробирка 314123 готова"],
     )
+    result_ref: str | None = Field(
+        default=None,
+        description="Ссылка на результат, вынесенный из строки задачи; "
+        "сам результат отдаёт GET /tasks/{task_id}/result",
+        examples=["9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"],
+    )
+    result_size: int | None = Field(
+        default=None,
+        description="Размер результата в байтах",
+        examples=[21],
+    )
     error_info: str | None = Field(
         default="",
         description="Информация об ошибках",
         examples=["Сбой проверки кода пробирки"],
     )
 
-    @field_serializer("created_at", "stared_at", "completed_at")
+    @field_serializer("created_at", "scheduled_at", "stared_at", "completed_at")
     def serialize_date_time_to_str(field: datetime):
         if field:
             return field.strftime("%Y-%m-%d %H:%M:%S")
@@ -68,6 +110,67 @@ class TaskResponse(TaskCreate):
 class TaskCreateResponse(TaskResponse): ...
 
 
+class TaskFieldsBase(BaseModel):
+    @field_serializer(
+        "created_at", "scheduled_at", "stared_at", "completed_at", check_fields=False
+    )
+    def serialize_date_time_to_str(field: datetime | None):
+        if field:
+            return field.strftime("%Y-%m-%d %H:%M:%S")
+
+    @model_serializer(mode="wrap")
+    def serialize_selected_fields(self, handler: SerializerFunctionWrapHandler):
+        data = handler(self)
+        return {
+            name: value for name, value in data.items() if name in self.model_fields_set
+        }
+
+
+TaskFieldsResponse = create_model(
+    "TaskFieldsResponse",
+    __base__=TaskFieldsBase,
+    **{
+        name: (
+            field.annotation | None,
+            Field(default=None, description=field.description, examples=field.examples),
+        )
+        for name, field in TaskResponse.model_fields.items()
+    },
+)
+
+
+class TaskBatchError(BaseModel):
+    index: int = Field(
+        description="Порядковый номер задачи в запросе",
+        examples=[0],
+    )
+    detail: str = Field(
+        description="Описание ошибки",
+        examples=["name: Field required"],
+    )
+
+
+class TasksBatchCreateResponse(BaseModel):
+    ids: list[int | None] = Field(
+        description="Идентификаторы задач по порядковым номерам в запросе, "
+        "null для задач с ошибкой",
+        examples=[[129, None, 130]],
+    )
+    errors: list[TaskBatchError] = Field(
+        default_factory=list,
+        description="Ошибки по отдельным задачам",
+    )
+
+
 class TasksResponse(BaseModel):
     data: list[TaskResponse]
     pagination: Pagination
+    next_cursor: str | None = Field(
+        default=None,
+        description="Курсор следующей страницы",
+        examples=["eyJjcmVhdGVkX2F0IjoiMjAyNS0xMi0wNFQxMjoxMDowMCIsImlkIjoxMjl9"],
+    )
+
+
+class TasksFieldsResponse(TasksResponse):
+    data: list[TaskFieldsResponse]
@@ -1,3 +1,20 @@
+from .events import TaskEventsListener, task_events_listener
+from .idempotency import IdempotencyKeysCleaner, idempotency_keys_cleaner
+from .outbox import OutboxRelay, outbox_relay
+from .partitions import TaskPartitionManager, task_partition_manager
+from .scheduler import TaskScheduler, task_scheduler
 from .tasks import TaskService
 
-__all__ = ("TaskService",)
+__all__ = (
+    "IdempotencyKeysCleaner",
+    "OutboxRelay",
+    "TaskEventsListener",
+    "TaskPartitionManager",
+    "TaskScheduler",
+    "TaskService",
+    "idempotency_keys_cleaner",
+    "outbox_relay",
+    "task_events_listener",
+    "task_partition_manager",
+    "task_scheduler",
+)
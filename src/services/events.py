@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import sys
+from collections.abc import Iterable
+from contextlib import suppress
+from typing import Optional
+
+from engines import subscriber, tasks_cache
+from enums import ExchangeType
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+
+class TaskEventsListener:
+    def __init__(self) -> None:
+        self.subscriptions: dict[int, set[asyncio.Queue]] = {}
+        self.subscribed = False
+        self._subscribe_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, task_ids: Iterable[int]) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=settings.TASKS_EVENTS_QUEUE_SIZE)
+        for task_id in task_ids:
+            self.subscriptions.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_ids: Iterable[int], queue: asyncio.Queue) -> None:
+        for task_id in task_ids:
+            queues = self.subscriptions.get(task_id)
+            if queues is None:
+                continue
+            queues.discard(queue)
+            if not queues:
+                del self.subscriptions[task_id]
+
+    async def start(self) -> None:
+        if not await self._subscribe():
+            self._subscribe_task = asyncio.create_task(
+                self._resubscribe(), name="task-events-subscribe"
+            )
+
+    async def stop(self) -> None:
+        if self._subscribe_task is not None:
+            self._subscribe_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._subscribe_task
+            self._subscribe_task = None
+
+        self.subscribed = False
+        await subscriber.close()
+
+    async def handle(self, body: dict) -> None:
+        for event in body.get("events", []):
+            await tasks_cache.invalidate(event["id"])
+            for queue in self.subscriptions.get(event["id"], ()):
+                self._put(queue, event)
+
+    def resync(self) -> None:
+        for queue in {
+            queue for queues in self.subscriptions.values() for queue in queues
+        }:
+            self._reset(queue)
+
+    @classmethod
+    def _put(cls, queue: asyncio.Queue, event: dict) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            cls._reset(queue)
+            log.warning("Очередь событий подписчика переполнена, события сброшены")
+
+    @staticmethod
+    def _reset(queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def _subscribe(self) -> bool:
+        try:
+            await subscriber.subscribe(ExchangeType.TASK_EVENTS, self.handle)
+        except Exception as e:
+            log.error(f"Не удалось подписаться на события задач: {e}")
+            return False
+
+        self.subscribed = True
+        return True
+
+    async def _resubscribe(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TASKS_EVENTS_RETRY_INTERVAL)
+            if await self._subscribe():
+                log.info("Подписка на события задач восстановлена")
+                self.resync()
+                return
+
+
+task_events_listener = TaskEventsListener()
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import sys
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Optional
+
+from repositories import IdempotencyKeysRepository
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+
+class IdempotencyKeysCleaner:
+    def __init__(self) -> None:
+        self.ttl = timedelta(seconds=settings.TASKS_IDEMPOTENCY_KEY_TTL)
+        self.purge_interval = settings.TASKS_IDEMPOTENCY_PURGE_INTERVAL
+        self.batch_size = settings.TASKS_IDEMPOTENCY_PURGE_BATCH_SIZE
+        self.idempotency_repository: Optional[IdempotencyKeysRepository] = None
+        self._purge_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.idempotency_repository is None:
+            self.idempotency_repository = IdempotencyKeysRepository()
+
+        self._purge_task = asyncio.create_task(
+            self._run(), name="idempotency-keys-purge"
+        )
+
+    async def stop(self) -> None:
+        if self._purge_task is None:
+            return
+
+        self._purge_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._purge_task
+        self._purge_task = None
+
+    async def purge(self, now: datetime | None = None) -> int:
+        older_than = (now or datetime.now()) - self.ttl
+        purged = 0
+        while True:
+            batch = await self.idempotency_repository.purge_expired(
+                older_than=older_than, limit=self.batch_size
+            )
+            purged += batch
+            if batch < self.batch_size:
+                break
+
+        if purged:
+            log.info(f"Удалены устаревшие ключи идемпотентности: {purged}")
+
+        return purged
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.purge()
+            except Exception as e:
+                log.error(f"Ошибка удаления устаревших ключей идемпотентности: {e}")
+
+            await asyncio.sleep(self.purge_interval)
+
+
+idempotency_keys_cleaner = IdempotencyKeysCleaner()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import sys
+from contextlib import suppress
+from typing import Optional
+
+from engines import SpanContext, producer, tasks_cache, tracer
+from enums import ExchangeType, RoutingType, StatusType
+from repositories import OutboxRepository, TasksRepository
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+
+class OutboxRelay:
+    def __init__(self) -> None:
+        self.batch_size = settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.OUTBOX_POLL_INTERVAL
+        self.outbox_repository: Optional[OutboxRepository] = None
+        self.tasks_repository: Optional[TasksRepository] = None
+        self._wakeup = asyncio.Event()
+        self._relay_task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self.outbox_repository is None:
+            self.outbox_repository = OutboxRepository()
+        if self.tasks_repository is None:
+            self.tasks_repository = TasksRepository()
+
+        self._relay_task = asyncio.create_task(self._run(), name="outbox-relay")
+
+    async def stop(self) -> None:
+        if self._relay_task is None:
+            return
+
+        self._relay_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._relay_task
+        self._relay_task = None
+
+    async def relay_batch(self) -> int:
+        async with self.outbox_repository.transaction():
+            messages = await self.outbox_repository.get_batch(limit=self.batch_size)
+            if not messages:
+                return 0
+
+            task_ids = [
+                message.task_id
+                for message in messages
+                if message.task_id
+                and RoutingType.is_task_routing_key(message.routing_key)
+            ]
+            if task_ids:
+                await self.tasks_repository.set_tasks_status(
+                    task_ids=task_ids,
+                    status=StatusType.PENDING,
+                    from_status=StatusType.NEW,
+                )
+
+            spans = {
+                message.id: span
+                for message in messages
+                if (
+                    span := tracer.start_span(
+                        "task.publish",
+                        parent=SpanContext.from_headers(message.headers),
+                        task_id=message.task_id,
+                        routing_key=message.routing_key,
+                    )
+                )
+            }
+            batch = [
+                {
+                    "exchange": message.exchange,
+                    "routing_key": message.routing_key,
+                    "priority": message.priority,
+                    "body": message.body,
+                    "headers": (
+                        spans[message.id].context.to_headers()
+                        if message.id in spans
+                        else None
+                    ),
+                }
+                for message in messages
+            ]
+            if task_ids:
+                batch.append(
+                    {
+                        "exchange": ExchangeType.TASK_EVENTS,
+                        "routing_key": "",
+                        "priority": 0,
+                        "body": {
+                            "events": [
+                                {"id": task_id, "status": StatusType.PENDING}
+                                for task_id in task_ids
+                            ]
+                        },
+                    }
+                )
+            await producer.publish_batch(batch)
+            for span in spans.values():
+                tracer.end_span(span)
+
+            await self.outbox_repository.delete_messages(
+                [message.id for message in messages]
+            )
+
+        for task_id in task_ids:
+            await tasks_cache.invalidate(task_id)
+
+        return len(messages)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            try:
+                relayed = await self.relay_batch()
+            except Exception as e:
+                log.error(f"Ошибка публикации сообщений из outbox: {e}")
+                relayed = 0
+
+            if relayed >= self.batch_size:
+                continue
+
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+
+
+outbox_relay = OutboxRelay()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import sys
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Optional
+
+from repositories.partitions import (
+    TaskPartition,
+    TaskPartitionsRepository,
+    partition_bounds,
+    task_partition_map,
+)
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+
+class TaskPartitionManager:
+    def __init__(self) -> None:
+        self.interval = timedelta(days=settings.TASKS_PARTITION_INTERVAL_DAYS)
+        self.precreate = settings.TASKS_PARTITION_PRECREATE
+        self.retention = (
+            timedelta(days=settings.TASKS_PARTITION_RETENTION_DAYS)
+            if settings.TASKS_PARTITION_RETENTION_DAYS > 0
+            else None
+        )
+        self.archive_schema = settings.TASKS_PARTITION_ARCHIVE_SCHEMA
+        self.seal_delay = timedelta(seconds=settings.TASKS_PARTITION_SEAL_DELAY)
+        self.maintenance_interval = settings.TASKS_PARTITION_MAINTENANCE_INTERVAL
+        self.partitions_repository: Optional[TaskPartitionsRepository] = None
+        self._id_ranges: dict[str, tuple[int | None, int | None]] = {}
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.partitions_repository is None:
+            self.partitions_repository = TaskPartitionsRepository()
+
+        self._maintenance_task = asyncio.create_task(
+            self._run(), name="task-partitions"
+        )
+
+    async def stop(self) -> None:
+        if self._maintenance_task is None:
+            return
+
+        self._maintenance_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._maintenance_task
+        self._maintenance_task = None
+
+    async def maintain(self, now: datetime | None = None) -> list[TaskPartition]:
+        now = now or datetime.now()
+
+        async with self.partitions_repository.transaction():
+            if not await self.partitions_repository.is_partitioned():
+                task_partition_map.update([])
+                return []
+
+            partitions = await self.partitions_repository.get_partitions()
+            if await self.partitions_repository.try_lock():
+                await self.create_partitions(partitions, now)
+                await self.expire_partitions(partitions, now)
+                partitions = await self.partitions_repository.get_partitions()
+
+            await self.seal_partitions(partitions, now)
+
+        task_partition_map.update(partitions)
+        return partitions
+
+    async def create_partitions(
+        self, partitions: list[TaskPartition], now: datetime
+    ) -> None:
+        for offset in range(self.precreate + 1):
+            start, end = partition_bounds(now + offset * self.interval, self.interval)
+            if any(
+                (partition.start is None or partition.start < end)
+                and (partition.end is None or partition.end > start)
+                for partition in partitions
+            ):
+                continue
+
+            name = f"{self.partitions_repository.table}_p{start:%Y%m%d}"
+            await self.partitions_repository.create_partition(name, start, end)
+            log.info(f"Создана секция {name} [{start}, {end})")
+
+    async def expire_partitions(
+        self, partitions: list[TaskPartition], now: datetime
+    ) -> None:
+        if self.retention is None:
+            return
+
+        for partition in partitions:
+            if partition.end is None or partition.end > now - self.retention:
+                continue
+
+            await self.partitions_repository.detach_partition(partition.name)
+            if self.archive_schema:
+                await self.partitions_repository.archive_partition(
+                    partition.name, self.archive_schema
+                )
+                log.info(
+                    f"Секция {partition.name} перенесена в схему {self.archive_schema}"
+                )
+            else:
+                await self.partitions_repository.drop_partition(partition.name)
+                log.info(f"Секция {partition.name} удалена")
+            self._id_ranges.pop(partition.name, None)
+
+    async def seal_partitions(
+        self, partitions: list[TaskPartition], now: datetime
+    ) -> None:
+        for partition in partitions:
+            if partition.end is None or partition.end + self.seal_delay > now:
+                continue
+
+            partition.sealed = True
+            if partition.name not in self._id_ranges:
+                await self.partitions_repository.load_id_range(partition)
+                self._id_ranges[partition.name] = (partition.min_id, partition.max_id)
+            partition.min_id, partition.max_id = self._id_ranges[partition.name]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except Exception as e:
+                log.error(f"Ошибка обслуживания секций таблицы задач: {e}")
+
+            await asyncio.sleep(self.maintenance_interval)
+
+
+task_partition_manager = TaskPartitionManager()
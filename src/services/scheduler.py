@@ -0,0 +1,201 @@
+import asyncio
+import heapq
+import logging
+import sys
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Optional
+
+from engines import tasks_cache
+from enums import ExchangeType, Priority, PriorityType, RoutingType
+from models import TasksDB
+from repositories import OutboxRepository, TasksRepository
+from services.outbox import outbox_relay
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+
+class TaskScheduler:
+    def __init__(self) -> None:
+        self.batch_size = settings.SCHEDULER_BATCH_SIZE
+        self.load_batch_size = settings.SCHEDULER_LOAD_BATCH_SIZE
+        self.resync_interval = settings.SCHEDULER_RESYNC_INTERVAL
+        self.tasks_repository: Optional[TasksRepository] = None
+        self.outbox_repository: Optional[OutboxRepository] = None
+        self.timers: list[tuple[datetime, int]] = []
+        self.pending: dict[int, datetime] = {}
+        self.horizon: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
+
+    def schedule(self, task_id: int, run_at: datetime) -> None:
+        if self.pending.get(task_id) == run_at:
+            return
+        if self.horizon is not None and run_at > self.horizon:
+            # Дальние таймеры подтянет из базы следующая синхронизация.
+            self.cancel(task_id)
+            return
+
+        self.pending[task_id] = run_at
+        heapq.heappush(self.timers, (run_at, task_id))
+        if self.timers[0] == (run_at, task_id):
+            self._wakeup.set()
+        self._compact()
+
+    def cancel(self, task_id: int) -> None:
+        if self.pending.pop(task_id, None) is not None:
+            self._compact()
+
+    async def start(self) -> None:
+        if self.tasks_repository is None:
+            self.tasks_repository = TasksRepository()
+        if self.outbox_repository is None:
+            self.outbox_repository = OutboxRepository()
+
+        self._scheduler_task = asyncio.create_task(self._run(), name="task-scheduler")
+
+    async def stop(self) -> None:
+        if self._scheduler_task is None:
+            return
+
+        self._scheduler_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._scheduler_task
+        self._scheduler_task = None
+
+    async def load(self, until: datetime | None = None) -> int:
+        self.horizon = until
+        loaded = 0
+        after = None
+        while True:
+            rows = await self.tasks_repository.get_scheduled_tasks(
+                limit=self.load_batch_size, after=after, until=until
+            )
+            for task_id, scheduled_at in rows:
+                self.schedule(task_id, scheduled_at)
+            loaded += len(rows)
+
+            if len(rows) < self.load_batch_size:
+                return loaded
+            after = tuple(rows[-1])
+
+    async def release_due(self, now: datetime | None = None) -> int:
+        task_ids = self._pop_due(now or datetime.now())
+        if not task_ids:
+            return 0
+
+        try:
+            async with self.tasks_repository.transaction():
+                tasks = await self.tasks_repository.release_scheduled_tasks(
+                    list(task_ids)
+                )
+                if tasks:
+                    await self.outbox_repository.create_messages(
+                        rows=[self._build_message(task) for task in tasks]
+                    )
+        except Exception:
+            for task_id, run_at in task_ids.items():
+                self.schedule(task_id, run_at)
+            raise
+
+        for task in tasks:
+            await tasks_cache.invalidate(task.id)
+        if tasks:
+            outbox_relay.notify()
+
+        return len(task_ids)
+
+    def _pop_due(self, now: datetime) -> dict[int, datetime]:
+        due = {}
+        while self.timers and self.timers[0][0] <= now and len(due) < self.batch_size:
+            run_at, task_id = heapq.heappop(self.timers)
+            if self.pending.get(task_id) == run_at:
+                due[task_id] = self.pending.pop(task_id)
+        return due
+
+    def _load_horizon(self) -> datetime:
+        # Запас в один интервал, чтобы запоздавшая синхронизация не задержала
+        # таймеры, которые наступят до нее.
+        return datetime.now() + timedelta(seconds=2 * self.resync_interval)
+
+    def _compact(self) -> None:
+        stale = len(self.timers) - len(self.pending)
+        if stale <= len(self.timers) // 2:
+            return
+
+        self.timers = [
+            (run_at, task_id)
+            for run_at, task_id in self.timers
+            if self.pending.get(task_id) == run_at
+        ]
+        heapq.heapify(self.timers)
+
+    def _next_timeout(self) -> float:
+        while self.timers and self.pending.get(self.timers[0][1]) != self.timers[0][0]:
+            heapq.heappop(self.timers)
+
+        if not self.timers:
+            return self.resync_interval
+
+        delay = (self.timers[0][0] - datetime.now()).total_seconds()
+        return min(max(delay, 0.0), self.resync_interval)
+
+    async def _run(self) -> None:
+        resynced_at = None
+        while True:
+            self._wakeup.clear()
+
+            try:
+                if resynced_at is None:
+                    loaded = await self.load(until=self._load_horizon())
+                    log.info(f"Загружено отложенных задач: {loaded}")
+                    resynced_at = time.monotonic()
+                elif time.monotonic() - resynced_at >= self.resync_interval:
+                    await self.load(until=self._load_horizon())
+                    resynced_at = time.monotonic()
+
+                released = await self.release_due()
+            except Exception as e:
+                log.error(f"Ошибка запуска отложенных задач: {e}")
+                await asyncio.sleep(settings.SCHEDULER_RETRY_INTERVAL)
+                continue
+
+            if released >= self.batch_size:
+                continue
+
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self._next_timeout()
+                )
+
+    @staticmethod
+    def _build_message(task: TasksDB) -> dict:
+        return {
+            "task_id": task.id,
+            "exchange": ExchangeType.TASKS,
+            "routing_key": TaskScheduler._get_task_routing_key(task.priority),
+            "priority": Priority.get_priority_value(task.priority),
+            "body": {
+                "id": task.id,
+                "name": task.name,
+                "description": task.description,
+                "priority": task.priority,
+                "created_at": task.created_at.isoformat(),
+                "scheduled_at": task.scheduled_at.isoformat(),
+            },
+            "headers": None,
+        }
+
+    @staticmethod
+    def _get_task_routing_key(priority: PriorityType) -> str:
+        if settings.TASKS_PRIORITY_QUEUES:
+            return RoutingType.get_task_routing_key(priority)
+        return RoutingType.TASK
+
+
+task_scheduler = TaskScheduler()
@@ -1,68 +1,227 @@
+import asyncio
+import hashlib
+import json
+import zlib
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
 from http import HTTPStatus
+from typing import Any
 
 from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 
 from dependencies import container
-from engines import producer
-from enums import PriorityType, StatusType, ExchangeType, RoutingType, Priority
-from repositories import TasksRepository
+from engines import CacheEngine, idempotency_cache, producer, tasks_cache, tracer
+from enums import (
+    PriorityType,
+    StatusType,
+    ExchangeType,
+    RoutingType,
+    Priority,
+    TaskField,
+    TERMINAL_STATUSES,
+)
+from repositories import (
+    IdempotencyKeysRepository,
+    OutboxRepository,
+    TaskResultsRepository,
+    TasksRepository,
+)
 from schemes import (
     TaskCreateRequest,
     TaskCreateResponse,
     TaskResponse,
+    TaskFieldsResponse,
+    TaskBatchError,
+    TasksBatchCreateResponse,
     TasksResponse,
+    TasksFieldsResponse,
     BaseQueryPathFilters,
     TaskId,
 )
+from schemes.base import PaginationCursor
+from services.events import task_events_listener
+from services.outbox import outbox_relay
+from services.scheduler import task_scheduler
+from settings import settings
 
 
 class TaskService:
     def __init__(self):
         self.tasks_repository: TasksRepository = container.resolve(TasksRepository)
+        self.outbox_repository: OutboxRepository = container.resolve(OutboxRepository)
+        self.results_repository: TaskResultsRepository = container.resolve(
+            TaskResultsRepository
+        )
+        self.idempotency_repository: IdempotencyKeysRepository = container.resolve(
+            IdempotencyKeysRepository
+        )
+        self.tasks_cache: CacheEngine = tasks_cache
+        self.idempotency_cache: CacheEngine = idempotency_cache
 
     async def create_task(
         self,
         *,
         params: TaskCreateRequest,
+        idempotency_key: str | None = None,
     ) -> TaskCreateResponse:
-        create_params = {**params.model_dump(), "status": StatusType.NEW}
-        task = await self.tasks_repository.create(**create_params)
+        request_hash = None
+        if idempotency_key is not None:
+            request_hash = self._get_request_hash(params)
+            if response := await self._get_idempotent_response(
+                key=idempotency_key, request_hash=request_hash
+            ):
+                return response
 
-        task_id = task.id
-        await producer.publish(
-            exchange=ExchangeType.TASKS,
-            routing_key=RoutingType.TASK,
-            priority=Priority.get_priority_value(params.priority),
-            body={"id": task_id, "priority": params.priority},
-        )
+        try:
+            response = await self._create_task(
+                params=params,
+                idempotency_key=idempotency_key,
+                request_hash=request_hash,
+            )
+        except IntegrityError:
+            if idempotency_key is None or not (
+                response := await self._get_idempotent_response(
+                    key=idempotency_key, request_hash=request_hash
+                )
+            ):
+                raise
+            return response
 
-        await self.tasks_repository.set_task_status(
-            task_id=task_id, status=StatusType.PENDING
-        )
+        if idempotency_key is not None:
+            await self.idempotency_cache.set(
+                idempotency_key,
+                (request_hash, response),
+                settings.TASKS_IDEMPOTENCY_CACHE_TTL,
+            )
+        if response.status == StatusType.SCHEDULED:
+            task_scheduler.schedule(response.id, response.scheduled_at)
+        else:
+            outbox_relay.notify()
+
+        return response
+
+    async def create_tasks(
+        self,
+        *,
+        items: list[dict[str, Any]],
+    ) -> TasksBatchCreateResponse:
+        ids: list[int | None] = [None] * len(items)
+        indexes: list[int] = []
+        params: list[TaskCreateRequest] = []
+        errors: list[TaskBatchError] = []
+        for index, item in enumerate(items):
+            try:
+                params.append(TaskCreateRequest.model_validate(item))
+                indexes.append(index)
+            except ValidationError as e:
+                errors.append(
+                    TaskBatchError(index=index, detail=self._format_errors(e))
+                )
+
+        if not params:
+            return TasksBatchCreateResponse(ids=ids, errors=errors)
+
+        now = datetime.now()
+        rows = [self._get_create_params(item, now) for item in params]
+        with tracer.trace("task.create_batch", size=len(params)) as span:
+            async with self.tasks_repository.transaction():
+                with tracer.span("task.insert"):
+                    tasks = await self.tasks_repository.create_tasks(rows=rows)
+                headers = span.context.to_headers() if span else None
+                released = [
+                    (task, item)
+                    for task, item, row in zip(tasks, params, rows)
+                    if row["status"] != StatusType.SCHEDULED
+                ]
+                if released:
+                    await self.outbox_repository.create_messages(
+                        rows=[
+                            {
+                                "task_id": task.id,
+                                "exchange": ExchangeType.TASKS,
+                                "routing_key": self._get_task_routing_key(
+                                    item.priority
+                                ),
+                                "priority": Priority.get_priority_value(item.priority),
+                                "body": {
+                                    "id": task.id,
+                                    "name": item.name,
+                                    "description": item.description,
+                                    "priority": item.priority,
+                                    "created_at": task.created_at.isoformat(),
+                                },
+                                "headers": headers,
+                            }
+                            for task, item in released
+                        ]
+                    )
+
+        for task, row in zip(tasks, rows):
+            if row["status"] == StatusType.SCHEDULED:
+                task_scheduler.schedule(task.id, row["scheduled_at"])
+        if released:
+            outbox_relay.notify()
+
+        for index, task in zip(indexes, tasks):
+            ids[index] = task.id
 
-        return TaskCreateResponse(**task.__dict__)
+        return TasksBatchCreateResponse(ids=ids, errors=errors)
+
+    async def get_tasks(
+        self, *, pagination: BaseQueryPathFilters
+    ) -> TasksResponse | TasksFieldsResponse:
+        cursor = fields = None
+        try:
+            if pagination.cursor:
+                cursor = PaginationCursor.decode(pagination.cursor)
+            if pagination.fields is not None:
+                fields = TaskField.parse(pagination.fields)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail=str(e)
+            ) from e
 
-    async def get_tasks(self, *, pagination: BaseQueryPathFilters) -> TasksResponse:
         tasks, pagination_info = await self.tasks_repository.get_tasks(
-            pagination=pagination
+            pagination=pagination, fields=fields, cursor=cursor
         )
 
+        next_cursor = None
+        if pagination.pagination_on and len(tasks) == pagination.page_size:
+            last_task = tasks[-1]
+            next_cursor = PaginationCursor(
+                created_at=last_task.created_at, id=last_task.id
+            ).encode()
+
+        if fields:
+            return TasksFieldsResponse(
+                data=[
+                    TaskFieldsResponse(**{name: getattr(task, name) for name in fields})
+                    for task in tasks
+                ],
+                pagination=pagination_info,
+                next_cursor=next_cursor,
+            )
+
         data = [TaskResponse(**task.__dict__) for task in tasks]
-        return TasksResponse(data=data, pagination=pagination_info)
+        return TasksResponse(
+            data=data, pagination=pagination_info, next_cursor=next_cursor
+        )
 
     async def get_task(
         self,
         *,
         task_id: TaskId,
     ) -> TaskResponse:
-        task = await self.tasks_repository.get_by(id=task_id)
+        task = await self._get_cached_task(task_id=task_id)
         if not task:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f"Задача с номером {task_id} не найдена",
             )
 
-        return TaskResponse(**task.__dict__)
+        return task
 
     async def delete_task(
         self,
@@ -76,19 +235,30 @@ class TaskService:
                 detail=f"Задача с номером {task_id} не найдена",
             )
 
-        if task.status in [
-            StatusType.COMPLETED,
-            StatusType.FAILED,
-            StatusType.CANCELLED,
-        ]:
+        if task.status in TERMINAL_STATUSES:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=f"Задача с номером {task_id} уже завершилась",
             )
 
+        if task.status == StatusType.SCHEDULED and (
+            await self.tasks_repository.cancel_scheduled_task(
+                task_id=task_id, completed_at=datetime.now()
+            )
+        ):
+            task_scheduler.cancel(task_id)
+            await self.tasks_cache.invalidate(task_id)
+            await producer.publish(
+                exchange=ExchangeType.TASK_EVENTS,
+                routing_key="",
+                priority=0,
+                body={"events": [{"id": task_id, "status": StatusType.CANCELLED}]},
+            )
+            return True
+
         await producer.publish(
-            exchange=ExchangeType.TASKS,
-            routing_key=RoutingType.TASK_CANCELED,
+            exchange=ExchangeType.TASK_CANCELS,
+            routing_key="",
             priority=Priority.get_priority_value(PriorityType.HIGH),
             body={"id": task_id},
         )
@@ -100,7 +270,7 @@ class TaskService:
         *,
         task_id: TaskId,
     ) -> StatusType:
-        task = await self.tasks_repository.get_by(id=task_id)
+        task = await self._get_cached_task(task_id=task_id)
         if not task:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
@@ -108,3 +278,238 @@ class TaskService:
             )
 
         return StatusType(task.status)
+
+    async def get_task_result(
+        self,
+        *,
+        task_id: TaskId,
+    ) -> tuple[AsyncIterator[bytes], int]:
+        task = await self.tasks_repository.get_by(id=task_id)
+        if not task:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail=f"Задача с номером {task_id} не найдена",
+            )
+
+        if task.result_ref and await self.results_repository.exists(
+            digest=task.result_ref
+        ):
+            return self._iter_stored_result(digest=task.result_ref), task.result_size
+
+        if not task.result:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail=f"Результат задачи с номером {task_id} отсутствует",
+            )
+
+        data = task.result.encode("utf-8")
+        return self._iter_inline_result(data=data), len(data)
+
+    async def stream_task_events(
+        self,
+        *,
+        task_ids: list[TaskId],
+    ) -> AsyncIterator[str]:
+        task_ids = list(dict.fromkeys(task_ids))
+        queue = task_events_listener.subscribe(task_ids)
+        try:
+            statuses = await self._get_task_statuses(task_ids=task_ids)
+            if missing := [task_id for task_id in task_ids if task_id not in statuses]:
+                raise HTTPException(
+                    status_code=HTTPStatus.NOT_FOUND,
+                    detail=f"Задачи с номерами {missing} не найдены",
+                )
+        except BaseException:
+            task_events_listener.unsubscribe(task_ids, queue)
+            raise
+
+        return self._iter_task_events(task_ids=task_ids, statuses=statuses, queue=queue)
+
+    async def _iter_task_events(
+        self,
+        *,
+        task_ids: list[TaskId],
+        statuses: dict[int, StatusType],
+        queue: asyncio.Queue,
+    ) -> AsyncIterator[str]:
+        sent: dict[int, StatusType] = {}
+        try:
+            while True:
+                for task_id, status in statuses.items():
+                    if sent.get(task_id) != status:
+                        sent[task_id] = status
+                        yield self._format_task_event(task_id, status)
+
+                pending = [
+                    task_id
+                    for task_id in task_ids
+                    if sent[task_id] not in TERMINAL_STATUSES
+                ]
+                if not pending:
+                    return
+
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.TASKS_EVENTS_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    if task_events_listener.subscribed:
+                        continue
+                    event = None
+
+                if event is None:
+                    statuses = await self._get_task_statuses(task_ids=pending)
+                else:
+                    statuses = {event["id"]: StatusType(event["status"])}
+        finally:
+            task_events_listener.unsubscribe(task_ids, queue)
+
+    async def _iter_stored_result(self, *, digest: str) -> AsyncIterator[bytes]:
+        chunk_size = settings.TASKS_RESULT_CHUNK_SIZE
+        decompressor = zlib.decompressobj()
+        async for chunk in self.results_repository.iter_chunks(digest, chunk_size):
+            data = decompressor.decompress(chunk, chunk_size)
+            while data:
+                yield data
+                data = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+
+        if data := decompressor.flush():
+            yield data
+
+    @staticmethod
+    async def _iter_inline_result(*, data: bytes) -> AsyncIterator[bytes]:
+        yield data
+
+    async def _create_task(
+        self,
+        *,
+        params: TaskCreateRequest,
+        idempotency_key: str | None,
+        request_hash: str | None,
+    ) -> TaskCreateResponse:
+        create_params = self._get_create_params(params, datetime.now())
+        with tracer.trace("task.create", priority=params.priority) as span:
+            async with self.tasks_repository.transaction():
+                with tracer.span("task.insert"):
+                    task = await self.tasks_repository.create(**create_params)
+
+                task_id = task.id
+                if task.status != StatusType.SCHEDULED:
+                    await self.outbox_repository.create(
+                        task_id=task_id,
+                        exchange=ExchangeType.TASKS,
+                        routing_key=self._get_task_routing_key(params.priority),
+                        priority=Priority.get_priority_value(params.priority),
+                        body={
+                            "id": task_id,
+                            "name": params.name,
+                            "description": params.description,
+                            "priority": params.priority,
+                            "created_at": task.created_at.isoformat(),
+                        },
+                        headers=span.context.to_headers() if span else None,
+                    )
+
+                response = TaskCreateResponse(**task.__dict__)
+                if idempotency_key is not None:
+                    await self.idempotency_repository.create_key(
+                        key=idempotency_key,
+                        request_hash=request_hash,
+                        task_id=task_id,
+                        response=response.model_dump(mode="json"),
+                    )
+
+            if span:
+                span.set_attribute("task_id", task_id)
+
+        return response
+
+    @staticmethod
+    def _get_create_params(params: TaskCreateRequest, now: datetime) -> dict:
+        scheduled_at = params.run_at
+        if params.delay is not None:
+            scheduled_at = now + timedelta(seconds=params.delay)
+        elif scheduled_at is not None and scheduled_at.tzinfo is not None:
+            scheduled_at = scheduled_at.astimezone().replace(tzinfo=None)
+
+        return {
+            **params.model_dump(exclude={"run_at", "delay"}),
+            "status": (
+                StatusType.SCHEDULED
+                if scheduled_at is not None and scheduled_at > now
+                else StatusType.NEW
+            ),
+            "scheduled_at": scheduled_at,
+        }
+
+    async def _get_idempotent_response(
+        self, *, key: str, request_hash: str
+    ) -> TaskCreateResponse | None:
+        cached = await self.idempotency_cache.get(key)
+        if cached is None:
+            record = await self.idempotency_repository.get_key(key)
+            if record is None:
+                return None
+
+            cached = (record.request_hash, TaskCreateResponse(**record.response))
+            await self.idempotency_cache.set(
+                key, cached, settings.TASKS_IDEMPOTENCY_CACHE_TTL
+            )
+
+        stored_hash, response = cached
+        if stored_hash != request_hash:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail=f"Ключ идемпотентности {key} уже использован "
+                f"для другого запроса",
+            )
+
+        return response
+
+    @staticmethod
+    def _get_request_hash(params: TaskCreateRequest) -> str:
+        body = json.dumps(params.model_dump(mode="json"), sort_keys=True)
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    async def _get_task_statuses(
+        self, *, task_ids: list[TaskId]
+    ) -> dict[int, StatusType]:
+        tasks = await self.tasks_repository.get_tasks_by_ids(task_ids=task_ids)
+        return {task.id: StatusType(task.status) for task in tasks}
+
+    @staticmethod
+    def _get_task_routing_key(priority: PriorityType) -> str:
+        if settings.TASKS_PRIORITY_QUEUES:
+            return RoutingType.get_task_routing_key(priority)
+        return RoutingType.TASK
+
+    @staticmethod
+    def _format_errors(error: ValidationError) -> str:
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}"
+            for item in error.errors()
+        )
+
+    @staticmethod
+    def _format_task_event(task_id: int, status: StatusType) -> str:
+        data = json.dumps({"id": task_id, "status": status})
+        return f"event: status\ndata: {data}\n\n"
+
+    async def _get_cached_task(self, *, task_id: TaskId) -> TaskResponse | None:
+        async def load_task() -> TaskResponse | None:
+            task = await self.tasks_repository.get_by(id=task_id)
+            return TaskResponse(**task.__dict__) if task else None
+
+        if not task_events_listener.subscribed:
+            return await load_task()
+
+        return await self.tasks_cache.get_or_load(
+            task_id, load_task, self._get_cache_ttl
+        )
+
+    @staticmethod
+    def _get_cache_ttl(task: TaskResponse) -> float | None:
+        if task.status in TERMINAL_STATUSES:
+            return None
+        return settings.TASKS_CACHE_TTL
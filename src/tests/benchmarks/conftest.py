@@ -0,0 +1,35 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from tests.benchmarks.harness import BenchmarkReport, load_worker, write_results
+
+BENCHMARKS_ROOT = Path(__file__).resolve().parent
+DEFAULT_RESULTS_PATH = BENCHMARKS_ROOT.parents[2] / "benchmark-results.json"
+
+
+def pytest_collection_modifyitems(config, items):
+    if "slow" in (config.option.markexpr or ""):
+        return
+
+    skip = pytest.mark.skip(reason="Нагрузочные тесты запускаются через -m slow")
+    for item in items:
+        if BENCHMARKS_ROOT in Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def worker():
+    return load_worker()
+
+
+@pytest.fixture(scope="session")
+def benchmark_results():
+    reports: list[BenchmarkReport] = []
+    yield reports
+
+    if reports:
+        write_results(
+            os.environ.get("BENCHMARK_RESULTS", str(DEFAULT_RESULTS_PATH)), reports
+        )
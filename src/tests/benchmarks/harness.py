@@ -0,0 +1,299 @@
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import ExitStack, asynccontextmanager
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from aio_pika.abc import ExchangeType as pika_exchange_type
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel, Field
+
+from engines import producer
+from engines.memory_broker import MemoryBrokerEngine
+from enums import DatabaseBackend, ExchangeType, StatusType
+from local import import_worker_tree
+from main import app
+from repositories import OutboxRepository, TasksRepository
+from services.outbox import outbox_relay
+from settings import settings
+
+NOOP_HANDLER = "benchmark_noop"
+CPU_HANDLER = "benchmark_cpu"
+TERMINAL_STATUSES = {StatusType.COMPLETED, StatusType.FAILED, StatusType.CANCELLED}
+
+
+class BenchmarkScenario(BaseModel):
+    name: str
+    tasks: int = Field(default=500, ge=1)
+    arrival_rate: float = Field(default=500.0, gt=0)
+    poisson: bool = False
+    priority_mix: dict[str, float] = {"LOW": 1.0}
+    handler: str = NOOP_HANDLER
+    cpu_iterations: int = 20_000
+    ack_on_completion: bool = False
+    memoize: bool = False
+    timeout: float = 60.0
+    seed: int = 42
+
+
+class LatencySummary(BaseModel):
+    p50: float
+    p99: float
+    max: float
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "LatencySummary":
+        ordered = sorted(samples) or [0.0]
+        return cls(
+            p50=round(percentile(ordered, 50) * 1000, 3),
+            p99=round(percentile(ordered, 99) * 1000, 3),
+            max=round(ordered[-1] * 1000, 3),
+        )
+
+
+class BenchmarkReport(BaseModel):
+    scenario: BenchmarkScenario
+    submitted: int
+    completed: int
+    duration: float
+    throughput: float
+    submit_latency_ms: LatencySummary
+    e2e_latency_ms: LatencySummary
+    e2e_latency_ms_by_priority: dict[str, LatencySummary]
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def load_worker() -> SimpleNamespace:
+    worker = import_worker_tree()
+    worker.cpu_iterations = 0
+    register_stub_handlers(worker)
+    return worker
+
+
+def register_stub_handlers(worker: SimpleNamespace) -> None:
+    registry: Any = worker.handlers.handlers
+    mode: Any = worker.enums.ExecutionMode
+
+    @registry.register(NOOP_HANDLER, mode.ASYNC)
+    async def noop(task: dict) -> str:
+        return "ok"
+
+    @registry.register(CPU_HANDLER, mode.THREAD)
+    def cpu(task: dict, is_cancelled: Callable[[], bool]) -> str:
+        total = 0
+        for value in range(worker.cpu_iterations):
+            total += value * value
+        return str(total)
+
+
+class BenchmarkRunner:
+    def __init__(
+        self, worker: SimpleNamespace, scenario: BenchmarkScenario, database: Path
+    ) -> None:
+        self.worker = worker
+        self.scenario = scenario
+        self.database = database
+        self.random = random.Random(scenario.seed)
+        self.broker = MemoryBrokerEngine()
+        self.submitted: dict[int, tuple[float, str]] = {}
+        self.submit_latencies: list[float] = []
+        self.completed: dict[int, float] = {}
+        self.all_completed = asyncio.Event()
+
+    async def run(self) -> BenchmarkReport:
+        with ExitStack() as stack:
+            for backend_settings in (settings, self.worker.settings):
+                stack.enter_context(
+                    patch.object(
+                        backend_settings, "DATABASE_BACKEND", DatabaseBackend.SQLITE
+                    )
+                )
+                stack.enter_context(
+                    patch.object(backend_settings, "SQLITE_PATH", str(self.database))
+                )
+            stack.enter_context(patch.object(producer, "connector", self.broker))
+            stack.enter_context(
+                patch.object(self.worker.consumer.producer, "connector", self.broker)
+            )
+            stack.enter_context(
+                patch.object(
+                    self.worker, "cpu_iterations", self.scenario.cpu_iterations
+                )
+            )
+            stack.enter_context(
+                patch.object(
+                    self.worker.settings,
+                    "TASKS_RESULT_MEMO_HANDLERS",
+                    [self.scenario.handler] if self.scenario.memoize else [],
+                )
+            )
+
+            repositories = {
+                TasksRepository: TasksRepository(),
+                OutboxRepository: OutboxRepository(),
+            }
+            await repositories[TasksRepository].db.create_schema()
+            outbox_relay.tasks_repository = repositories[TasksRepository]
+            outbox_relay.outbox_repository = repositories[OutboxRepository]
+            stack.enter_context(
+                patch("dependencies.container.resolve", side_effect=repositories.get)
+            )
+
+            try:
+                async with self._worker():
+                    await outbox_relay.start()
+                    try:
+                        started_at = time.perf_counter()
+                        await self._submit_all()
+                        await asyncio.wait_for(
+                            self.all_completed.wait(), timeout=self.scenario.timeout
+                        )
+                        duration = max(self.completed.values()) - started_at
+                    finally:
+                        await outbox_relay.stop()
+            finally:
+                outbox_relay.tasks_repository = outbox_relay.outbox_repository = None
+                for repository in repositories.values():
+                    await repository.db.engine.dispose()
+
+        return self._report(duration)
+
+    @asynccontextmanager
+    async def _worker(self) -> AsyncIterator[None]:
+        task_consumer = self.worker.consumer.TaskConsumer(
+            queue_name=ExchangeType.TASKS, max_workers=1
+        )
+        task_consumer.tasks_repository.add_flush_listener(self._record_completions)
+
+        engine = self.worker.rabbitmq.ConsumerEngine()
+        engine.connector = self.broker
+        queue_name = self.worker.enums.RoutingType.TASK
+        await self.worker.consumer.producer.setup_exchange(
+            exchange_name=ExchangeType.TASK_EVENTS,
+            exchange_type=pika_exchange_type.FANOUT,
+        )
+        await engine.setup_queue(
+            queue_name=queue_name, exchange_name=ExchangeType.TASKS, max_priority=3
+        )
+        engine.set_callback(
+            queue_name=queue_name,
+            callback=task_consumer.process_message,
+            ack_on_completion=self.scenario.ack_on_completion,
+        )
+        credits = task_consumer.credits
+        if self.scenario.ack_on_completion:
+            credits.add_listener(
+                lambda free: engine.set_prefetch(queue_name, credits.used + free)
+            )
+        else:
+            credits.add_listener(partial(engine.set_prefetch, queue_name))
+
+        await engine.consume_multiple([queue_name])
+        try:
+            yield
+        finally:
+            await engine.stop_consuming()
+            await task_consumer.stop()
+            for repository in (
+                task_consumer.tasks_repository,
+                task_consumer.results_repository,
+            ):
+                await repository.db.engine.dispose()
+
+    async def _submit_all(self) -> None:
+        priorities = list(self.scenario.priority_mix)
+        weights = list(self.scenario.priority_mix.values())
+        started_at = time.perf_counter()
+        next_arrival = 0.0
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://benchmark"
+        ) as client:
+            submissions = []
+            for index in range(self.scenario.tasks):
+                delay = next_arrival - (time.perf_counter() - started_at)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                priority = self.random.choices(priorities, weights)[0]
+                submissions.append(
+                    asyncio.create_task(self._submit(client, index, priority))
+                )
+                next_arrival += self._interarrival()
+
+            await asyncio.gather(*submissions)
+
+    async def _submit(self, client: AsyncClient, index: int, priority: str) -> None:
+        submitted_at = time.perf_counter()
+        response = await client.post(
+            "/api/v1/tasks/",
+            json={
+                "name": self.scenario.handler,
+                "description": self.scenario.name,
+                "priority": priority,
+            },
+        )
+        self.submit_latencies.append(time.perf_counter() - submitted_at)
+        response.raise_for_status()
+        self.submitted[response.json()["id"]] = (submitted_at, priority)
+
+    def _interarrival(self) -> float:
+        if self.scenario.poisson:
+            return self.random.expovariate(self.scenario.arrival_rate)
+        return 1 / self.scenario.arrival_rate
+
+    async def _record_completions(self, updates: dict[int, dict]) -> None:
+        now = time.perf_counter()
+        for task_id, fields in updates.items():
+            if fields.get("status") in TERMINAL_STATUSES:
+                self.completed.setdefault(task_id, now)
+
+        if len(self.completed) >= self.scenario.tasks:
+            self.all_completed.set()
+
+    def _report(self, duration: float) -> BenchmarkReport:
+        e2e: dict[str, list[float]] = {}
+        for task_id, completed_at in self.completed.items():
+            submitted_at, priority = self.submitted[task_id]
+            e2e.setdefault(priority, []).append(completed_at - submitted_at)
+
+        return BenchmarkReport(
+            scenario=self.scenario,
+            submitted=len(self.submitted),
+            completed=len(self.completed),
+            duration=round(duration, 3),
+            throughput=round(len(self.completed) / duration, 1),
+            submit_latency_ms=LatencySummary.from_samples(self.submit_latencies),
+            e2e_latency_ms=LatencySummary.from_samples(
+                [latency for latencies in e2e.values() for latency in latencies]
+            ),
+            e2e_latency_ms_by_priority={
+                priority: LatencySummary.from_samples(latencies)
+                for priority, latencies in sorted(e2e.items())
+            },
+        )
+
+
+def write_results(path: str, reports: list[BenchmarkReport]) -> None:
+    document = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": [report.model_dump(mode="json") for report in reports],
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,55 @@
+import pytest
+
+from tests.benchmarks.harness import (
+    CPU_HANDLER,
+    BenchmarkRunner,
+    BenchmarkScenario,
+)
+
+SCENARIOS = [
+    BenchmarkScenario(name="noop_constant", tasks=1000, arrival_rate=1000.0),
+    BenchmarkScenario(
+        name="noop_poisson_priority_mix",
+        tasks=1000,
+        arrival_rate=1000.0,
+        poisson=True,
+        priority_mix={"HIGH": 0.2, "MEDIUM": 0.3, "LOW": 0.5},
+    ),
+    BenchmarkScenario(
+        name="noop_ack_on_completion",
+        tasks=1000,
+        arrival_rate=1000.0,
+        ack_on_completion=True,
+    ),
+    BenchmarkScenario(
+        name="cpu_bound_priority_mix",
+        tasks=300,
+        arrival_rate=300.0,
+        poisson=True,
+        priority_mix={"HIGH": 0.2, "MEDIUM": 0.3, "LOW": 0.5},
+        handler=CPU_HANDLER,
+        cpu_iterations=50_000,
+    ),
+    BenchmarkScenario(
+        name="cpu_bound_memoized",
+        tasks=300,
+        arrival_rate=300.0,
+        handler=CPU_HANDLER,
+        cpu_iterations=50_000,
+        memoize=True,
+    ),
+]
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda scenario: scenario.name)
+async def test_throughput(worker, benchmark_results, scenario, tmp_path):
+    report = await BenchmarkRunner(worker, scenario, tmp_path / "tasks.db").run()
+    benchmark_results.append(report)
+
+    assert report.submitted == scenario.tasks
+    assert report.completed == scenario.tasks
+    assert report.throughput > 0
+    assert report.submit_latency_ms.p50 <= report.submit_latency_ms.p99
+    assert report.e2e_latency_ms.p50 <= report.e2e_latency_ms.p99
@@ -14,13 +14,17 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.engine import ChunkedIteratorResult
 
 from models import Base
-from repositories import TasksRepository
+from repositories import OutboxRepository, TasksRepository
 from engines import ProducerEngine
 from settings import settings
 from main import app
 
 
 class CustomAsyncSession(AsyncSession):
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        yield self
+
     async def execute(
         self, stmt, execution_options=None, no_return=False, return_many=False, **kwargs
     ):
@@ -74,9 +78,13 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 
         async with session_factory() as session:
             with patch("dependencies.container.resolve") as mock_resolve:
-                repository = TasksRepository()
-                repository.db = session
-                mock_resolve.return_value = repository
+                repositories = {
+                    TasksRepository: TasksRepository(),
+                    OutboxRepository: OutboxRepository(),
+                }
+                for repository in repositories.values():
+                    repository.db = session
+                mock_resolve.side_effect = repositories.get
 
                 try:
                     yield session
@@ -1,7 +1,8 @@
 import pytest
+from sqlalchemy import select
 
-from enums import StatusType, PriorityType
-from models import TasksDB
+from enums import RoutingType, StatusType, PriorityType
+from models import OutboxDB, TasksDB
 
 
 @pytest.mark.integration
@@ -26,7 +27,7 @@ class TestTasksAPI:
         assert response["name"] == task_json["name"]
         assert response["description"] == task_json["description"]
         assert response["priority"] == task_json["priority"]
-        assert response["status"] == StatusType.PENDING
+        assert response["status"] == StatusType.NEW
 
         task_id = response["id"]
         db_task = await db_session.get(TasksDB, task_id)
@@ -35,4 +36,15 @@ class TestTasksAPI:
         assert db_task.name == task_json["name"]
         assert db_task.description == task_json["description"]
         assert db_task.priority.value == task_json["priority"]
-        assert db_task.status == StatusType.PENDING
+        assert db_task.status == StatusType.NEW
+
+        outbox_messages = await db_session.execute(
+            select(OutboxDB).where(OutboxDB.task_id == task_id), return_many=True
+        )
+
+        assert len(outbox_messages) == 1
+        assert outbox_messages[0].routing_key == RoutingType.TASK
+        assert outbox_messages[0].body == {
+            "id": task_id,
+            "priority": task_json["priority"],
+        }
@@ -1,7 +1,7 @@
 import os
 import sys
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from datetime import datetime
@@ -9,10 +9,17 @@ from types import SimpleNamespace
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from repositories import TasksRepository
+from repositories import (
+    IdempotencyKeysRepository,
+    OutboxRepository,
+    TaskPartitionsRepository,
+    TaskResultsRepository,
+    TasksRepository,
+)
 from enums import StatusType, PriorityType
-from engines import ProducerEngine
-from services import TaskService
+from engines import CacheEngine, ProducerEngine
+from engines.cache_storage import MemoryCacheBackend
+from services import TaskService, task_events_listener
 
 
 @pytest.fixture
@@ -21,6 +28,8 @@ def mock_db_session():
     session.select = AsyncMock()
     session.select_one = AsyncMock()
     session.execute = AsyncMock()
+    session.transaction = MagicMock()
+    session.transaction.return_value.__aenter__.return_value = session
     return session
 
 
@@ -34,9 +43,53 @@ def tasks_repository(mock_db_session):
 
 
 @pytest.fixture
-def tasks_service(tasks_repository):
-    with patch("dependencies.container.resolve", return_value=tasks_repository):
+def outbox_repository(mock_db_session):
+    repo = OutboxRepository()
+    repo.db = mock_db_session
+    repo.create = AsyncMock()
+    return repo
+
+
+@pytest.fixture
+def results_repository(mock_db_session):
+    repo = TaskResultsRepository()
+    repo.db = mock_db_session
+    return repo
+
+
+@pytest.fixture
+def partitions_repository(mock_db_session):
+    repo = TaskPartitionsRepository()
+    repo.db = mock_db_session
+    return repo
+
+
+@pytest.fixture
+def idempotency_repository(mock_db_session):
+    repo = IdempotencyKeysRepository()
+    repo.db = mock_db_session
+    repo.get_key = AsyncMock(return_value=None)
+    repo.create_key = AsyncMock()
+    return repo
+
+
+@pytest.fixture
+def tasks_service(
+    tasks_repository, outbox_repository, results_repository, idempotency_repository
+):
+    repositories = {
+        TasksRepository: tasks_repository,
+        OutboxRepository: outbox_repository,
+        TaskResultsRepository: results_repository,
+        IdempotencyKeysRepository: idempotency_repository,
+    }
+    with (
+        patch("dependencies.container.resolve", side_effect=repositories.get),
+        patch.object(task_events_listener, "subscribed", True),
+    ):
         service = TaskService()
+        service.tasks_cache = CacheEngine(local=MemoryCacheBackend(max_size=100))
+        service.idempotency_cache = CacheEngine(local=MemoryCacheBackend(max_size=100))
         yield service
 
 
@@ -75,5 +128,7 @@ def mock_task():
     task.stared_at = datetime(2025, 1, 1, 10, 30, 0)
     task.completed_at = datetime(2025, 1, 1, 10, 40, 0)
     task.result = "Result"
+    task.result_ref = None
+    task.result_size = 6
     task.error_info = ""
     return task
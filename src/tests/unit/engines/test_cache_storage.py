@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from engines import CacheEngine
+from engines.cache_storage import MemoryCacheBackend
+
+
+@pytest.fixture
+def cache():
+    return CacheEngine(local=MemoryCacheBackend(max_size=2))
+
+
+class TestMemoryCacheBackend:
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        backend = MemoryCacheBackend(max_size=2)
+
+        await backend.set(1, "first", ttl=None)
+        await backend.set(2, "second", ttl=None)
+        assert await backend.get(1) == "first"
+
+        await backend.set(3, "third", ttl=None)
+
+        assert await backend.get(2) is None
+        assert await backend.get(1) == "first"
+        assert await backend.get(3) == "third"
+
+    @pytest.mark.asyncio
+    async def test_expires_by_ttl(self):
+        backend = MemoryCacheBackend(max_size=10)
+
+        with patch("engines.cache_storage.time.monotonic", return_value=100.0):
+            await backend.set(1, "value", ttl=1.0)
+            await backend.set(2, "terminal", ttl=None)
+
+        with patch("engines.cache_storage.time.monotonic", return_value=101.5):
+            assert await backend.get(1) is None
+            assert await backend.get(2) == "terminal"
+
+
+class TestCacheEngine:
+    @pytest.mark.asyncio
+    async def test_get_or_load_coalesces_concurrent_misses(self, cache):
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "task"
+
+        loader = AsyncMock(side_effect=load)
+
+        waiters = [
+            asyncio.create_task(cache.get_or_load(1, loader, lambda _: None))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*waiters) == ["task"] * 5
+        loader.assert_called_once()
+        assert await cache.get(1) == "task"
+
+    @pytest.mark.asyncio
+    async def test_get_or_load_does_not_cache_missing(self, cache):
+        loader = AsyncMock(return_value=None)
+
+        assert await cache.get_or_load(1, loader, lambda _: None) is None
+        assert await cache.get_or_load(1, loader, lambda _: None) is None
+
+        assert loader.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, cache):
+        await cache.set(1, "task", ttl=None)
+
+        await cache.invalidate(1)
+
+        assert await cache.get(1) is None
+
+    @pytest.mark.asyncio
+    async def test_uses_shared_backend(self):
+        shared = MemoryCacheBackend(max_size=10)
+        cache = CacheEngine(local=MemoryCacheBackend(max_size=10), shared=shared)
+        await shared.set(1, "shared", ttl=None)
+
+        loader = AsyncMock(return_value="db")
+
+        assert await cache.get_or_load(1, loader, lambda _: None) == "shared"
+        loader.assert_not_called()
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from aio_pika import Message
+from aio_pika.abc import ExchangeType as pika_exchange_type
+
+from engines.memory_broker import MemoryBrokerEngine
+
+
+@pytest.fixture
+def broker():
+    return MemoryBrokerEngine()
+
+
+async def drain() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def declare(broker, queue_name="tasks", **arguments):
+    channel = await broker.get_channel()
+    exchange = await channel.declare_exchange("exchange", pika_exchange_type.TOPIC)
+    queue = await channel.declare_queue(queue_name, arguments=arguments or None)
+    await queue.bind(exchange, queue_name)
+    return channel, exchange, queue
+
+
+class TestMemoryBrokerEngine:
+    async def test_delivers_higher_priority_first(self, broker):
+        channel, exchange, queue = await declare(broker, **{"x-max-priority": 3})
+        for priority in (1, 3, 2):
+            await exchange.publish(
+                Message(body=str(priority).encode(), priority=priority),
+                routing_key="tasks",
+            )
+
+        received = []
+
+        async def on_message(message):
+            received.append(message.body.decode())
+            await message.ack()
+
+        await channel.set_qos(prefetch_count=1)
+        await queue.consume(on_message)
+        await drain()
+
+        assert received == ["3", "2", "1"]
+
+    async def test_respects_prefetch_until_ack(self, broker):
+        channel, exchange, queue = await declare(broker)
+        for index in range(3):
+            await exchange.publish(Message(body=str(index).encode()), "tasks")
+
+        received = []
+
+        async def on_message(message):
+            received.append(message)
+
+        await channel.set_qos(prefetch_count=2, global_=True)
+        await queue.consume(on_message)
+        await drain()
+
+        assert [message.body for message in received] == [b"0", b"1"]
+
+        await received[1].ack(multiple=True)
+        await drain()
+
+        assert [message.body for message in received] == [b"0", b"1", b"2"]
+        assert list(channel.unacked) == [received[2].delivery_tag]
+
+    async def test_requeues_unacked_on_channel_close(self, broker):
+        channel, exchange, queue = await declare(broker)
+        await exchange.publish(Message(body=b"task"), "tasks")
+
+        await queue.consume(lambda message: asyncio.sleep(0))
+        await drain()
+        await channel.close()
+
+        redelivered = []
+        other_channel = await broker.get_channel()
+        other_queue = await other_channel.get_queue("tasks")
+        await other_queue.consume(
+            lambda message: asyncio.sleep(0, redelivered.append(message.redelivered))
+        )
+        await drain()
+
+        assert redelivered == [True]
+
+    async def test_fanout_copies_to_every_bound_queue(self, broker):
+        channel = await broker.get_channel()
+        exchange = await channel.declare_exchange("events", pika_exchange_type.FANOUT)
+        received = {}
+        for _ in range(2):
+            queue = await channel.declare_queue(exclusive=True)
+            await queue.bind(exchange)
+            await queue.consume(
+                lambda message, name=queue.name: asyncio.sleep(
+                    0, received.setdefault(name, message.body)
+                ),
+                no_ack=True,
+            )
+
+        await exchange.publish(Message(body=b"event"), routing_key="")
+        await drain()
+
+        assert list(received.values()) == [b"event", b"event"]
+
+    async def test_raises_for_undeclared_exchange(self, broker):
+        channel = await broker.get_channel()
+
+        with pytest.raises(LookupError):
+            await channel.get_exchange("missing")
@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import patch
+
+from engines.metrics import Metric, MetricsRegistry, RequestMetricsMiddleware
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestMetricsRegistry:
+    def test_renders_counter_with_labels(self, registry):
+        counter = registry.counter("requests_total", "Запросы", labels=("method",))
+
+        counter.inc("GET")
+        counter.inc("GET")
+        counter.inc("POST", amount=3)
+
+        output = registry.render()
+
+        assert "# TYPE requests_total counter" in output
+        assert 'requests_total{method="GET"} 2.0' in output
+        assert 'requests_total{method="POST"} 3.0' in output
+
+    def test_renders_cumulative_histogram_buckets(self, registry):
+        histogram = registry.histogram(
+            "duration_seconds", "Длительность", labels=("route",), buckets=(0.1, 1.0)
+        )
+
+        histogram.observe(0.05, "/tasks")
+        histogram.observe(0.5, "/tasks")
+        histogram.observe(5.0, "/tasks")
+
+        output = registry.render()
+
+        assert 'duration_seconds_bucket{route="/tasks",le="0.1"} 1' in output
+        assert 'duration_seconds_bucket{route="/tasks",le="1.0"} 2' in output
+        assert 'duration_seconds_bucket{route="/tasks",le="+Inf"} 3' in output
+        assert 'duration_seconds_count{route="/tasks"} 3' in output
+
+    def test_gauge_uses_collect_callback(self, registry):
+        registry.gauge(
+            "in_flight",
+            "Выполняемые",
+            labels=("tier",),
+            collect=lambda: {("async",): 4},
+        )
+
+        assert 'in_flight{tier="async"} 4' in registry.render()
+
+    def test_rejects_duplicate_metric(self, registry):
+        registry.counter("requests_total", "Запросы")
+
+        with pytest.raises(ValueError):
+            registry.counter("requests_total", "Запросы")
+
+    def test_metric_requires_samples(self):
+        with pytest.raises(TypeError):
+            Metric("untyped", "Без выборок")
+
+
+class TestRequestMetricsMiddleware:
+    @staticmethod
+    async def call(content_type: bytes) -> None:
+        async def app(scope, receive, send):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", content_type)],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        scope = {"type": "http", "method": "GET"}
+        await RequestMetricsMiddleware(app)(scope, None, send)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "content_type, streaming",
+        [
+            (b"application/json", False),
+            (b"text/event-stream; charset=utf-8", True),
+        ],
+    )
+    async def test_event_streams_are_recorded_separately(self, content_type, streaming):
+        with (
+            patch("engines.metrics.http_request_duration") as requests,
+            patch("engines.metrics.http_stream_duration") as streams,
+        ):
+            await self.call(content_type)
+
+        assert requests.observe.called is not streaming
+        assert streams.observe.called is streaming
+        histogram = streams if streaming else requests
+        assert histogram.observe.call_args.args[1:] == ("GET", "unmatched", "200")
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from engines.tracing import JsonLinesSpanExporter, SpanContext, SpanExporter, Tracer
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    return JsonLinesSpanExporter(str(tmp_path / "traces.jsonl"))
+
+
+@pytest.fixture
+def tracer(exporter):
+    tracer = Tracer(sample_rate=1.0, buffer_size=100)
+    tracer.set_exporter(exporter)
+    return tracer
+
+
+def read_spans(exporter):
+    with open(exporter.path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+class TestSpanContext:
+    def test_round_trips_through_headers(self):
+        context = SpanContext(trace_id="a" * 32, span_id="b" * 16)
+
+        restored = SpanContext.from_headers(context.to_headers())
+
+        assert restored.trace_id == context.trace_id
+        assert restored.span_id == context.span_id
+        assert restored.sampled is True
+
+    @pytest.mark.parametrize(
+        "headers", [None, {}, {"traceparent": "broken"}, {"traceparent": b"00-1-2-01"}]
+    )
+    def test_ignores_missing_or_invalid_header(self, headers):
+        assert SpanContext.from_headers(headers) is None
+
+
+class TestTracer:
+    def test_nested_spans_share_trace(self, tracer, exporter):
+        with tracer.trace("task.create") as root:
+            with tracer.span("task.insert") as child:
+                pass
+        tracer.flush()
+
+        spans = {span["name"]: span for span in read_spans(exporter)}
+        assert spans["task.insert"]["trace_id"] == root.context.trace_id
+        assert spans["task.insert"]["parent_id"] == root.context.span_id
+        assert spans["task.insert"]["span_id"] == child.context.span_id
+        assert spans["task.create"]["parent_id"] is None
+
+    def test_continues_remote_parent(self, tracer, exporter):
+        parent = SpanContext(trace_id="c" * 32, span_id="d" * 16)
+
+        with tracer.span("task.consume", parent=parent):
+            pass
+        tracer.flush()
+
+        [span] = read_spans(exporter)
+        assert span["trace_id"] == parent.trace_id
+        assert span["parent_id"] == parent.span_id
+
+    def test_head_sampling_drops_whole_trace(self, exporter):
+        tracer = Tracer(sample_rate=0.0, buffer_size=100)
+        tracer.set_exporter(exporter)
+
+        with tracer.trace("task.create") as root:
+            with tracer.span("task.insert") as child:
+                pass
+
+        assert root is None
+        assert child is None
+        assert tracer.buffer == []
+
+    def test_span_without_parent_is_not_recorded(self, tracer):
+        with tracer.span("task.consume") as span:
+            pass
+
+        assert span is None
+        assert tracer.buffer == []
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_in_thread_inside_event_loop(self, tracer, exporter):
+        with tracer.trace("task.create"):
+            pass
+        tracer.flush()
+
+        assert tracer.buffer == []
+        await asyncio.gather(*tracer.exports)
+        [span] = read_spans(exporter)
+        assert span["name"] == "task.create"
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_inflight_exports(self, tracer, exporter):
+        export = exporter.export
+
+        def slow_export(spans):
+            time.sleep(0.05)
+            export(spans)
+
+        exporter.export = slow_export
+        with tracer.trace("task.create"):
+            pass
+        tracer.flush()
+        with tracer.trace("task.cancel"):
+            pass
+
+        await tracer.close()
+
+        assert [span["name"] for span in read_spans(exporter)] == [
+            "task.create",
+            "task.cancel",
+        ]
+
+    def test_exporter_requires_export(self):
+        with pytest.raises(TypeError):
+            SpanExporter()
@@ -0,0 +1,66 @@
+import io
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "alembic.ini"
+)
+REVISION = "5d2a9c4e7f13"
+
+
+def render_sql(action, *args) -> str:
+    buffer = io.StringIO()
+    action(Config(ALEMBIC_INI, output_buffer=buffer), *args, sql=True)
+    return buffer.getvalue()
+
+
+def statement_positions(sql: str, statements: list[str]) -> list[int]:
+    positions = [sql.find(statement) for statement in statements]
+    assert -1 not in positions, statements[positions.index(-1)]
+    return positions
+
+
+class TestPartitionTasksMigration:
+    def test_upgrade_attaches_legacy_table(self):
+        sql = render_sql(command.upgrade, REVISION)
+
+        positions = statement_positions(
+            sql,
+            [
+                "CREATE TABLE IF NOT EXISTS tasks (",
+                "ALTER TABLE tasks RENAME TO tasks_legacy",
+                "PARTITION BY RANGE (created_at)",
+                "ATTACH PARTITION tasks_legacy FOR VALUES FROM (MINVALUE)",
+                "PARTITION OF tasks",
+            ],
+        )
+        assert positions == sorted(positions)
+
+    def test_downgrade_restores_plain_table(self):
+        sql = render_sql(command.downgrade, f"{REVISION}:base")
+
+        positions = statement_positions(
+            sql,
+            [
+                "ALTER TABLE tasks DETACH PARTITION tasks_legacy",
+                "INSERT INTO tasks_legacy SELECT * FROM tasks",
+                "ALTER SEQUENCE tasks_id_seq OWNED BY tasks_legacy.id",
+                "EXECUTE format('DROP TABLE %I', partition_name)",
+                "DROP TABLE tasks;",
+                "ALTER TABLE tasks_legacy DROP CONSTRAINT tasks_legacy_pkey",
+                "ALTER TABLE tasks_legacy RENAME TO tasks",
+                "ALTER TABLE tasks ADD CONSTRAINT tasks_pkey PRIMARY KEY (id)",
+            ],
+        )
+        assert positions == sorted(positions)
+        assert "CREATE TABLE tasks_legacy" not in sql
+
+    @pytest.mark.parametrize(
+        "action, revision",
+        [(command.upgrade, "head"), (command.downgrade, "head:base")],
+    )
+    def test_full_chain_renders(self, action, revision):
+        assert render_sql(action, revision).rstrip().endswith("COMMIT;")
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from repositories.partitions import (
+    TaskPartition,
+    TaskPartitionMap,
+    partition_bounds,
+)
+
+
+def compile_conditions(conditions) -> list[str]:
+    return [
+        str(
+            condition.compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        for condition in conditions
+    ]
+
+
+@pytest.fixture
+def partition_map():
+    partition_map = TaskPartitionMap()
+    partition_map.update(
+        [
+            TaskPartition("tasks_legacy", None, datetime(2026, 10, 1), True, 1, 100),
+            TaskPartition(
+                "tasks_p20261001",
+                datetime(2026, 10, 1),
+                datetime(2026, 10, 2),
+                True,
+                98,
+                200,
+            ),
+            TaskPartition(
+                "tasks_p20261002", datetime(2026, 10, 2), datetime(2026, 10, 3)
+            ),
+        ]
+    )
+    return partition_map
+
+
+class TestTaskPartitionMap:
+    def test_prunes_to_sealed_partition(self, partition_map):
+        conditions = partition_map.created_at_conditions([150])
+
+        assert compile_conditions(conditions) == [
+            "tasks.created_at >= '2026-10-01 00:00:00'",
+            "tasks.created_at < '2026-10-02 00:00:00'",
+        ]
+
+    def test_spans_overlapping_sealed_partitions(self, partition_map):
+        conditions = partition_map.created_at_conditions([99])
+
+        assert compile_conditions(conditions) == [
+            "tasks.created_at < '2026-10-02 00:00:00'",
+        ]
+
+    def test_falls_back_to_open_partitions(self, partition_map):
+        conditions = partition_map.created_at_conditions([150, 500])
+
+        assert compile_conditions(conditions) == [
+            "tasks.created_at >= '2026-10-01 00:00:00'",
+            "tasks.created_at < '2026-10-03 00:00:00'",
+        ]
+
+    def test_no_conditions_without_sealed_partitions(self):
+        assert TaskPartitionMap().created_at_conditions([1]) == []
+
+
+class TestTaskPartitionsRepository:
+    def test_from_bound(self):
+        partition = TaskPartition.from_bound(
+            "tasks_legacy",
+            "FOR VALUES FROM (MINVALUE) TO ('2026-10-01 00:00:00')",
+        )
+
+        assert partition.start is None
+        assert partition.end == datetime(2026, 10, 1)
+
+    def test_partition_bounds(self):
+        start, end = partition_bounds(datetime(2026, 10, 18, 13, 45), timedelta(days=1))
+
+        assert (start, end) == (datetime(2026, 10, 18), datetime(2026, 10, 19))
+
+    def test_rejects_unsafe_table_name(self, partitions_repository):
+        with pytest.raises(ValueError):
+            partitions_repository._quote('tasks"; DROP TABLE tasks; --')
+
+    @pytest.mark.asyncio
+    async def test_get_partitions(self, partitions_repository, mock_db_session):
+        mock_db_session.select.return_value = [
+            (
+                "tasks_p20261002",
+                "FOR VALUES FROM ('2026-10-02 00:00:00') TO ('2026-10-03 00:00:00')",
+            ),
+            (
+                "tasks_legacy",
+                "FOR VALUES FROM (MINVALUE) TO ('2026-10-02 00:00:00')",
+            ),
+        ]
+
+        partitions = await partitions_repository.get_partitions()
+
+        assert [partition.name for partition in partitions] == [
+            "tasks_legacy",
+            "tasks_p20261002",
+        ]
@@ -1,10 +1,15 @@
+from datetime import datetime, timezone
+
 import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import asyncpg
 from sqlalchemy.sql.dml import Update
 from unittest.mock import MagicMock
 
-from enums import StatusType
+from enums import CountType, PriorityType, StatusType, TaskField
 from models import TasksDB
 from schemes import BaseQueryPathFilters
+from schemes.base import PaginationCursor
 
 
 class TestTasksRepository:
@@ -19,10 +24,48 @@ class TestTasksRepository:
 
         assert isinstance(call_args, Update)
 
+    @pytest.mark.asyncio
+    async def test_create_tasks_joins_on_allocated_ids(
+        self, tasks_repository, mock_db_session
+    ):
+        rows = [
+            {"name": "First", "priority": PriorityType.HIGH, "status": StatusType.NEW},
+            {"name": "Second", "priority": PriorityType.LOW, "status": StatusType.NEW},
+        ]
+        first, second = MagicMock(spec=TasksDB), MagicMock(spec=TasksDB)
+        first.id, second.id = 11, 10
+        mock_db_session.execute.side_effect = [[11, 10], [second, first]]
+
+        tasks = await tasks_repository.create_tasks(rows=rows)
+
+        assert tasks == [first, second]
+        allocate, stmt = (
+            call.args[0] for call in mock_db_session.execute.call_args_list
+        )
+        assert "nextval(pg_get_serial_sequence(" in str(allocate)
+        assert [
+            value
+            for key, value in stmt.compile().params.items()
+            if key.startswith("id")
+        ] == [11, 10]
+
     @pytest.mark.asyncio
     async def test_get_tasks(self, tasks_repository, mock_db_session):
         pagination = BaseQueryPathFilters(
-            page=1, page_size=25, count_only=False, pagination_on=True
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=False,
+            count_type=CountType.EXACT,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
         )
 
         mock_task1 = MagicMock(spec=TasksDB)
@@ -39,6 +82,9 @@ class TestTasksRepository:
 
         tasks, pagination_info = await tasks_repository.get_tasks(pagination)
         assert mock_db_session.execute.call_count == 2
+        mock_db_session.transaction.assert_called_once_with(
+            isolation_level="REPEATABLE READ"
+        )
 
         assert len(tasks) == 2
         assert tasks[0].id == 1
@@ -46,3 +92,206 @@ class TestTasksRepository:
 
         assert pagination_info.total == 10
         assert pagination_info.page_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_selects_only_requested_columns(
+        self, tasks_repository, mock_db_session
+    ):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=False,
+            count_type=CountType.NONE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
+        )
+        mock_db_session.select.return_value = [MagicMock()]
+
+        tasks, _ = await tasks_repository.get_tasks(
+            pagination, fields=[TaskField.STATUS]
+        )
+
+        mock_db_session.execute.assert_not_called()
+        stmt = mock_db_session.select.call_args[0][0]
+        assert mock_db_session.select.call_args.kwargs == {"no_scalars": True}
+        assert [column.name for column in stmt.selected_columns] == [
+            "id",
+            "created_at",
+            "status",
+        ]
+        assert len(tasks) == 1
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_estimated_count(self, tasks_repository, mock_db_session):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=True,
+            count_type=CountType.ESTIMATE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
+        )
+
+        mock_db_session.execute.side_effect = [50_000_000]
+
+        tasks, pagination_info = await tasks_repository.get_tasks(pagination)
+        assert mock_db_session.execute.call_count == 1
+
+        assert tasks == []
+        assert pagination_info.total == 50_000_000
+        assert pagination_info.page_count == 2_000_000
+        assert pagination_info.estimated
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_estimate_falls_back_to_exact_count(
+        self, tasks_repository, mock_db_session
+    ):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=True,
+            count_type=CountType.ESTIMATE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
+        )
+
+        mock_db_session.execute.side_effect = [-1, [10]]
+
+        _, pagination_info = await tasks_repository.get_tasks(pagination)
+        assert mock_db_session.execute.call_count == 2
+
+        assert pagination_info.total == 10
+        assert not pagination_info.estimated
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_by_cursor(self, tasks_repository, mock_db_session):
+        cursor = PaginationCursor(created_at=datetime(2025, 1, 1, 10, 20, 0), id=129)
+        pagination = BaseQueryPathFilters(
+            page=1000,
+            page_size=25,
+            cursor=cursor.encode(),
+            count_only=False,
+            count_type=CountType.NONE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
+        )
+
+        mock_db_session.execute.side_effect = [[]]
+
+        tasks, pagination_info = await tasks_repository.get_tasks(
+            pagination, cursor=cursor
+        )
+        assert mock_db_session.execute.call_count == 1
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "(tasks.created_at, tasks.id) < (" in sql
+        assert "OFFSET" not in sql
+
+        assert tasks == []
+        assert pagination_info.total is None
+        assert pagination_info.page_count is None
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_applies_filters(self, tasks_repository, mock_db_session):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=False,
+            count_type=CountType.NONE,
+            pagination_on=True,
+            status=[StatusType.FAILED, StatusType.IN_PROGRESS],
+            priority=[PriorityType.HIGH],
+            name_prefix="send_%",
+            created_from=datetime(2025, 1, 1),
+            created_to=datetime(2025, 1, 31, 12, tzinfo=timezone.utc),
+            completed_from=None,
+            completed_to=datetime(2025, 2, 1),
+            fields=None,
+        )
+
+        mock_db_session.execute.side_effect = [[]]
+
+        await tasks_repository.get_tasks(pagination)
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = str(
+            stmt.compile(
+                dialect=asyncpg.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        created_to = (
+            datetime(2025, 1, 31, 12, tzinfo=timezone.utc)
+            .astimezone()
+            .replace(tzinfo=None)
+        )
+        assert "tasks.status IN ('FAILED', 'IN_PROGRESS')" in sql
+        assert "tasks.priority IN ('HIGH')" in sql
+        assert "tasks.name LIKE" in sql
+        assert r"send\_\%%" in stmt.compile().params.values()
+        assert "tasks.created_at >= '2025-01-01 00:00:00'" in sql
+        assert "tasks.completed_at < '2025-02-01 00:00:00'" in sql
+        assert f"tasks.created_at < '{created_to}'" in sql
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_estimates_filtered_count_from_plan(
+        self, tasks_repository, mock_db_session
+    ):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=True,
+            count_type=CountType.ESTIMATE,
+            pagination_on=True,
+            status=[StatusType.FAILED],
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
+        )
+        mock_db_session.engine = MagicMock(dialect=postgresql.dialect())
+        mock_db_session.execute.side_effect = [[{"Plan": {"Plan Rows": 250_000}}]]
+
+        tasks, pagination_info = await tasks_repository.get_tasks(pagination)
+
+        explain = str(mock_db_session.execute.call_args[0][0])
+        assert explain.startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert "tasks.status IN ('FAILED')" in explain
+        assert pagination_info.total == 250_000
+        assert pagination_info.estimated
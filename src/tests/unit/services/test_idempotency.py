@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+from unittest.mock import AsyncMock
+
+from services import IdempotencyKeysCleaner
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+@pytest.fixture
+def idempotency_keys_cleaner(idempotency_repository):
+    cleaner = IdempotencyKeysCleaner()
+    cleaner.ttl = timedelta(hours=1)
+    cleaner.batch_size = 2
+    cleaner.idempotency_repository = idempotency_repository
+    return cleaner
+
+
+class TestIdempotencyKeysCleaner:
+    @pytest.mark.asyncio
+    async def test_purge_deletes_expired_keys_in_batches(
+        self, idempotency_keys_cleaner, idempotency_repository
+    ):
+        idempotency_repository.purge_expired = AsyncMock(side_effect=[2, 1])
+
+        assert await idempotency_keys_cleaner.purge(now=NOW) == 3
+
+        idempotency_repository.purge_expired.assert_awaited_with(
+            older_than=NOW - timedelta(hours=1), limit=2
+        )
+        assert idempotency_repository.purge_expired.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_purge_expired_statement(
+        self, idempotency_repository, mock_db_session
+    ):
+        mock_db_session.execute.return_value = ["key"]
+
+        assert await idempotency_repository.purge_expired(older_than=NOW, limit=10) == 1
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=asyncpg.dialect()))
+        assert sql.startswith("DELETE FROM task_idempotency_keys")
+        assert "task_idempotency_keys.created_at < $" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import AsyncMock
+
+from enums import ExchangeType, RoutingType, StatusType
+from services import OutboxRelay
+
+
+@pytest.fixture
+def outbox_relay(tasks_repository, outbox_repository):
+    relay = OutboxRelay()
+    relay.tasks_repository = tasks_repository
+    relay.outbox_repository = outbox_repository
+    return relay
+
+
+@pytest.fixture
+def outbox_producer(producer_engine, monkeypatch):
+    producer_engine.publish_batch = AsyncMock()
+    monkeypatch.setattr("services.outbox.producer", producer_engine)
+    return producer_engine
+
+
+class TestOutboxRelay:
+    @pytest.mark.asyncio
+    async def test_relay_batch(
+        self, outbox_relay, tasks_repository, outbox_repository, outbox_producer
+    ):
+        messages = [
+            SimpleNamespace(
+                id=message_id,
+                task_id=task_id,
+                exchange=ExchangeType.TASKS,
+                routing_key=RoutingType.TASK,
+                priority=1,
+                body={"id": task_id, "priority": "LOW"},
+                headers=None,
+            )
+            for message_id, task_id in ((1, 10), (2, 11))
+        ]
+        outbox_repository.get_batch = AsyncMock(return_value=messages)
+        outbox_repository.delete_messages = AsyncMock()
+        tasks_repository.set_tasks_status = AsyncMock()
+
+        relayed = await outbox_relay.relay_batch()
+
+        assert relayed == 2
+
+        tasks_repository.set_tasks_status.assert_called_once_with(
+            task_ids=[10, 11], status=StatusType.PENDING, from_status=StatusType.NEW
+        )
+
+        outbox_producer.publish_batch.assert_called_once()
+        published = outbox_producer.publish_batch.call_args.args[0]
+        tasks, events = published[:-1], published[-1]
+        assert [message["body"]["id"] for message in tasks] == [10, 11]
+        assert all(message["routing_key"] == RoutingType.TASK for message in tasks)
+        assert events["exchange"] == ExchangeType.TASK_EVENTS
+        assert events["body"]["events"] == [
+            {"id": 10, "status": StatusType.PENDING},
+            {"id": 11, "status": StatusType.PENDING},
+        ]
+
+        outbox_repository.delete_messages.assert_called_once_with([1, 2])
+
+    @pytest.mark.asyncio
+    async def test_relay_batch_keeps_messages_on_publish_error(
+        self, outbox_relay, tasks_repository, outbox_repository, outbox_producer
+    ):
+        message = SimpleNamespace(
+            id=1,
+            task_id=10,
+            exchange=ExchangeType.TASKS,
+            routing_key=RoutingType.TASK,
+            priority=1,
+            body={"id": 10, "priority": "LOW"},
+            headers=None,
+        )
+        outbox_repository.get_batch = AsyncMock(return_value=[message])
+        outbox_repository.delete_messages = AsyncMock()
+        tasks_repository.set_tasks_status = AsyncMock()
+        outbox_producer.publish_batch.side_effect = ConnectionError("broker down")
+
+        with pytest.raises(ConnectionError):
+            await outbox_relay.relay_batch()
+
+        outbox_repository.delete_messages.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_relay_batch_empty(
+        self, outbox_relay, outbox_repository, outbox_producer
+    ):
+        outbox_repository.get_batch = AsyncMock(return_value=[])
+
+        assert await outbox_relay.relay_batch() == 0
+
+        outbox_producer.publish_batch.assert_not_called()
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import AsyncMock
+
+from repositories.partitions import TaskPartition, task_partition_map
+from services import TaskPartitionManager
+
+
+@pytest.fixture
+def partition_manager(partitions_repository):
+    manager = TaskPartitionManager()
+    manager.precreate = 1
+    manager.retention = timedelta(days=7)
+    manager.seal_delay = timedelta(hours=1)
+    manager.partitions_repository = partitions_repository
+    partitions_repository.is_partitioned = AsyncMock(return_value=True)
+    partitions_repository.try_lock = AsyncMock(return_value=True)
+    partitions_repository.create_partition = AsyncMock()
+    partitions_repository.detach_partition = AsyncMock()
+    partitions_repository.archive_partition = AsyncMock()
+    partitions_repository.drop_partition = AsyncMock()
+    return manager
+
+
+def day(number: int) -> datetime:
+    return datetime(2026, 10, number)
+
+
+class TestTaskPartitionManager:
+    @pytest.mark.asyncio
+    async def test_maintain(self, partition_manager, partitions_repository):
+        partitions = [
+            TaskPartition("tasks_legacy", None, day(2)),
+            TaskPartition("tasks_p20261017", day(17), day(18)),
+            TaskPartition("tasks_p20261018", day(18), day(19)),
+        ]
+        partitions_repository.get_partitions = AsyncMock(
+            side_effect=[partitions, partitions[1:]]
+        )
+
+        async def load_id_range(partition):
+            partition.min_id, partition.max_id = 10, 20
+
+        partitions_repository.load_id_range = AsyncMock(side_effect=load_id_range)
+
+        await partition_manager.maintain(now=datetime(2026, 10, 18, 12))
+
+        partitions_repository.create_partition.assert_called_once_with(
+            "tasks_p20261019", day(19), day(20)
+        )
+        partitions_repository.detach_partition.assert_called_once_with("tasks_legacy")
+        partitions_repository.drop_partition.assert_called_once_with("tasks_legacy")
+        partitions_repository.archive_partition.assert_not_called()
+        partitions_repository.load_id_range.assert_called_once_with(partitions[1])
+
+        assert [partition.name for partition in task_partition_map.sealed] == [
+            "tasks_p20261017"
+        ]
+        assert [partition.name for partition in task_partition_map.open] == [
+            "tasks_p20261018"
+        ]
+        task_partition_map.update([])
+
+    @pytest.mark.asyncio
+    async def test_maintain_archives_expired_partitions(
+        self, partition_manager, partitions_repository
+    ):
+        partition_manager.archive_schema = "archive"
+        partitions_repository.get_partitions = AsyncMock(
+            return_value=[TaskPartition("tasks_p20261001", day(1), day(2))]
+        )
+        partitions_repository.load_id_range = AsyncMock()
+
+        await partition_manager.maintain(now=datetime(2026, 10, 18, 12))
+
+        partitions_repository.archive_partition.assert_called_once_with(
+            "tasks_p20261001", "archive"
+        )
+        partitions_repository.drop_partition.assert_not_called()
+        task_partition_map.update([])
+
+    @pytest.mark.asyncio
+    async def test_maintain_skips_changes_without_lock(
+        self, partition_manager, partitions_repository
+    ):
+        partitions_repository.try_lock.return_value = False
+        partitions_repository.get_partitions = AsyncMock(return_value=[])
+
+        await partition_manager.maintain(now=datetime(2026, 10, 18, 12))
+
+        partitions_repository.create_partition.assert_not_called()
+        partitions_repository.detach_partition.assert_not_called()
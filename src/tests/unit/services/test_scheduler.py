@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import AsyncMock
+
+from enums import ExchangeType, PriorityType, RoutingType
+from services import TaskScheduler
+
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def task_scheduler(tasks_repository, outbox_repository):
+    scheduler = TaskScheduler()
+    scheduler.tasks_repository = tasks_repository
+    scheduler.outbox_repository = outbox_repository
+    outbox_repository.create_messages = AsyncMock()
+    return scheduler
+
+
+def released_task(task_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=task_id,
+        name="Task",
+        description="",
+        priority=PriorityType.LOW,
+        created_at=NOW,
+        scheduled_at=NOW,
+    )
+
+
+class TestTaskScheduler:
+    @pytest.mark.asyncio
+    async def test_release_due(
+        self, task_scheduler, tasks_repository, outbox_repository
+    ):
+        task_scheduler.schedule(1, NOW + timedelta(seconds=1))
+        task_scheduler.schedule(2, NOW - timedelta(seconds=1))
+        task_scheduler.schedule(3, NOW + timedelta(minutes=5))
+        tasks_repository.release_scheduled_tasks = AsyncMock(
+            return_value=[released_task(2), released_task(1)]
+        )
+
+        released = await task_scheduler.release_due(now=NOW + timedelta(seconds=2))
+
+        assert released == 2
+        tasks_repository.release_scheduled_tasks.assert_called_once_with([2, 1])
+        messages = outbox_repository.create_messages.call_args.kwargs["rows"]
+        assert [message["task_id"] for message in messages] == [2, 1]
+        assert messages[0]["exchange"] == ExchangeType.TASKS
+        assert messages[0]["routing_key"] == RoutingType.TASK
+        assert list(task_scheduler.pending) == [3]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_timer_is_skipped(self, task_scheduler, tasks_repository):
+        task_scheduler.schedule(1, NOW)
+        task_scheduler.cancel(1)
+        tasks_repository.release_scheduled_tasks = AsyncMock()
+
+        assert await task_scheduler.release_due(now=NOW) == 0
+        tasks_repository.release_scheduled_tasks.assert_not_called()
+
+    def test_cancelled_timers_are_compacted(self, task_scheduler):
+        for task_id in range(1, 5):
+            task_scheduler.schedule(task_id, NOW + timedelta(seconds=task_id))
+
+        task_scheduler.cancel(1)
+        task_scheduler.cancel(2)
+        assert len(task_scheduler.timers) == 4
+
+        task_scheduler.cancel(3)
+        assert task_scheduler.timers == [(NOW + timedelta(seconds=4), 4)]
+
+    def test_rescheduled_timers_are_compacted(self, task_scheduler):
+        task_scheduler.schedule(1, NOW)
+        task_scheduler.schedule(1, NOW + timedelta(seconds=1))
+        task_scheduler.schedule(1, NOW + timedelta(seconds=2))
+
+        assert task_scheduler.timers == [(NOW + timedelta(seconds=2), 1)]
+        assert task_scheduler.pending == {1: NOW + timedelta(seconds=2)}
+
+    @pytest.mark.asyncio
+    async def test_release_failure_reschedules(self, task_scheduler, tasks_repository):
+        task_scheduler.schedule(1, NOW)
+        tasks_repository.release_scheduled_tasks = AsyncMock(
+            side_effect=RuntimeError("db")
+        )
+
+        with pytest.raises(RuntimeError):
+            await task_scheduler.release_due(now=NOW)
+
+        assert task_scheduler.pending == {1: NOW}
+
+    @pytest.mark.asyncio
+    async def test_load_pages_through_scheduled_tasks(
+        self, task_scheduler, tasks_repository
+    ):
+        task_scheduler.load_batch_size = 2
+        rows = [(task_id, NOW + timedelta(minutes=task_id)) for task_id in (1, 2, 3)]
+        tasks_repository.get_scheduled_tasks = AsyncMock(
+            side_effect=[rows[:2], rows[2:]]
+        )
+
+        loaded = await task_scheduler.load()
+
+        assert loaded == 3
+        assert tasks_repository.get_scheduled_tasks.call_args.kwargs["after"] == rows[1]
+        assert task_scheduler.pending == dict(rows)
+
+    @pytest.mark.asyncio
+    async def test_load_only_up_to_horizon(self, task_scheduler, tasks_repository):
+        horizon = NOW + timedelta(minutes=10)
+        tasks_repository.get_scheduled_tasks = AsyncMock(
+            return_value=[(1, NOW + timedelta(minutes=1))]
+        )
+
+        assert await task_scheduler.load(until=horizon) == 1
+
+        assert tasks_repository.get_scheduled_tasks.call_args.kwargs["until"] == horizon
+        assert task_scheduler.horizon == horizon
+
+        task_scheduler.schedule(2, horizon)
+        task_scheduler.schedule(3, horizon + timedelta(seconds=1))
+        assert task_scheduler.pending == {
+            1: NOW + timedelta(minutes=1),
+            2: horizon,
+        }
+        assert len(task_scheduler.timers) == 2
+
+    def test_reschedule_beyond_horizon_drops_timer(self, task_scheduler):
+        task_scheduler.horizon = NOW + timedelta(minutes=10)
+        task_scheduler.schedule(1, NOW)
+
+        task_scheduler.schedule(1, NOW + timedelta(hours=1))
+
+        assert task_scheduler.pending == {}
+
+    @pytest.mark.asyncio
+    async def test_start_loads_up_to_horizon(self, task_scheduler, tasks_repository):
+        tasks_repository.get_scheduled_tasks = AsyncMock(return_value=[])
+        task_scheduler.resync_interval = 60
+
+        await task_scheduler.start()
+        await asyncio.sleep(0)
+        await task_scheduler.stop()
+
+        until = tasks_repository.get_scheduled_tasks.call_args.kwargs["until"]
+        assert until > datetime.now() + timedelta(seconds=60)
@@ -1,23 +1,42 @@
+import json
+import zlib
 from datetime import datetime
+from http import HTTPStatus
+from types import SimpleNamespace
 
 import pytest
-from unittest.mock import AsyncMock
-
-from enums import StatusType, PriorityType, ExchangeType, RoutingType, Priority
+from fastapi import HTTPException
+from pydantic import ValidationError
+from unittest.mock import AsyncMock, patch
+
+from enums import (
+    CountType,
+    StatusType,
+    PriorityType,
+    ExchangeType,
+    RoutingType,
+    Priority,
+    TaskField,
+)
 from schemes import (
     TaskCreateRequest,
     TaskCreateResponse,
     BaseQueryPathFilters,
     TasksResponse,
     TaskResponse,
+    TasksBatchCreateResponse,
+    TasksFieldsResponse,
 )
 from schemes import Pagination
+from schemes.base import PaginationCursor
+from services.events import TaskEventsListener, task_events_listener
+from settings import settings
 
 
 class TestTasksService:
     @pytest.mark.asyncio
     async def test_create_task(
-        self, tasks_service, tasks_repository, producer, mock_task
+        self, tasks_service, tasks_repository, outbox_repository, producer, mock_task
     ):
         params = TaskCreateRequest(
             name="Test Task",
@@ -37,15 +56,24 @@ class TestTasksService:
         assert create_kwargs["status"] == StatusType.NEW
         assert create_kwargs["priority"] == PriorityType.HIGH
 
-        producer.publish.assert_called_once()
+        producer.publish.assert_not_called()
+        outbox_repository.create.assert_called_once()
 
-        publish_kwargs = producer.publish.call_args.kwargs
-        assert publish_kwargs["exchange"] == ExchangeType.TASKS
-        assert publish_kwargs["routing_key"] == RoutingType.TASK
-        assert publish_kwargs["priority"] == Priority.get_priority_value(
+        outbox_kwargs = outbox_repository.create.call_args.kwargs
+        assert outbox_kwargs["task_id"] == 1
+        assert outbox_kwargs["exchange"] == ExchangeType.TASKS
+        assert outbox_kwargs["routing_key"] == RoutingType.TASK
+        assert outbox_kwargs["priority"] == Priority.get_priority_value(
             PriorityType.HIGH
         )
-        assert publish_kwargs["body"] == {"id": 1, "priority": PriorityType.HIGH}
+        assert outbox_kwargs["body"] == {
+            "id": 1,
+            "name": "Test Task",
+            "description": "Test Description",
+            "priority": PriorityType.HIGH,
+            "created_at": "2025-01-01T10:20:00",
+        }
+        assert outbox_kwargs["headers"] is None
 
         assert isinstance(result, TaskCreateResponse)
         assert result.id == 1
@@ -55,10 +83,111 @@ class TestTasksService:
         assert result.priority == PriorityType.MEDIUM
         assert result.created_at == datetime(2025, 1, 1, 10, 20, 0)
 
+    @pytest.mark.asyncio
+    async def test_create_task_delayed(
+        self, tasks_service, tasks_repository, outbox_repository, mock_task
+    ):
+        mock_task.status = StatusType.SCHEDULED
+        mock_task.scheduled_at = datetime(2025, 1, 1, 10, 25, 0)
+        tasks_repository.create.return_value = mock_task
+
+        with patch("services.tasks.task_scheduler") as task_scheduler:
+            result = await tasks_service.create_task(
+                params=TaskCreateRequest(
+                    name="Test Task", priority=PriorityType.HIGH, delay=300
+                )
+            )
+
+        create_kwargs = tasks_repository.create.call_args.kwargs
+        assert create_kwargs["status"] == StatusType.SCHEDULED
+        assert "delay" not in create_kwargs
+        assert create_kwargs["scheduled_at"] > datetime.now()
+
+        outbox_repository.create.assert_not_called()
+        task_scheduler.schedule.assert_called_once_with(1, mock_task.scheduled_at)
+        assert result.status == StatusType.SCHEDULED
+
+    def test_create_task_rejects_run_at_with_delay(self):
+        with pytest.raises(ValidationError):
+            TaskCreateRequest(
+                name="Test Task",
+                priority=PriorityType.HIGH,
+                run_at=datetime(2025, 1, 1, 10, 25, 0),
+                delay=300,
+            )
+
+    @pytest.mark.asyncio
+    async def test_create_task_idempotent(
+        self, tasks_service, tasks_repository, idempotency_repository, mock_task
+    ):
+        params = TaskCreateRequest(name="Test Task", priority=PriorityType.HIGH)
+        tasks_repository.create.return_value = mock_task
+
+        first = await tasks_service.create_task(params=params, idempotency_key="key")
+        second = await tasks_service.create_task(params=params, idempotency_key="key")
+
+        assert second == first
+        tasks_repository.create.assert_called_once()
+        idempotency_repository.get_key.assert_called_once_with("key")
+
+        create_key_kwargs = idempotency_repository.create_key.call_args.kwargs
+        assert create_key_kwargs["key"] == "key"
+        assert create_key_kwargs["task_id"] == 1
+        assert create_key_kwargs["response"]["created_at"] == "2025-01-01 10:20:00"
+
+    @pytest.mark.asyncio
+    async def test_create_task_idempotent_from_storage(
+        self, tasks_service, tasks_repository, idempotency_repository, mock_task
+    ):
+        params = TaskCreateRequest(name="Test Task", priority=PriorityType.HIGH)
+        response = TaskCreateResponse(**mock_task.__dict__)
+        idempotency_repository.get_key.return_value = SimpleNamespace(
+            request_hash=tasks_service._get_request_hash(params),
+            response=response.model_dump(mode="json"),
+        )
+
+        result = await tasks_service.create_task(params=params, idempotency_key="key")
+
+        assert result == response
+        tasks_repository.create.assert_not_called()
+        idempotency_repository.create_key.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_task_idempotency_key_reused(
+        self, tasks_service, tasks_repository, mock_task
+    ):
+        tasks_repository.create.return_value = mock_task
+        await tasks_service.create_task(
+            params=TaskCreateRequest(name="First", priority=PriorityType.HIGH),
+            idempotency_key="key",
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await tasks_service.create_task(
+                params=TaskCreateRequest(name="Second", priority=PriorityType.HIGH),
+                idempotency_key="key",
+            )
+
+        assert exc_info.value.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+        tasks_repository.create.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_get_tasks(self, tasks_service, tasks_repository, mock_task):
         pagination = BaseQueryPathFilters(
-            page=1, page_size=25, count_only=False, pagination_on=True
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=False,
+            count_type=CountType.EXACT,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
         )
 
         mock_pagination_info = Pagination(
@@ -72,7 +201,9 @@ class TestTasksService:
 
         result = await tasks_service.get_tasks(pagination=pagination)
 
-        tasks_repository.get_tasks.assert_called_once_with(pagination=pagination)
+        tasks_repository.get_tasks.assert_called_once_with(
+            pagination=pagination, fields=None, cursor=None
+        )
 
         assert isinstance(result, TasksResponse)
         assert hasattr(result, "data")
@@ -128,8 +259,8 @@ class TestTasksService:
         producer.publish.assert_called_once()
 
         publish_kwargs = producer.publish.call_args.kwargs
-        assert publish_kwargs["exchange"] == ExchangeType.TASKS
-        assert publish_kwargs["routing_key"] == RoutingType.TASK_CANCELED
+        assert publish_kwargs["exchange"] == ExchangeType.TASK_CANCELS
+        assert publish_kwargs["routing_key"] == ""
         assert publish_kwargs["priority"] == Priority.get_priority_value(
             PriorityType.HIGH
         )
@@ -145,3 +276,442 @@ class TestTasksService:
 
         assert isinstance(result, StatusType)
         assert result == StatusType.NEW
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_next_cursor(
+        self, tasks_service, tasks_repository, mock_task
+    ):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=1,
+            cursor=None,
+            count_only=False,
+            count_type=CountType.NONE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
+        )
+
+        tasks_repository.get_tasks = AsyncMock(
+            return_value=([mock_task], Pagination(total=None, page_count=None))
+        )
+
+        result = await tasks_service.get_tasks(pagination=pagination)
+
+        cursor = PaginationCursor.decode(result.next_cursor)
+        assert cursor.id == mock_task.id
+        assert cursor.created_at == mock_task.created_at
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_passes_decoded_cursor(
+        self, tasks_service, tasks_repository
+    ):
+        cursor = PaginationCursor(created_at=datetime(2025, 1, 1, 10, 20, 0), id=129)
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor=cursor.encode(),
+            count_only=False,
+            count_type=CountType.NONE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
+        )
+        tasks_repository.get_tasks = AsyncMock(
+            return_value=([], Pagination(total=None, page_count=None))
+        )
+
+        await tasks_service.get_tasks(pagination=pagination)
+
+        tasks_repository.get_tasks.assert_called_once_with(
+            pagination=pagination, fields=None, cursor=cursor
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_invalid_cursor(self, tasks_service, tasks_repository):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor="not-a-cursor",
+            count_only=False,
+            count_type=CountType.NONE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields=None,
+        )
+        tasks_repository.get_tasks = AsyncMock()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await tasks_service.get_tasks(pagination=pagination)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+        tasks_repository.get_tasks.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_with_fields(
+        self, tasks_service, tasks_repository, mock_task
+    ):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=False,
+            count_type=CountType.NONE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields="status, id,status",
+        )
+        tasks_repository.get_tasks = AsyncMock(
+            return_value=([mock_task], Pagination(total=None, page_count=None))
+        )
+
+        result = await tasks_service.get_tasks(pagination=pagination)
+
+        assert tasks_repository.get_tasks.call_args.kwargs["fields"] == [
+            TaskField.STATUS,
+            TaskField.ID,
+        ]
+        assert isinstance(result, TasksFieldsResponse)
+        assert result.model_dump()["data"] == [{"id": 1, "status": StatusType.NEW}]
+
+    @pytest.mark.asyncio
+    async def test_get_tasks_unknown_fields(self, tasks_service, tasks_repository):
+        pagination = BaseQueryPathFilters(
+            page=1,
+            page_size=25,
+            cursor=None,
+            count_only=False,
+            count_type=CountType.NONE,
+            pagination_on=True,
+            status=None,
+            priority=None,
+            name_prefix=None,
+            created_from=None,
+            created_to=None,
+            completed_from=None,
+            completed_to=None,
+            fields="status,password",
+        )
+        tasks_repository.get_tasks = AsyncMock()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await tasks_service.get_tasks(pagination=pagination)
+
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+        tasks_repository.get_tasks.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_task_status_cached_when_terminal(
+        self, tasks_service, tasks_repository, mock_task
+    ):
+        mock_task.status = StatusType.COMPLETED
+        tasks_repository.get_by.return_value = mock_task
+
+        for _ in range(3):
+            assert (
+                await tasks_service.get_task_status(task_id=1) == StatusType.COMPLETED
+            )
+        await tasks_service.get_task(task_id=1)
+
+        tasks_repository.get_by.assert_called_once_with(id=1)
+
+    @pytest.mark.asyncio
+    async def test_get_task_status_invalidated_by_event(
+        self, tasks_service, tasks_repository, mock_task
+    ):
+        tasks_repository.get_by.return_value = mock_task
+
+        assert await tasks_service.get_task_status(task_id=1) == StatusType.NEW
+
+        mock_task.status = StatusType.IN_PROGRESS
+        await tasks_service.tasks_cache.invalidate(1)
+
+        assert await tasks_service.get_task_status(task_id=1) == StatusType.IN_PROGRESS
+        assert tasks_repository.get_by.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_task_status_not_cached_without_events(
+        self, tasks_service, tasks_repository, mock_task
+    ):
+        mock_task.status = StatusType.COMPLETED
+        tasks_repository.get_by.return_value = mock_task
+        task_events_listener.subscribed = False
+
+        for _ in range(2):
+            assert (
+                await tasks_service.get_task_status(task_id=1) == StatusType.COMPLETED
+            )
+
+        assert tasks_repository.get_by.call_count == 2
+        assert await tasks_service.tasks_cache.get(1) is None
+
+    @pytest.mark.asyncio
+    async def test_events_listener_retries_subscription(self, monkeypatch):
+        subscriber = AsyncMock()
+        subscriber.subscribe.side_effect = [ConnectionError("broker is down"), None]
+        monkeypatch.setattr("services.events.subscriber", subscriber)
+        monkeypatch.setattr(settings, "TASKS_EVENTS_RETRY_INTERVAL", 0)
+        listener = TaskEventsListener()
+
+        await listener.start()
+        assert not listener.subscribed
+
+        await listener._subscribe_task
+        assert listener.subscribed
+        assert subscriber.subscribe.call_count == 2
+
+        await listener.stop()
+        assert not listener.subscribed
+
+    @pytest.mark.asyncio
+    async def test_stream_task_events(self, tasks_service, tasks_repository):
+        tasks_repository.get_tasks_by_ids = AsyncMock(
+            return_value=[
+                SimpleNamespace(id=1, status=StatusType.IN_PROGRESS),
+                SimpleNamespace(id=2, status=StatusType.COMPLETED),
+            ]
+        )
+
+        events = await tasks_service.stream_task_events(task_ids=[1, 2])
+
+        received = [await anext(events), await anext(events)]
+        await task_events_listener.handle(
+            {"events": [{"id": 1, "status": StatusType.COMPLETED}]}
+        )
+        received += [event async for event in events]
+
+        assert [json.loads(event.split("data: ")[1]) for event in received] == [
+            {"id": 1, "status": StatusType.IN_PROGRESS},
+            {"id": 2, "status": StatusType.COMPLETED},
+            {"id": 1, "status": StatusType.COMPLETED},
+        ]
+        assert all(event.startswith("event: status\n") for event in received)
+        assert task_events_listener.subscriptions == {}
+
+    @pytest.mark.asyncio
+    async def test_stream_task_events_resyncs_slow_subscriber(
+        self, tasks_service, tasks_repository, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "TASKS_EVENTS_QUEUE_SIZE", 2)
+        tasks_repository.get_tasks_by_ids = AsyncMock(
+            side_effect=[
+                [SimpleNamespace(id=1, status=StatusType.NEW)],
+                [SimpleNamespace(id=1, status=StatusType.COMPLETED)],
+            ]
+        )
+
+        events = await tasks_service.stream_task_events(task_ids=[1])
+        received = [await anext(events)]
+        for status in (StatusType.PENDING, StatusType.IN_PROGRESS, StatusType.FAILED):
+            await task_events_listener.handle({"events": [{"id": 1, "status": status}]})
+        received += [event async for event in events]
+
+        assert [json.loads(event.split("data: ")[1]) for event in received] == [
+            {"id": 1, "status": StatusType.NEW},
+            {"id": 1, "status": StatusType.COMPLETED},
+        ]
+        assert tasks_repository.get_tasks_by_ids.call_count == 2
+        assert task_events_listener.subscriptions == {}
+
+    @pytest.mark.asyncio
+    async def test_stream_task_events_keepalive_skips_database(
+        self, tasks_service, tasks_repository, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "TASKS_EVENTS_KEEPALIVE", 0.01)
+        monkeypatch.setattr(task_events_listener, "subscribed", True)
+        tasks_repository.get_tasks_by_ids = AsyncMock(
+            return_value=[SimpleNamespace(id=1, status=StatusType.IN_PROGRESS)]
+        )
+
+        events = await tasks_service.stream_task_events(task_ids=[1])
+        await anext(events)
+
+        assert [await anext(events), await anext(events)] == [": keepalive\n\n"] * 2
+        assert tasks_repository.get_tasks_by_ids.call_count == 1
+        await events.aclose()
+        assert task_events_listener.subscriptions == {}
+
+    @pytest.mark.asyncio
+    async def test_stream_task_events_resyncs_after_resubscribe(
+        self, tasks_service, tasks_repository, monkeypatch
+    ):
+        subscriber = AsyncMock()
+        monkeypatch.setattr("services.events.subscriber", subscriber)
+        monkeypatch.setattr(settings, "TASKS_EVENTS_RETRY_INTERVAL", 0)
+        monkeypatch.setattr(task_events_listener, "subscribed", False)
+        tasks_repository.get_tasks_by_ids = AsyncMock(
+            side_effect=[
+                [SimpleNamespace(id=1, status=StatusType.PENDING)],
+                [SimpleNamespace(id=1, status=StatusType.COMPLETED)],
+            ]
+        )
+
+        events = await tasks_service.stream_task_events(task_ids=[1])
+        received = [await anext(events)]
+        await task_events_listener._resubscribe()
+        received += [event async for event in events]
+
+        assert [json.loads(event.split("data: ")[1]) for event in received] == [
+            {"id": 1, "status": StatusType.PENDING},
+            {"id": 1, "status": StatusType.COMPLETED},
+        ]
+        assert tasks_repository.get_tasks_by_ids.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_task_events_not_found(self, tasks_service, tasks_repository):
+        tasks_repository.get_tasks_by_ids = AsyncMock(return_value=[])
+
+        with pytest.raises(HTTPException) as exc_info:
+            await tasks_service.stream_task_events(task_ids=[1])
+
+        assert exc_info.value.status_code == HTTPStatus.NOT_FOUND
+        assert task_events_listener.subscriptions == {}
+
+    @pytest.mark.asyncio
+    async def test_create_tasks(
+        self, tasks_service, tasks_repository, outbox_repository, producer
+    ):
+        created_at = datetime(2025, 1, 1, 10, 20, 0)
+        tasks_repository.create_tasks = AsyncMock(
+            return_value=[
+                SimpleNamespace(id=10, created_at=created_at),
+                SimpleNamespace(id=11, created_at=created_at),
+            ]
+        )
+        outbox_repository.create_messages = AsyncMock()
+
+        result = await tasks_service.create_tasks(
+            items=[
+                {"name": "First", "priority": PriorityType.HIGH},
+                {"name": "Broken", "priority": "URGENT"},
+                {"name": "Second", "priority": PriorityType.LOW},
+            ]
+        )
+
+        assert isinstance(result, TasksBatchCreateResponse)
+        assert result.ids == [10, None, 11]
+        assert [error.index for error in result.errors] == [1]
+        assert result.errors[0].detail.startswith("priority:")
+
+        tasks_repository.create_tasks.assert_called_once()
+        rows = tasks_repository.create_tasks.call_args.kwargs["rows"]
+        assert [row["name"] for row in rows] == ["First", "Second"]
+        assert all(row["status"] == StatusType.NEW for row in rows)
+
+        outbox_repository.create_messages.assert_called_once()
+        messages = outbox_repository.create_messages.call_args.kwargs["rows"]
+        assert [message["body"] for message in messages] == [
+            {
+                "id": 10,
+                "name": "First",
+                "description": "",
+                "priority": PriorityType.HIGH,
+                "created_at": "2025-01-01T10:20:00",
+            },
+            {
+                "id": 11,
+                "name": "Second",
+                "description": "",
+                "priority": PriorityType.LOW,
+                "created_at": "2025-01-01T10:20:00",
+            },
+        ]
+        assert messages[0]["priority"] == Priority.get_priority_value(PriorityType.HIGH)
+        producer.publish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_tasks_all_invalid(self, tasks_service, tasks_repository):
+        tasks_repository.create_tasks = AsyncMock()
+
+        result = await tasks_service.create_tasks(items=[{"priority": "LOW"}])
+
+        assert result.ids == [None]
+        assert result.errors[0].index == 0
+        tasks_repository.create_tasks.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_task_result_inline(
+        self, tasks_service, tasks_repository, mock_task
+    ):
+        tasks_repository.get_by = AsyncMock(return_value=mock_task)
+
+        chunks, size = await tasks_service.get_task_result(task_id=1)
+
+        assert size == 6
+        assert [chunk async for chunk in chunks] == [b"Result"]
+
+    @pytest.mark.asyncio
+    async def test_get_task_result_streams_stored_result(
+        self, tasks_service, tasks_repository, results_repository, mock_task
+    ):
+        stored = "Пробирка готова\n" * 1000
+        compressed = zlib.compress(stored.encode("utf-8"))
+
+        async def iter_chunks(digest, chunk_size):
+            assert digest == "digest"
+            for offset in range(0, len(compressed), chunk_size):
+                yield compressed[offset : offset + chunk_size]
+
+        mock_task.result = None
+        mock_task.result_ref = "digest"
+        mock_task.result_size = len(stored.encode("utf-8"))
+        tasks_repository.get_by = AsyncMock(return_value=mock_task)
+        results_repository.iter_chunks = iter_chunks
+
+        with patch("services.tasks.settings.TASKS_RESULT_CHUNK_SIZE", 64):
+            chunks, size = await tasks_service.get_task_result(task_id=1)
+            received = [chunk async for chunk in chunks]
+
+        assert size == mock_task.result_size
+        assert all(len(chunk) <= 64 for chunk in received)
+        assert b"".join(received).decode("utf-8") == stored
+
+    @pytest.mark.asyncio
+    async def test_get_task_result_missing_stored_result(
+        self, tasks_service, tasks_repository, mock_db_session, mock_task
+    ):
+        mock_task.result = None
+        mock_task.result_ref = "digest"
+        tasks_repository.get_by = AsyncMock(return_value=mock_task)
+        mock_db_session.select_one.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await tasks_service.get_task_result(task_id=1)
+
+        assert exc_info.value.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_get_task_result_missing(
+        self, tasks_service, tasks_repository, mock_task
+    ):
+        mock_task.result = None
+        tasks_repository.get_by = AsyncMock(return_value=mock_task)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await tasks_service.get_task_result(task_id=1)
+
+        assert exc_info.value.status_code == HTTPStatus.NOT_FOUND
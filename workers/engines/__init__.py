@@ -1,4 +1,14 @@
+from engines.metrics import metrics, metrics_server
 from engines.postgres_storage import PostgresEngine
-from engines.rabbitmq_storage import consumer
+from engines.rabbitmq_storage import consumer, producer
+from engines.tracing import setup_tracing, tracer
 
-__all__ = ["PostgresEngine", "consumer"]
+__all__ = [
+    "PostgresEngine",
+    "consumer",
+    "metrics",
+    "metrics_server",
+    "producer",
+    "setup_tracing",
+    "tracer",
+]
@@ -0,0 +1,280 @@
+import asyncio
+import logging
+import sys
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable
+from math import inf
+from typing import Optional
+
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+class Metric(ABC):
+    type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+    @abstractmethod
+    def samples(self) -> list[str]: ...
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, label_values)} {value}"
+            for label_values, value in self.values.items()
+        ]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+        self.collect = collect
+
+    def set(self, value: float, *label_values: str) -> None:
+        self.values[label_values] = value
+
+    def samples(self) -> list[str]:
+        values = self.collect() if self.collect is not None else self.values
+        return [
+            f"{self.name}{_format_labels(self.labels, label_values)} {value}"
+            for label_values, value in values.items()
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: dict[tuple[str, ...], list[int]] = {}
+        self.sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        counts = self.counts.get(label_values)
+        if counts is None:
+            counts = self.counts[label_values] = [0] * (len(self.buckets) + 1)
+            self.sums[label_values] = 0.0
+
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[label_values] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        bucket_labels = (*self.labels, "le")
+        for label_values, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, inf), counts):
+                cumulative += count
+                le = "+Inf" if bound == inf else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(bucket_labels, (*label_values, le))} {cumulative}"
+                )
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {self.sums[label_values]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def counter(
+        self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labels, collect))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+
+        self.metrics[metric.name] = metric
+        return metric
+
+
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.registry = registry
+        self._server: Optional[asyncio.Server] = None
+
+    async def start(self, host: str, port: int) -> None:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        log.info(f"Метрики доступны на {host}:{port}/metrics")
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1] == "/metrics":
+                status, content_type = "200 OK", self.registry.content_type
+                body = self.registry.render().encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b""
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except Exception as e:
+            log.error(f"Ошибка отдачи метрик: {e}")
+        finally:
+            writer.close()
+
+
+metrics = MetricsRegistry()
+metrics_server = MetricsServer(metrics)
+
+task_queue_wait = metrics.histogram(
+    "task_queue_wait_seconds",
+    "Время ожидания задачи от создания до запуска",
+    labels=("priority",),
+)
+task_run_duration = metrics.histogram(
+    "task_run_duration_seconds",
+    "Время выполнения задачи",
+    labels=("priority", "status"),
+)
+tier_slots = metrics.gauge(
+    "task_tier_slots",
+    "Емкость, занятость и очередь пулов выполнения задач",
+    labels=("tier", "state"),
+)
+tasks_in_flight = metrics.gauge(
+    "task_in_flight",
+    "Количество выполняемых задач воркера",
+)
+task_result_memo = metrics.counter(
+    "task_result_memo_total",
+    "Обращения к кэшу результатов задач с одинаковыми входными данными",
+    labels=("handler", "outcome"),
+)
+publish_duration = metrics.histogram(
+    "rabbitmq_publish_duration_seconds",
+    "Время публикации сообщений в RabbitMQ",
+    labels=("exchange",),
+)
+db_checkout_duration = metrics.histogram(
+    "db_pool_checkout_duration_seconds",
+    "Время ожидания соединения из пула SQLAlchemy",
+)
@@ -2,18 +2,28 @@ import asyncio
 import json
 import logging
 import sys
+import time
+from collections import deque
 from collections.abc import Awaitable
+from contextlib import suppress
+from functools import partial
 from typing import Optional, Callable
 
-from aio_pika import connect_robust
+from aio_pika import connect_robust, Message
 from aio_pika.abc import (
     AbstractChannel,
     AbstractRobustConnection,
     AbstractIncomingMessage,
+    AbstractQueue,
     ExchangeType as pika_exchange_type,
 )
 from aio_pika.pool import Pool
 
+from engines.broker import BrokerEngine
+from engines.memory_broker import MemoryBrokerEngine
+from engines.metrics import publish_duration
+from engines.tracing import SpanContext, tracer
+from enums import BrokerBackend
 from settings import settings
 
 log = logging.getLogger(__name__)
@@ -22,7 +32,7 @@ stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
 log.addHandler(stream_handler)
 
 
-class RabbitMQEngine:
+class RabbitMQEngine(BrokerEngine):
     def __init__(self, amqp_url: str) -> None:
         self.amqp_url = amqp_url
         self._connection_pool: Optional[Pool] = None
@@ -54,28 +64,185 @@ class RabbitMQEngine:
             await self._connection_pool.close()
 
 
-rabbit_manager = RabbitMQEngine(settings.get_rabbitmq_uri)
+def create_broker() -> BrokerEngine:
+    if settings.BROKER_BACKEND == BrokerBackend.MEMORY:
+        return MemoryBrokerEngine()
+    return RabbitMQEngine(settings.get_rabbitmq_uri)
+
+
+broker_manager = create_broker()
+
+
+class BatchAcker:
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        self.pending: dict[int, AbstractIncomingMessage] = {}
+        self.completed: set[int] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def track(self, message: AbstractIncomingMessage) -> None:
+        self.pending[message.delivery_tag] = message
+
+    def complete(self, message: AbstractIncomingMessage) -> None:
+        self.completed.add(message.delivery_tag)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def flush(self) -> None:
+        last_tag = None
+        for delivery_tag in self.pending:
+            if delivery_tag not in self.completed:
+                break
+            last_tag = delivery_tag
+
+        try:
+            if last_tag is not None:
+                await self.pending[last_tag].ack(multiple=True)
+                for delivery_tag in list(self.pending):
+                    if delivery_tag > last_tag:
+                        break
+                    del self.pending[delivery_tag]
+                    self.completed.discard(delivery_tag)
+
+            for delivery_tag in list(self.completed):
+                self.completed.discard(delivery_tag)
+                if message := self.pending.pop(delivery_tag, None):
+                    await message.ack()
+        except Exception as e:
+            log.error(f"Ошибка подтверждения сообщений: {e}")
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+
+        await self.flush()
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+
+# Планировщик переупорядочивает только сообщения, уже полученные от брокера,
+# поэтому справедливость ограничена окном prefetch. Доли очередей в этом окне
+# задает распределение prefetch по тем же весам (WorkerApplication._set_prefetch).
+class WeightedFairScheduler:
+    def __init__(self, weights: dict[str, int], aging: float) -> None:
+        self.weights = weights
+        self.aging = aging
+        self.buffers: dict[str, deque[tuple[float, AbstractIncomingMessage]]] = {
+            queue_name: deque() for queue_name in weights
+        }
+        self.current: dict[str, float] = dict.fromkeys(weights, 0.0)
+        self._ready = asyncio.Event()
+
+    def put(self, queue_name: str, message: AbstractIncomingMessage) -> None:
+        self.buffers[queue_name].append((time.monotonic(), message))
+        self._ready.set()
+
+    async def get(self) -> tuple[str, AbstractIncomingMessage]:
+        while not any(self.buffers.values()):
+            self._ready.clear()
+            await self._ready.wait()
+
+        now = time.monotonic()
+        candidates = [name for name, buffer in self.buffers.items() if buffer]
+
+        total_weight = 0.0
+        for queue_name in candidates:
+            enqueued_at = self.buffers[queue_name][0][0]
+            weight = self.weights[queue_name] + (now - enqueued_at) / self.aging
+            self.current[queue_name] += weight
+            total_weight += weight
+
+        selected = max(candidates, key=self.current.__getitem__)
+        self.current[selected] -= total_weight
+        for queue_name in self.weights:
+            if not self.buffers[queue_name] and queue_name != selected:
+                self.current[queue_name] = 0.0
+
+        return selected, self.buffers[selected].popleft()[1]
 
 
 class ConsumerEngine:
     def __init__(self) -> None:
-        self.connector = rabbit_manager
+        self.connector = broker_manager
         self.queue_callbacks: dict[str, Callable[[dict], Awaitable[None]]] = {}
+        self.ackers: dict[str, BatchAcker] = {}
         self.consume_tasks: list[asyncio.Task] = []
         self.is_consuming = False
+        self.channels: dict[str, AbstractChannel] = {}
+        self.prefetch: dict[str, int] = {}
+        self.applied_prefetch: dict[str, int] = {}
+        self.queues: dict[
+            str, tuple[AbstractQueue, Callable[[AbstractIncomingMessage], Awaitable]]
+        ] = {}
+        self.consumer_tags: dict[str, str] = {}
+        self._qos_tasks: dict[str, asyncio.Task] = {}
+        self.scheduler: Optional[WeightedFairScheduler] = None
 
     def set_callback(
-        self, queue_name: str, callback: Callable[[dict], Awaitable[None]]
+        self,
+        queue_name: str,
+        callback: Callable[[dict], Awaitable[Optional[asyncio.Future]]],
+        ack_on_completion: bool = False,
     ) -> None:
         self.queue_callbacks[queue_name] = callback
+        if ack_on_completion:
+            self.ackers[queue_name] = BatchAcker(
+                flush_interval=settings.TASKS_ACK_FLUSH_INTERVAL_MS / 1000
+            )
+
+    def set_prefetch(self, queue_name: str, prefetch_count: int) -> None:
+        self.prefetch[queue_name] = max(prefetch_count, 0)
+
+        qos_task = self._qos_tasks.get(queue_name)
+        if qos_task is None or qos_task.done():
+            self._qos_tasks[queue_name] = asyncio.create_task(
+                self._apply_prefetch(queue_name), name=f"qos-{queue_name}"
+            )
+
+    async def _apply_prefetch(self, queue_name: str) -> None:
+        while (channel := self.channels.get(queue_name)) is not None and (
+            prefetch_count := self.prefetch[queue_name]
+        ) != self.applied_prefetch.get(queue_name):
+            try:
+                await self._apply_qos(queue_name, channel, prefetch_count)
+            except Exception as e:
+                log.error(f"Ошибка обновления prefetch очереди '{queue_name}': {e}")
+                return
+            self.applied_prefetch[queue_name] = prefetch_count
+
+    async def _apply_qos(
+        self, queue_name: str, channel: AbstractChannel, prefetch_count: int
+    ) -> None:
+        queue, on_message = self.queues[queue_name]
+        if prefetch_count == 0:
+            # В AMQP prefetch 0 означает «без ограничений», поэтому очередь
+            # без кредитов снимается с потребления, пока они не появятся.
+            if consumer_tag := self.consumer_tags.pop(queue_name, None):
+                await queue.cancel(consumer_tag)
+            return
+
+        await channel.set_qos(prefetch_count=prefetch_count, global_=True)
+        if queue_name not in self.consumer_tags:
+            self.consumer_tags[queue_name] = await queue.consume(on_message)
+
+    async def _message_handler(
+        self, queue_name: str, message: AbstractIncomingMessage
+    ) -> None:
+        if acker := self.ackers.get(queue_name):
+            await self._deferred_message_handler(queue_name, message, acker)
+            return
 
-    async def _message_handler(self, message: AbstractIncomingMessage) -> None:
         async with message.process():
             try:
                 body = json.loads(message.body.decode())
-                queue_name = message.routing_key
                 callback = self.queue_callbacks.get(queue_name)
-                await callback(body)
+                with self._consume_span(queue_name, message):
+                    await callback(body)
             except json.JSONDecodeError as e:
                 log.error(
                     f"Ошибка декодирования JSON: {e}, body: {message.body.decode()}"
@@ -83,16 +250,47 @@ class ConsumerEngine:
             except Exception as e:
                 log.error(f"Ошибка обработки сообщения: {e}")
 
+    async def _deferred_message_handler(
+        self, queue_name: str, message: AbstractIncomingMessage, acker: BatchAcker
+    ) -> None:
+        acker.track(message)
+
+        completion = None
+        try:
+            body = json.loads(message.body.decode())
+            callback = self.queue_callbacks.get(queue_name)
+            with self._consume_span(queue_name, message):
+                completion = await callback(body)
+        except json.JSONDecodeError as e:
+            log.error(f"Ошибка декодирования JSON: {e}, body: {message.body.decode()}")
+        except Exception as e:
+            log.error(f"Ошибка обработки сообщения: {e}")
+
+        if completion is None:
+            acker.complete(message)
+        else:
+            completion.add_done_callback(lambda _: acker.complete(message))
+
+    @staticmethod
+    def _consume_span(queue_name: str, message: AbstractIncomingMessage):
+        return tracer.span(
+            "task.consume",
+            parent=SpanContext.from_headers(message.headers),
+            queue=queue_name,
+            redelivered=message.redelivered,
+        )
+
     async def setup_queue(
         self,
         queue_name: str,
         exchange_name: str,
         durable: bool = True,
         max_priority: int = None,
+        exchange_type: pika_exchange_type = pika_exchange_type.TOPIC,
     ) -> None:
         async with self.connector.channel_pool.acquire() as channel:
             exchange = await channel.declare_exchange(
-                exchange_name, pika_exchange_type.TOPIC, durable=durable
+                exchange_name, exchange_type, durable=durable
             )
 
             queue = await channel.declare_queue(
@@ -104,19 +302,37 @@ class ConsumerEngine:
 
             await queue.bind(exchange, queue_name)
 
-    async def consume(self, queue_name: str, prefetch_count: int = 1) -> None:
+    async def consume(
+        self,
+        queue_name: str,
+        prefetch_count: int = 1,
+        on_message: Optional[
+            Callable[[AbstractIncomingMessage], Awaitable[None]]
+        ] = None,
+    ) -> None:
         self.is_consuming = True
 
         async with self.connector.channel_pool.acquire() as channel:
-            await channel.set_qos(prefetch_count=prefetch_count)
-
+            prefetch_count = self.prefetch.setdefault(queue_name, prefetch_count)
             queue = await channel.get_queue(queue_name)
-
-            await queue.consume(self._message_handler)
+            self.queues[queue_name] = (
+                queue,
+                on_message or partial(self._message_handler, queue_name),
+            )
+            await self._apply_qos(queue_name, channel, prefetch_count)
+            self.applied_prefetch[queue_name] = prefetch_count
+            self.channels[queue_name] = channel
+            self.set_prefetch(queue_name, self.prefetch[queue_name])
 
             log.info(f"Ожидание сообщений в очереди '{queue_name}'...")
-            while self.is_consuming:
-                await asyncio.sleep(1)
+            try:
+                while self.is_consuming:
+                    await asyncio.sleep(1)
+            finally:
+                self.channels.pop(queue_name, None)
+                self.applied_prefetch.pop(queue_name, None)
+                self.consumer_tags.pop(queue_name, None)
+                self.queues.pop(queue_name, None)
 
     async def consume_multiple(
         self, queues: list[str], prefetch_count: int = 1
@@ -128,12 +344,54 @@ class ConsumerEngine:
                 name=f"consume-{queue_name}",
             )
             tasks.append(task)
-        self.consume_tasks = tasks
+        self.consume_tasks.extend(tasks)
         return tasks
 
+    async def consume_weighted(
+        self, weights: dict[str, int], aging: float, prefetch_count: int = 1
+    ) -> list[asyncio.Task]:
+        self.scheduler = WeightedFairScheduler(weights=weights, aging=aging)
+
+        tasks = [
+            asyncio.create_task(
+                self.consume(
+                    queue_name,
+                    prefetch_count,
+                    on_message=partial(self._buffer_message, queue_name),
+                ),
+                name=f"consume-{queue_name}",
+            )
+            for queue_name in weights
+        ]
+        tasks.append(
+            asyncio.create_task(self._dispatch_weighted(), name="dispatch-weighted")
+        )
+        self.consume_tasks.extend(tasks)
+        return tasks
+
+    async def _buffer_message(
+        self, queue_name: str, message: AbstractIncomingMessage
+    ) -> None:
+        self.scheduler.put(queue_name, message)
+
+    async def _dispatch_weighted(self) -> None:
+        semaphore = asyncio.Semaphore(settings.TASKS_FAIR_DISPATCH_CONCURRENCY)
+        while True:
+            await semaphore.acquire()
+            queue_name, message = await self.scheduler.get()
+            handler = asyncio.create_task(self._message_handler(queue_name, message))
+            handler.add_done_callback(lambda _: semaphore.release())
+
     async def stop_consuming(self) -> None:
         self.is_consuming = False
 
+        for qos_task in self._qos_tasks.values():
+            qos_task.cancel()
+        self._qos_tasks.clear()
+
+        for acker in self.ackers.values():
+            await acker.close()
+
         if consume_tasks := self.consume_tasks:
             for task in consume_tasks:
                 task.cancel()
@@ -143,3 +401,36 @@ class ConsumerEngine:
 
 
 consumer = ConsumerEngine()
+
+
+class ProducerEngine:
+    def __init__(self) -> None:
+        self.connector = broker_manager
+
+    async def setup_exchange(
+        self, exchange_name: str, exchange_type: pika_exchange_type
+    ) -> None:
+        async with self.connector.channel_pool.acquire() as channel:
+            await channel.declare_exchange(exchange_name, exchange_type, durable=True)
+
+    async def publish(
+        self,
+        exchange: str,
+        routing_key: str,
+        body: dict,
+        priority: int = 0,
+        headers: Optional[dict] = None,
+    ) -> None:
+        body_bytes = json.dumps(body).encode("utf-8")
+
+        started_at = time.perf_counter()
+        async with self.connector.channel_pool.acquire() as channel:
+            exchange_obj = await channel.get_exchange(exchange, ensure=True)
+            await exchange_obj.publish(
+                Message(body=body_bytes, priority=priority, headers=headers),
+                routing_key=routing_key,
+            )
+        publish_duration.observe(time.perf_counter() - started_at, exchange)
+
+
+producer = ProducerEngine()
@@ -1,5 +1,15 @@
-from enums.tasks import PriorityType, StatusType
+from enums.tasks import ExecutionMode, Priority, PriorityType, StatusType
 from enums.producer import ExchangeType, RoutingType
+from enums.backends import BrokerBackend, DatabaseBackend
 
 
-__all__ = ("PriorityType", "StatusType", "ExchangeType", "RoutingType")
+__all__ = (
+    "ExecutionMode",
+    "Priority",
+    "PriorityType",
+    "StatusType",
+    "ExchangeType",
+    "RoutingType",
+    "BrokerBackend",
+    "DatabaseBackend",
+)
@@ -1,4 +1,4 @@
-from enum import StrEnum
+from enum import StrEnum, IntEnum
 
 
 class PriorityType(StrEnum):
@@ -7,7 +7,29 @@ class PriorityType(StrEnum):
     HIGH = "HIGH"
 
 
+class Priority(IntEnum):
+    LOW = 1
+    MEDIUM = 5
+    HIGH = 10
+
+    @staticmethod
+    def get_priority_value(priority_type: PriorityType) -> int:
+        mapping = {
+            PriorityType.LOW: Priority.LOW,
+            PriorityType.MEDIUM: Priority.MEDIUM,
+            PriorityType.HIGH: Priority.HIGH,
+        }
+        return mapping[priority_type].value
+
+
+class ExecutionMode(StrEnum):
+    ASYNC = "ASYNC"
+    THREAD = "THREAD"
+    PROCESS = "PROCESS"
+
+
 class StatusType(StrEnum):
+    SCHEDULED = "SCHEDULED"
     NEW = "NEW"
     PENDING = "PENDING"
     IN_PROGRESS = "IN_PROGRESS"
@@ -3,9 +3,12 @@ import logging
 import signal
 import sys
 from contextlib import asynccontextmanager
+from functools import partial
 
-from engines import consumer
-from enums import RoutingType, ExchangeType
+from aio_pika.abc import ExchangeType as pika_exchange_type
+
+from engines import consumer, metrics_server, producer, setup_tracing, tracer
+from enums import DatabaseBackend, RoutingType, ExchangeType
 from services import TaskConsumer
 from settings import settings
 
@@ -27,6 +30,16 @@ class WorkerApplication:
             loop.add_signal_handler(sig, self.shutdown_event.set)
 
         try:
+            setup_tracing()
+            if settings.DATABASE_BACKEND == DatabaseBackend.SQLITE:
+                await self.task_consumer.tasks_repository.db.create_schema()
+            if settings.METRICS_ENABLED:
+                await metrics_server.start(settings.METRICS_HOST, settings.METRICS_PORT)
+
+            await producer.setup_exchange(
+                exchange_name=ExchangeType.TASK_EVENTS,
+                exchange_type=pika_exchange_type.FANOUT,
+            )
             await consumer.setup_queue(
                 queue_name=RoutingType.TASK,
                 exchange_name=ExchangeType.TASKS,
@@ -35,22 +48,86 @@ class WorkerApplication:
             await consumer.setup_queue(
                 queue_name=RoutingType.TASK_CANCELED, exchange_name=ExchangeType.TASKS
             )
+            await consumer.setup_queue(
+                queue_name=self.task_consumer.cancel_queue,
+                exchange_name=ExchangeType.TASK_CANCELS,
+                durable=False,
+                exchange_type=pika_exchange_type.FANOUT,
+            )
+
+            priority_queues = {}
+            if settings.TASKS_PRIORITY_QUEUES:
+                priority_queues = {
+                    RoutingType.get_task_routing_key(priority): weight
+                    for priority, weight in settings.TASKS_PRIORITY_WEIGHTS.items()
+                }
+                for queue_name in priority_queues:
+                    await consumer.setup_queue(
+                        queue_name=queue_name, exchange_name=ExchangeType.TASKS
+                    )
+            task_queues = {
+                RoutingType.TASK: min(priority_queues.values(), default=1),
+                **priority_queues,
+            }
 
+            for queue_name in task_queues:
+                consumer.set_callback(
+                    queue_name=queue_name,
+                    callback=self.task_consumer.process_message,
+                    ack_on_completion=settings.TASKS_ACK_ON_COMPLETION,
+                )
             consumer.set_callback(
-                queue_name=RoutingType.TASK, callback=self.task_consumer.process_message
+                queue_name=RoutingType.TASK_CANCELED,
+                callback=self.task_consumer.cancel_task,
             )
             consumer.set_callback(
-                queue_name=RoutingType.TASK_CANCELED,
+                queue_name=self.task_consumer.cancel_queue,
                 callback=self.task_consumer.cancel_task,
             )
 
-            queues = [RoutingType.TASK, RoutingType.TASK_CANCELED]
+            credits = self.task_consumer.credits
+            if settings.TASKS_ACK_ON_COMPLETION:
+                credits.add_listener(
+                    lambda free: self._set_prefetch(task_queues, credits.used + free)
+                )
+            else:
+                credits.add_listener(partial(self._set_prefetch, task_queues))
+
+            await self.task_consumer.start()
+
+            queues = [
+                RoutingType.TASK,
+                RoutingType.TASK_CANCELED,
+                self.task_consumer.cancel_queue,
+            ]
             await consumer.consume_multiple(queues)
+            if priority_queues:
+                await consumer.consume_weighted(
+                    priority_queues, aging=settings.TASKS_PRIORITY_AGING
+                )
 
             yield
         finally:
             await self.task_consumer.stop()
             await consumer.stop_consuming()
+            await metrics_server.stop()
+            await tracer.close()
+
+    @staticmethod
+    def _set_prefetch(weights: dict[str, int], prefetch_count: int) -> None:
+        # Prefetch делится пропорционально весам: планировщик упорядочивает
+        # только полученные сообщения, и при равных долях веса бы не работали.
+        total_weight = sum(weights.values())
+        shares = {
+            queue_name: divmod(prefetch_count * weight, total_weight)
+            for queue_name, weight in weights.items()
+        }
+        extra = prefetch_count - sum(share for share, _ in shares.values())
+        ranked = sorted(
+            weights, key=lambda name: (shares[name][1], weights[name]), reverse=True
+        )
+        for queue_name, (share, _) in shares.items():
+            consumer.set_prefetch(queue_name, share + (queue_name in ranked[:extra]))
 
     async def run(self):
         async with self.lifespan():
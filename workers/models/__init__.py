@@ -1,4 +1,5 @@
 from models.base import Base
+from models.results import TaskResultsDB
 from models.tasks import TasksDB
 
-__all__ = ("Base", "TasksDB")
+__all__ = ("Base", "TaskResultsDB", "TasksDB")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BIGINT, TIMESTAMP, String, func
+from sqlalchemy import BIGINT, INTEGER, TIMESTAMP, String, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -8,7 +8,7 @@ class Base(DeclarativeBase):
     __abstract__ = True
 
     type_annotation_map = {
-        int: BIGINT,
+        int: BIGINT().with_variant(INTEGER(), "sqlite"),
         str: String(),
         datetime: TIMESTAMP(timezone=False),
     }
@@ -0,0 +1,23 @@
+from sqlalchemy import LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base
+
+
+class TaskResultsDB(Base):
+    __tablename__ = "task_results"
+
+    digest: Mapped[str] = mapped_column(
+        String(64),
+        primary_key=True,
+        comment="SHA-256 несжатого результата",
+    )
+    size: Mapped[int] = mapped_column(
+        nullable=False,
+        comment="Размер несжатого результата в байтах",
+    )
+    data: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+        comment="Результат, сжатый zlib",
+    )
@@ -39,6 +39,10 @@ class TasksDB(Base):
         nullable=False,
         comment="Время создания",
     )
+    scheduled_at: Mapped[datetime] = mapped_column(
+        nullable=True,
+        comment="Время запланированного запуска",
+    )
     stared_at: Mapped[datetime] = mapped_column(
         nullable=True,
         comment="Время начала",
@@ -51,8 +55,26 @@ class TasksDB(Base):
         nullable=True,
         comment="Результат выполнения",
     )
+    result_ref: Mapped[str] = mapped_column(
+        String(64),
+        nullable=True,
+        comment="Ссылка на результат в хранилище task_results",
+    )
+    result_size: Mapped[int] = mapped_column(
+        nullable=True,
+        comment="Размер результата в байтах",
+    )
     error_info: Mapped[str] = mapped_column(
         Text,
         nullable=True,
         comment="Информация об ошибках",
     )
+    worker_id: Mapped[str] = mapped_column(
+        String(255),
+        nullable=True,
+        comment="Идентификатор воркера, выполняющего задачу",
+    )
+    lease_expires_at: Mapped[datetime] = mapped_column(
+        nullable=True,
+        comment="Время истечения аренды задачи воркером",
+    )
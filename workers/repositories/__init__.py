@@ -1,4 +1,5 @@
 from repositories.base import BaseRepository
+from repositories.results import TaskResultsRepository
 from repositories.tasks import TasksRepository
 
-__all__ = ("BaseRepository", "TasksRepository")
+__all__ = ("BaseRepository", "TaskResultsRepository", "TasksRepository")
@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import logging
+import sys
+import zlib
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import and_, delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from engines import PostgresEngine
+from enums import DatabaseBackend
+from models import TaskResultsDB, TasksDB
+from repositories.base import BaseRepository
+from settings import settings
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
+
+
+class TaskResultsRepository(BaseRepository):
+    def __init__(self):
+        db: PostgresEngine = PostgresEngine()
+        super().__init__(db, TaskResultsDB)
+        self.inline_max_size = settings.TASKS_RESULT_INLINE_MAX_SIZE
+        self.compression_level = settings.TASKS_RESULT_COMPRESSION_LEVEL
+
+    async def store(self, result: Any) -> dict:
+        if result is None or result == "":
+            return {}
+
+        text = str(result)
+        data = text.encode("utf-8")
+        if len(data) <= self.inline_max_size:
+            return {"result": text, "result_size": len(data)}
+
+        digest = hashlib.sha256(data).hexdigest()
+        compressed = await asyncio.to_thread(
+            zlib.compress, data, self.compression_level
+        )
+
+        insert = (
+            sqlite_insert
+            if settings.DATABASE_BACKEND == DatabaseBackend.SQLITE
+            else postgres_insert
+        )
+        stmt = (
+            insert(TaskResultsDB)
+            .values(digest=digest, size=len(data), data=compressed)
+            .on_conflict_do_update(
+                index_elements=[TaskResultsDB.digest],
+                set_={"update_date": func.now()},
+            )
+        )
+        try:
+            async with self.transaction():
+                await self.db.execute(stmt, no_return=True)  # noqa
+        except SQLAlchemyError as e:
+            log.error(f"Ошибка сохранения результата {digest} в хранилище: {e}")
+            return {"result": text, "result_size": len(data)}
+
+        return {"result_ref": digest, "result_size": len(data)}
+
+    async def purge_unreferenced(self, older_than: datetime, limit: int) -> int:
+        unreferenced = (
+            select(TaskResultsDB.digest)
+            .where(
+                and_(
+                    TaskResultsDB.update_date < older_than,
+                    ~exists().where(TasksDB.result_ref == TaskResultsDB.digest),
+                )
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            delete(TaskResultsDB)
+            .where(TaskResultsDB.digest.in_(unreferenced))
+            .returning(TaskResultsDB.digest)
+        )
+        result = await self.db.execute(stmt, return_many=True)  # noqa
+        return len(result or [])
@@ -1,50 +1,252 @@
+import asyncio
+import logging
+import sys
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
 from datetime import datetime
 
 from engines import PostgresEngine
+from enums import DatabaseBackend, StatusType
 from models import TasksDB
 from repositories import BaseRepository
-from sqlalchemy import update, and_
+from settings import settings
+from sqlalchemy import Boolean, select, update, and_, case, cast, column, values
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
+
+log = logging.getLogger(__name__)
+stream_handler = logging.StreamHandler(sys.stderr)
+stream_handler.setFormatter(logging.Formatter(settings.LOG_FORMAT))
+log.addHandler(stream_handler)
 
 
 class TasksRepository(BaseRepository):
+    BATCH_COLUMNS = (
+        "status",
+        "stared_at",
+        "completed_at",
+        "result",
+        "result_ref",
+        "result_size",
+        "error_info",
+        "worker_id",
+        "lease_expires_at",
+    )
+
     def __init__(self):
         db: PostgresEngine = PostgresEngine()
         super().__init__(db, TasksDB)
+        self.flush_interval = settings.TASKS_FLUSH_INTERVAL_MS / 1000
+        self.flush_batch_size = settings.TASKS_FLUSH_BATCH_SIZE
+        self.flush_retry_interval = settings.TASKS_FLUSH_RETRY_INTERVAL
+        self.flush_max_retries = settings.TASKS_FLUSH_MAX_RETRIES
+        self.flush_attempts: dict[int, int] = {}
+        self.pending_updates: dict[int, dict] = {}
+        self._has_updates = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._flush_listeners: list[Callable[[dict[int, dict]], Awaitable[None]]] = []
 
-    async def set_task_status(self, task_id: int, status: str) -> None:
-        stmt = update(TasksDB).where(and_(TasksDB.id == task_id)).values(status=status)
-        await self.db.execute(stmt, no_return=True)  # noqa
-
-    async def set_task_stared_at(self, task_id: int, stared_at: datetime) -> None:
+    async def extend_leases(
+        self, task_ids: list[int], worker_id: str, lease_expires_at: datetime
+    ) -> None:
         stmt = (
             update(TasksDB)
-            .where(and_(TasksDB.id == task_id))
-            .values(stared_at=stared_at)
+            .where(
+                and_(
+                    TasksDB.id.in_(task_ids),
+                    TasksDB.worker_id == worker_id,
+                    TasksDB.status == StatusType.IN_PROGRESS,
+                )
+            )
+            .values(lease_expires_at=lease_expires_at)
         )
         await self.db.execute(stmt, no_return=True)  # noqa
 
-    async def set_task_completed_at(self, task_id: int, completed_at: datetime) -> None:
+    async def requeue_expired_leases(self, now: datetime, limit: int) -> list[TasksDB]:
+        expired = (
+            select(TasksDB.id)
+            .where(
+                and_(
+                    TasksDB.status == StatusType.IN_PROGRESS,
+                    TasksDB.lease_expires_at < now,
+                )
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
         stmt = (
             update(TasksDB)
-            .where(and_(TasksDB.id == task_id))
-            .values(completed_at=completed_at)
+            .where(TasksDB.id.in_(expired))
+            .values(status=StatusType.PENDING, worker_id=None, lease_expires_at=None)
+            .returning(TasksDB)
         )
-        await self.db.execute(stmt, no_return=True)  # noqa
+        result = await self.db.execute(stmt, return_many=True)  # noqa
+        return result or []
 
-    async def set_task_result(self, task_id: int, result: str) -> None:
-        if not result:
+    def add_flush_listener(
+        self, listener: Callable[[dict[int, dict]], Awaitable[None]]
+    ) -> None:
+        self._flush_listeners.append(listener)
+
+    def schedule_update(self, task_id: int, **fields) -> None:
+        values_to_set = {
+            name: value for name, value in fields.items() if name in self.BATCH_COLUMNS
+        }
+        if not values_to_set:
             return
 
-        stmt = update(TasksDB).where(and_(TasksDB.id == task_id)).values(result=result)
-        await self.db.execute(stmt, no_return=True)  # noqa
+        self.pending_updates.setdefault(task_id, {}).update(values_to_set)
+        self._has_updates.set()
+        if len(self.pending_updates) >= self.flush_batch_size:
+            self._batch_full.set()
 
-    async def set_task_error_info(self, task_id: int, error_info: str) -> None:
-        if not error_info:
-            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(
+                self._flush_loop(), name="tasks-flush"
+            )
 
-        stmt = (
+    async def flush(self) -> bool:
+        async with self._flush_lock:
+            if not self.pending_updates:
+                return True
+
+            pending, self.pending_updates = self.pending_updates, {}
+            self._has_updates.clear()
+            self._batch_full.clear()
+
+            written, failed = await self._write_updates(list(pending.items()))
+            for task_id, _ in written:
+                self.flush_attempts.pop(task_id, None)
+            self._requeue_updates(failed)
+
+        if written:
+            for listener in self._flush_listeners:
+                try:
+                    await listener(dict(written))
+                except Exception as e:
+                    log.error(f"Ошибка обработки записанных статусов задач: {e}")
+
+        return not failed
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._has_updates.wait()
+
+            if not self._batch_full.is_set():
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        self._batch_full.wait(), timeout=self.flush_interval
+                    )
+
+            if not await self.flush():
+                await asyncio.sleep(self.flush_retry_interval)
+
+    async def _write_updates(
+        self, rows: list[tuple[int, dict]]
+    ) -> tuple[list[tuple[int, dict]], list[tuple[int, dict]]]:
+        try:
+            async with self.transaction():
+                for start in range(0, len(rows), self.flush_batch_size):
+                    for stmt in self._build_batch_updates(
+                        rows[start : start + self.flush_batch_size]
+                    ):
+                        await self.db.execute(stmt, no_return=True)  # noqa
+        except (OperationalError, InterfaceError) as e:
+            log.error(f"Ошибка пакетной записи статусов задач: {e}")
+            return [], rows
+        except SQLAlchemyError as e:
+            if len(rows) == 1:
+                log.error(f"Отброшено обновление статуса задачи {rows[0][0]}: {e}")
+                self.flush_attempts.pop(rows[0][0], None)
+                return [], []
+
+            middle = len(rows) // 2
+            written, failed = await self._write_updates(rows[:middle])
+            if failed:
+                return written, failed + rows[middle:]
+            rest_written, failed = await self._write_updates(rows[middle:])
+            return written + rest_written, failed
+
+        return rows, []
+
+    def _requeue_updates(self, rows: list[tuple[int, dict]]) -> None:
+        for task_id, fields in rows:
+            attempts = self.flush_attempts.get(task_id, 0) + 1
+            if attempts > self.flush_max_retries:
+                log.error(
+                    f"Отброшено обновление статуса задачи {task_id} "
+                    f"после {self.flush_max_retries} попыток"
+                )
+                self.flush_attempts.pop(task_id, None)
+                continue
+
+            self.flush_attempts[task_id] = attempts
+            self.pending_updates[task_id] = fields | self.pending_updates.get(
+                task_id, {}
+            )
+
+        if self.pending_updates:
+            self._has_updates.set()
+
+    def _build_batch_updates(self, batch: list[tuple[int, dict]]) -> list:
+        if settings.DATABASE_BACKEND == DatabaseBackend.SQLITE:
+            return [
+                update(TasksDB).where(TasksDB.id == task_id).values(**fields)
+                for task_id, fields in batch
+            ]
+        return [self._build_batch_update(batch)]
+
+    def _build_batch_update(self, batch: list[tuple[int, dict]]):
+        table = TasksDB.__table__
+        batch_values = values(
+            column("id", table.c.id.type),
+            *(
+                batch_column
+                for name in self.BATCH_COLUMNS
+                for batch_column in (
+                    column(name, table.c[name].type),
+                    column(f"{name}_set", Boolean()),
+                )
+            ),
+            name="batch",
+        ).data(
+            [
+                (
+                    task_id,
+                    *(
+                        value
+                        for name in self.BATCH_COLUMNS
+                        for value in (fields.get(name), name in fields)
+                    ),
+                )
+                for task_id, fields in batch
+            ]
+        )
+
+        return (
             update(TasksDB)
-            .where(and_(TasksDB.id == task_id))
-            .values(error_info=error_info)
+            .where(TasksDB.id == batch_values.c.id)
+            .values(
+                {
+                    name: case(
+                        (
+                            batch_values.c[f"{name}_set"],
+                            cast(batch_values.c[name], table.c[name].type),
+                        ),
+                        else_=table.c[name],
+                    )
+                    for name in self.BATCH_COLUMNS
+                }
+            )
         )
-        await self.db.execute(stmt, no_return=True)  # noqa
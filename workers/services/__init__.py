@@ -1,4 +1,7 @@
 from services.base import BaseWorker
+from services.cancel_flags import CancelFlags
+from services.credits import TierCredits
+from services.memo import ResultMemo
 from services.consumer import TaskConsumer
 
-__all__ = ["BaseWorker", "TaskConsumer"]
+__all__ = ["BaseWorker", "CancelFlags", "ResultMemo", "TaskConsumer", "TierCredits"]
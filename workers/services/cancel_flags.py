@@ -0,0 +1,55 @@
+import sys
+from multiprocessing.shared_memory import SharedMemory
+
+# Процессы пула только читают флаги, сегмент удаляет владелец через close().
+_attach_options = {"track": False} if sys.version_info >= (3, 13) else {}
+_attached: dict[str, SharedMemory] = {}
+
+
+class CancelFlags:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.shm = SharedMemory(create=True, size=size)
+        self.shm.buf[:size] = bytes(size)
+        _attached[self.shm.name] = self.shm
+        self.slots: dict[int, int] = {}
+        self._free_slots = list(range(size - 1, -1, -1))
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def acquire(self, task_id: int) -> int:
+        if not self._free_slots:
+            raise RuntimeError("Нет свободных слотов для флагов отмены задач")
+
+        slot = self._free_slots.pop()
+        self.shm.buf[slot] = 0
+        self.slots[task_id] = slot
+        return slot
+
+    def cancel(self, task_id: int) -> bool:
+        slot = self.slots.get(task_id)
+        if slot is None:
+            return False
+
+        self.shm.buf[slot] = 1
+        return True
+
+    def release(self, task_id: int) -> None:
+        slot = self.slots.pop(task_id, None)
+        if slot is not None:
+            self._free_slots.append(slot)
+
+    def close(self) -> None:
+        self.slots.clear()
+        _attached.pop(self.shm.name, None)
+        self.shm.close()
+        self.shm.unlink()
+
+    @staticmethod
+    def is_cancelled(name: str, slot: int) -> bool:
+        shm = _attached.get(name)
+        if shm is None:
+            shm = _attached[name] = SharedMemory(name=name, **_attach_options)
+        return shm.buf[slot] == 1
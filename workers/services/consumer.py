@@ -1,16 +1,37 @@
+import os
+import socket
 import sys
 import logging
 import asyncio
 import time
+from collections import OrderedDict
+from contextlib import suppress
 from typing import Optional
-from multiprocessing import get_context, Manager
-from numpy import sum, array
+from uuid import uuid4
+from multiprocessing import get_context
 from concurrent import futures
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from enums import PriorityType, StatusType
-from repositories import TasksRepository
-from services import BaseWorker
+from engines import producer, tracer
+from engines.metrics import (
+    task_queue_wait,
+    task_result_memo,
+    task_run_duration,
+    tasks_in_flight,
+    tier_slots,
+)
+from engines.tracing import Span, SpanContext
+from enums import (
+    ExchangeType,
+    ExecutionMode,
+    Priority,
+    PriorityType,
+    RoutingType,
+    StatusType,
+)
+from repositories import TaskResultsRepository, TasksRepository
+from services import BaseWorker, CancelFlags, ResultMemo, TierCredits
+from services.handlers import TaskCancelledError, TaskHandler, handlers
 from settings import settings
 
 
@@ -24,58 +45,181 @@ class TaskConsumer(BaseWorker):
     def __init__(self, queue_name: str, max_workers: int = None):
         super().__init__(queue_name, prefetch_count=max_workers)
         self.tasks_repository: TasksRepository = TasksRepository()
-        self.max_workers = max_workers
+        self.results_repository: TaskResultsRepository = TaskResultsRepository()
+        self.max_workers = max_workers or os.cpu_count() or 1
         self.futures: dict[int, futures.Future] = {}
         self.executor = futures.ProcessPoolExecutor(
             max_workers=self.max_workers, mp_context=get_context("spawn")
         )
+        self.thread_executor = futures.ThreadPoolExecutor(
+            max_workers=settings.TASKS_THREAD_WORKERS, thread_name_prefix="task"
+        )
+        self.credits = TierCredits(
+            capacity={
+                ExecutionMode.ASYNC: settings.TASKS_ASYNC_CONCURRENCY,
+                ExecutionMode.THREAD: settings.TASKS_THREAD_WORKERS,
+                ExecutionMode.PROCESS: self.max_workers,
+            }
+        )
+        self.task_modes: dict[int, ExecutionMode] = {}
+        self.completions: dict[int, asyncio.Future] = {}
+        self.task_started: dict[int, tuple[float, str]] = {}
+        self.task_spans: dict[int, Span] = {}
+        tier_slots.collect = self._collect_tier_slots
+        tasks_in_flight.collect = lambda: {(): len(self.futures)}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_ttl = timedelta(seconds=settings.TASKS_LEASE_TTL)
+        self._lease_task: Optional[asyncio.Task] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._results_gc_task: Optional[asyncio.Task] = None
+        self._stats_task: Optional[asyncio.Task] = None
+        self.dispatchers = {
+            ExecutionMode.ASYNC: self._submit_async,
+            ExecutionMode.THREAD: self._submit_thread,
+            ExecutionMode.PROCESS: self._submit_process,
+        }
         self.loop: Optional[asyncio.AbstractEventLoop] = None
-        self.manager = Manager()
-        self.cancel_flags = self.manager.dict()
+        self.cancel_flags = CancelFlags(size=settings.TASKS_CANCEL_SLOTS)
+        self.cancel_queue = f"{RoutingType.TASK_CANCELED}.{uuid4().hex}"
+        self.tombstones: OrderedDict[int, float] = OrderedDict()
+        self.result_memo = ResultMemo(
+            handlers=settings.TASKS_RESULT_MEMO_HANDLERS,
+            ttl=settings.TASKS_RESULT_MEMO_TTL,
+            size=settings.TASKS_RESULT_MEMO_SIZE,
+        )
+        self.memo_keys: dict[int, str] = {}
+        self.tasks_repository.add_flush_listener(self._publish_task_events)
 
-    async def process_message(self, message: dict[str]):
+    async def start(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._lease_task = asyncio.create_task(self._lease_loop(), name="task-leases")
+        if not settings.TASKS_ACK_ON_COMPLETION:
+            # При подтверждении по завершении брокер сам вернет сообщения
+            # упавшего воркера, повторная публикация запустила бы задачу дважды.
+            self._reaper_task = asyncio.create_task(
+                self._reaper_loop(), name="task-reaper"
+            )
+        if settings.TASKS_RESULT_GC_INTERVAL > 0:
+            self._results_gc_task = asyncio.create_task(
+                self._results_gc_loop(), name="task-results-gc"
+            )
+        if settings.TASKS_STATS_LOG_INTERVAL > 0:
+            self._stats_task = asyncio.create_task(
+                self._stats_loop(), name="task-stats"
+            )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {mode.lower(): tier for mode, tier in self.credits.snapshot().items()}
+
+    async def process_message(self, message: dict[str]) -> Optional[asyncio.Future]:
         task_id = message.get("id")
-        task_priority = message.get("priority")
 
         self.loop = asyncio.get_running_loop()
 
-        try:
-            if task_priority == PriorityType.HIGH.value:
-                self.cancel_flags[task_id] = False
-                future = self.executor.submit(
-                    self._process_task_sync,
-                    task_id=task_id,
-                    cancel_flags=self.cancel_flags,
-                )
-            else:
-                future = asyncio.create_task(self._process_task_async(task_id=task_id))
+        if self._drop_if_tombstoned(task_id):
+            return None
 
-            await self.tasks_repository.set_task_status(
-                task_id=task_id, status=StatusType.IN_PROGRESS
-            )
-            await self.tasks_repository.set_task_stared_at(
-                task_id=task_id, stared_at=datetime.now()
-            )
+        handler = handlers.get(message.get("name"), message.get("priority"))
+        memo_key = self.result_memo.key(handler.name, message)
+        if memo_key is not None and self._complete_from_memo(
+            task_id, handler, memo_key
+        ):
+            return None
 
-            self.futures[task_id] = future
-            future.add_done_callback(
-                lambda futura: self.__on_task_complete(futura, task_id)
-            )
+        with tracer.span("task.acquire_slot", mode=handler.mode):
+            await self.credits.acquire(handler.mode)
+        self.task_modes[task_id] = handler.mode
+
+        if self._drop_if_tombstoned(task_id) or (
+            memo_key is not None
+            and self._complete_from_memo(task_id, handler, memo_key)
+        ):
+            await self._release_credit(task_id)
+            return None
+
+        run_span = tracer.start_span(
+            "task.run", task_id=task_id, handler=handler.name, mode=handler.mode
+        )
+        trace = run_span.context.to_headers() if run_span else None
+        try:
+            future = self.dispatchers[handler.mode](handler, message, trace)
         except Exception as e:
-            failed_completed_at = datetime.now()
-            await self.tasks_repository.set_task_status(
-                task_id=task_id, status=StatusType.FAILED
-            )
-            await self.tasks_repository.set_task_completed_at(
-                task_id=task_id, completed_at=failed_completed_at
-            )
-            await self.tasks_repository.set_task_error_info(
-                task_id=task_id, error_info=e
+            self.tasks_repository.schedule_update(
+                task_id,
+                status=StatusType.FAILED,
+                completed_at=datetime.now(),
+                error_info=str(e),
             )
+            tracer.end_span(run_span, status=StatusType.FAILED, error=str(e))
+            await self._release_credit(task_id)
             log.error(f"Ошибка отправки задачи: {e}")
+            return None
+
+        # Отправленную задачу учитываем сразу, чтобы ее результат и кредит
+        # обработал __handle_task_completion, даже если дальше что-то упадет.
+        completion = self.loop.create_future()
+        self.completions[task_id] = completion
+        self.futures[task_id] = future
+        if run_span:
+            self.task_spans[task_id] = run_span
+        if memo_key is not None:
+            task_result_memo.inc(handler.name, "miss")
+            self.memo_keys[task_id] = memo_key
+        future.add_done_callback(
+            lambda futura: self.__on_task_complete(futura, task_id)
+        )
+
+        stared_at = datetime.now()
+        self.tasks_repository.schedule_update(
+            task_id,
+            status=StatusType.IN_PROGRESS,
+            stared_at=stared_at,
+            worker_id=self.worker_id,
+            lease_expires_at=stared_at + self.lease_ttl,
+        )
+        self._observe_start(message, stared_at)
+        return completion
+
+    def _submit_async(
+        self, handler: TaskHandler, task: dict, trace: Optional[dict]
+    ) -> asyncio.Task:
+        return asyncio.create_task(self._run_async_handler(handler, task, trace))
+
+    def _submit_thread(
+        self, handler: TaskHandler, task: dict, trace: Optional[dict]
+    ) -> futures.Future:
+        return self._submit_sync(self.thread_executor, handler, task, trace)
+
+    def _submit_process(
+        self, handler: TaskHandler, task: dict, trace: Optional[dict]
+    ) -> futures.Future:
+        return self._submit_sync(self.executor, handler, task, trace)
+
+    def _submit_sync(
+        self,
+        executor: futures.Executor,
+        handler: TaskHandler,
+        task: dict,
+        trace: Optional[dict],
+    ) -> futures.Future:
+        task_id = task.get("id")
+        cancel_slot = self.cancel_flags.acquire(task_id)
+        try:
+            return executor.submit(
+                self._run_sync_handler,
+                name=handler.name,
+                task=task,
+                cancel_flags=self.cancel_flags.name,
+                cancel_slot=cancel_slot,
+                trace=trace,
+            )
+        except Exception:
+            self.cancel_flags.release(task_id)
+            raise
 
     async def cancel_task(self, message: dict[str]) -> bool:
         task_id = int(message.get("id"))
+        self._add_tombstone(task_id)
 
         if task_id not in self.futures:
             return False
@@ -88,24 +232,36 @@ class TaskConsumer(BaseWorker):
                     await asyncio.wait_for(future, timeout=1.0)
                 except (asyncio.CancelledError, asyncio.TimeoutError):
                     pass
-                await self.tasks_repository.set_task_status(
-                    task_id=task_id, status=StatusType.CANCELLED
+                self.tasks_repository.schedule_update(
+                    task_id, status=StatusType.CANCELLED
                 )
         elif isinstance(future, futures.Future):
-            if task_id in self.cancel_flags:
-                self.cancel_flags[task_id] = True
+            self.cancel_flags.cancel(task_id)
 
             if not future.done():
                 canceled = future.cancel()
                 if canceled:
-                    await self.tasks_repository.set_task_status(
-                        task_id=task_id, status=StatusType.CANCELLED
+                    self.tasks_repository.schedule_update(
+                        task_id, status=StatusType.CANCELLED
                     )
 
         self.futures.pop(task_id, None)
         return True
 
     async def stop(self):
+        for task in (
+            self._lease_task,
+            self._reaper_task,
+            self._results_gc_task,
+            self._stats_task,
+        ):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._lease_task = self._reaper_task = None
+        self._results_gc_task = self._stats_task = None
+
         if self.futures:
             log.info(f"Ожидаем завершения задач: {len(self.futures)}")
 
@@ -124,6 +280,68 @@ class TaskConsumer(BaseWorker):
                     future.cancel()
 
         self.executor.shutdown(wait=True)
+        self.thread_executor.shutdown(wait=True)
+        self.cancel_flags.close()
+        await self.tasks_repository.close()
+
+    def _add_tombstone(self, task_id: int) -> None:
+        self.tombstones[task_id] = time.monotonic() + settings.TASKS_TOMBSTONE_TTL
+        self.tombstones.move_to_end(task_id)
+        self._prune_tombstones()
+
+    def _is_tombstoned(self, task_id: int) -> bool:
+        self._prune_tombstones()
+        return task_id in self.tombstones
+
+    def _drop_if_tombstoned(self, task_id: int) -> bool:
+        if not self._is_tombstoned(task_id):
+            return False
+
+        self.tasks_repository.schedule_update(
+            task_id, status=StatusType.CANCELLED, completed_at=datetime.now()
+        )
+        log.info(f"Задача {task_id} отменена до запуска")
+        return True
+
+    def _complete_from_memo(
+        self, task_id: int, handler: TaskHandler, memo_key: str
+    ) -> bool:
+        if (result_fields := self.result_memo.get(memo_key)) is None:
+            return False
+
+        task_result_memo.inc(handler.name, "hit")
+        completed_at = datetime.now()
+        self.tasks_repository.schedule_update(
+            task_id,
+            status=StatusType.COMPLETED,
+            stared_at=completed_at,
+            completed_at=completed_at,
+            **result_fields,
+        )
+        log.debug(f"Задача {task_id} завершена результатом из кэша")
+        return True
+
+    def _prune_tombstones(self) -> None:
+        now = time.monotonic()
+        while self.tombstones and (
+            len(self.tombstones) > settings.TASKS_TOMBSTONE_SIZE
+            or next(iter(self.tombstones.values())) <= now
+        ):
+            self.tombstones.popitem(last=False)
+
+    @staticmethod
+    async def _publish_task_events(updates: dict[int, dict]) -> None:
+        events = [
+            {"id": task_id, "status": fields["status"]}
+            for task_id, fields in updates.items()
+            if "status" in fields
+        ]
+        if not events:
+            return
+
+        await producer.publish(
+            exchange=ExchangeType.TASK_EVENTS, routing_key="", body={"events": events}
+        )
 
     def __on_task_complete(self, futura, task_id):
         asyncio.run_coroutine_threadsafe(
@@ -132,92 +350,213 @@ class TaskConsumer(BaseWorker):
 
     async def __handle_task_completion(self, futura, task_id):
         failed_completed_at = datetime.now()
+        status = StatusType.CANCELLED if futura.cancelled() else StatusType.FAILED
 
         try:
             if futura_exception := futura.exception():
-                await self.tasks_repository.set_task_status(
-                    task_id=task_id, status=StatusType.FAILED
-                )
-                await self.tasks_repository.set_task_completed_at(
-                    task_id=task_id, completed_at=failed_completed_at
-                )
-                await self.tasks_repository.set_task_error_info(
-                    task_id=task_id, error_info=str(futura_exception)
+                self.tasks_repository.schedule_update(
+                    task_id,
+                    status=StatusType.FAILED,
+                    completed_at=failed_completed_at,
+                    error_info=str(futura_exception),
                 )
                 log.error(f"Задача {task_id} завершилась ошибкой: {futura_exception}")
             else:
                 future = futura.result()
                 task_id = future.get("task_id")
                 status = future.get("status")
-                result = future.get("result")
-                completed_at = future.get("completed_at")
-                error_info = future.get("error_info")
-                await self.tasks_repository.set_task_status(
-                    task_id=task_id, status=status
-                )
-                await self.tasks_repository.set_task_completed_at(
-                    task_id=task_id, completed_at=completed_at
+                if handler_span := future.get("span"):
+                    tracer.record(handler_span)
+                result_fields = await self.results_repository.store(
+                    future.get("result")
                 )
-                await self.tasks_repository.set_task_result(
-                    task_id=task_id, result=result
-                )
-                await self.tasks_repository.set_task_error_info(
-                    task_id=task_id, error_info=error_info
+                if status == StatusType.COMPLETED and (
+                    memo_key := self.memo_keys.get(task_id)
+                ):
+                    self.result_memo.put(memo_key, result_fields)
+                self.tasks_repository.schedule_update(
+                    task_id,
+                    status=future.get("status"),
+                    completed_at=future.get("completed_at"),
+                    error_info=future.get("error_info"),
+                    **result_fields,
                 )
         except Exception as e:
             log.error(f"Ошибка обработки результата задачи {task_id}: {e}")
         finally:
+            self._observe_finish(task_id, status)
+            tracer.end_span(self.task_spans.pop(task_id, None), status=status)
             self.futures.pop(task_id, None)
+            self.memo_keys.pop(task_id, None)
+            self.cancel_flags.release(task_id)
+            await self._release_credit(task_id)
+            if (completion := self.completions.pop(task_id, None)) is not None:
+                completion.set_result(None)
 
-    @staticmethod
-    def _process_task_sync(task_id: int, cancel_flags: dict):
-        try:
-            result = sum(array([10, 20, 30, 40, 50, 60, 70, 80, 90, 100]) ** 2)
+    def _observe_start(self, task: dict, stared_at: datetime) -> None:
+        priority = task.get("priority") or ""
+        self.task_started[task.get("id")] = (time.perf_counter(), priority)
+
+        if created_at := task.get("scheduled_at") or task.get("created_at"):
+            try:
+                wait = (stared_at - datetime.fromisoformat(created_at)).total_seconds()
+            except (TypeError, ValueError) as e:
+                log.warning(f"Некорректное время создания задачи {task.get('id')}: {e}")
+                return
+            task_queue_wait.observe(max(wait, 0.0), priority)
+
+    def _observe_finish(self, task_id: int, status: StatusType) -> None:
+        if (started := self.task_started.pop(task_id, None)) is not None:
+            started_at, priority = started
+            task_run_duration.observe(
+                time.perf_counter() - started_at, priority, status
+            )
+
+    def _collect_tier_slots(self) -> dict[tuple[str, ...], float]:
+        return {
+            (tier, state): value
+            for tier, states in self.stats().items()
+            for state, value in states.items()
+        }
+
+    async def _lease_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TASKS_LEASE_HEARTBEAT)
+            if not self.task_modes:
+                continue
+
+            try:
+                await self.tasks_repository.extend_leases(
+                    task_ids=list(self.task_modes),
+                    worker_id=self.worker_id,
+                    lease_expires_at=datetime.now() + self.lease_ttl,
+                )
+            except Exception as e:
+                log.error(f"Ошибка продления аренды задач: {e}")
+
+    async def _reaper_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TASKS_REAPER_INTERVAL)
+            try:
+                await self.requeue_expired_tasks()
+            except Exception as e:
+                log.error(f"Ошибка возврата зависших задач в очередь: {e}")
+
+    async def _results_gc_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TASKS_RESULT_GC_INTERVAL)
+            try:
+                await self.purge_unreferenced_results()
+            except Exception as e:
+                log.error(f"Ошибка удаления результатов без ссылок: {e}")
+
+    async def _stats_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TASKS_STATS_LOG_INTERVAL)
+            log.info(f"Загрузка пулов выполнения задач: {self.stats()}")
 
-            sleep_time = 10.0
-            interval = 0.1
+    async def requeue_expired_tasks(self) -> int:
+        tasks = await self.tasks_repository.requeue_expired_leases(
+            now=datetime.now(), limit=settings.TASKS_REAPER_BATCH_SIZE
+        )
+        for task in tasks:
+            await producer.publish(
+                exchange=ExchangeType.TASKS,
+                routing_key=self._get_task_routing_key(task.priority),
+                priority=Priority.get_priority_value(task.priority),
+                body={
+                    "id": task.id,
+                    "name": task.name,
+                    "description": task.description,
+                    "priority": task.priority,
+                    "created_at": task.created_at.isoformat(),
+                },
+            )
+
+        if tasks:
+            log.warning(f"Возвращены в очередь задачи с истекшей арендой: {len(tasks)}")
+            await self._publish_task_events(
+                {task.id: {"status": StatusType.PENDING} for task in tasks}
+            )
+
+        return len(tasks)
 
-            while sleep_time > 0:
-                if cancel_flags.get(task_id, False):
-                    if task_id in cancel_flags:
-                        del cancel_flags[task_id]
-                    return {
-                        "task_id": task_id,
-                        "status": StatusType.CANCELLED,
-                        "completed_at": datetime.now(),
-                    }
+    async def purge_unreferenced_results(self) -> int:
+        older_than = datetime.now() - timedelta(seconds=settings.TASKS_RESULT_GC_GRACE)
+        purged = 0
+        while True:
+            batch = await self.results_repository.purge_unreferenced(
+                older_than=older_than, limit=settings.TASKS_RESULT_GC_BATCH_SIZE
+            )
+            purged += batch
+            if batch < settings.TASKS_RESULT_GC_BATCH_SIZE:
+                break
 
-                chunk = min(sleep_time, interval)
-                time.sleep(chunk)
-                sleep_time -= chunk
+        if purged:
+            log.info(f"Удалены результаты без ссылок: {purged}")
 
-            if task_id in cancel_flags:
-                del cancel_flags[task_id]
+        return purged
 
-            return {
+    @staticmethod
+    def _get_task_routing_key(priority: PriorityType) -> str:
+        if settings.TASKS_PRIORITY_QUEUES:
+            return RoutingType.get_task_routing_key(priority)
+        return RoutingType.TASK
+
+    async def _release_credit(self, task_id: int) -> None:
+        if (mode := self.task_modes.pop(task_id, None)) is not None:
+            await self.credits.release(mode)
+
+    @staticmethod
+    def _run_sync_handler(
+        name: str | None,
+        task: dict,
+        cancel_flags: str,
+        cancel_slot: int,
+        trace: Optional[dict] = None,
+    ) -> dict:
+        task_id = task.get("id")
+        handler = handlers.get(name)
+        span = TaskConsumer._start_handler_span(handler, trace)
+        try:
+            result = handler.func(
+                task, lambda: CancelFlags.is_cancelled(cancel_flags, cancel_slot)
+            )
+            future = {
                 "task_id": task_id,
                 "status": StatusType.COMPLETED,
-                "result": f"Получена сумма квадратов = {result}",
+                "result": result,
+                "completed_at": datetime.now(),
+            }
+        except TaskCancelledError:
+            future = {
+                "task_id": task_id,
+                "status": StatusType.CANCELLED,
                 "completed_at": datetime.now(),
             }
         except Exception as e:
             log.error(f"Задача {task_id} завершилась ошибкой: {e}")
-            if task_id in cancel_flags:
-                del cancel_flags[task_id]
-
-            return {
+            future = {
                 "task_id": task_id,
                 "status": StatusType.FAILED,
                 "completed_at": datetime.now(),
                 "error_info": str(e),
             }
 
+        if span:
+            span.set_attribute("status", future["status"])
+            future["span"] = span.end().to_dict()
+        return future
+
     @staticmethod
-    async def _process_task_async(task_id: int):
+    async def _run_async_handler(
+        handler: TaskHandler, task: dict, trace: Optional[dict] = None
+    ) -> dict:
+        task_id = task.get("id")
+        span = TaskConsumer._start_handler_span(handler, trace)
         try:
-            result = "Получен id пользователя = 555"
-            await asyncio.sleep(10)
-            return {
+            result = await handler.func(task)
+            future = {
                 "task_id": task_id,
                 "status": StatusType.COMPLETED,
                 "result": result,
@@ -225,9 +564,23 @@ class TaskConsumer(BaseWorker):
             }
         except Exception as e:
             log.error(f"Задача {task_id} завершилась ошибкой: {e}")
-            return {
+            future = {
                 "task_id": task_id,
                 "status": StatusType.FAILED,
                 "completed_at": datetime.now(),
                 "error_info": str(e),
             }
+
+        if span:
+            span.set_attribute("status", future["status"])
+            future["span"] = span.end().to_dict()
+        return future
+
+    @staticmethod
+    def _start_handler_span(
+        handler: TaskHandler, trace: Optional[dict]
+    ) -> Optional[Span]:
+        if (parent := SpanContext.from_headers(trace)) is None or not parent.sampled:
+            return None
+
+        return Span.from_parent("task.handler", parent, handler=handler.name)
@@ -0,0 +1,62 @@
+import asyncio
+from collections.abc import Callable
+
+from enums import ExecutionMode
+
+
+class TierCredits:
+    def __init__(self, capacity: dict[ExecutionMode, int]) -> None:
+        self.capacity = capacity
+        self.in_use: dict[ExecutionMode, int] = dict.fromkeys(capacity, 0)
+        self.waiting: dict[ExecutionMode, int] = dict.fromkeys(capacity, 0)
+        self._released = asyncio.Condition()
+        self._listeners: list[Callable[[int], None]] = []
+
+    @property
+    def used(self) -> int:
+        return sum(self.in_use.values())
+
+    @property
+    def free(self) -> int:
+        # Занятый пул не должен останавливать остальные: его сообщения
+        # ждут своего слота в acquire, пока свободные пулы продолжают работу.
+        return sum(
+            max(self.capacity[mode] - self.in_use[mode], 0) for mode in self.capacity
+        )
+
+    def snapshot(self) -> dict[ExecutionMode, dict[str, int]]:
+        return {
+            mode: {
+                "capacity": self.capacity[mode],
+                "in_use": self.in_use[mode],
+                "waiting": self.waiting[mode],
+            }
+            for mode in self.capacity
+        }
+
+    def add_listener(self, listener: Callable[[int], None]) -> None:
+        self._listeners.append(listener)
+        listener(self.free)
+
+    async def acquire(self, mode: ExecutionMode) -> None:
+        async with self._released:
+            self.waiting[mode] += 1
+            try:
+                await self._released.wait_for(
+                    lambda: self.in_use[mode] < self.capacity[mode]
+                )
+            finally:
+                self.waiting[mode] -= 1
+            self.in_use[mode] += 1
+        self._notify()
+
+    async def release(self, mode: ExecutionMode) -> None:
+        async with self._released:
+            self.in_use[mode] -= 1
+            self._released.notify_all()
+        self._notify()
+
+    def _notify(self) -> None:
+        free = self.free
+        for listener in self._listeners:
+            listener(free)
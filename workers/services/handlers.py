@@ -0,0 +1,82 @@
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from numpy import array, sum
+
+from enums import ExecutionMode
+from settings import settings
+
+
+class TaskCancelledError(Exception): ...
+
+
+class TaskHandler:
+    def __init__(
+        self, name: str, func: Callable[..., Any], mode: ExecutionMode
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.mode = mode
+
+
+class HandlerRegistry:
+    def __init__(
+        self, default: str, priority_defaults: dict[str, str] | None = None
+    ) -> None:
+        self.default = default
+        self.priority_defaults = priority_defaults or {}
+        self.handlers: dict[str, TaskHandler] = {}
+
+    def register(
+        self, name: str, mode: ExecutionMode
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            if mode == ExecutionMode.ASYNC and not asyncio.iscoroutinefunction(func):
+                raise ValueError(f"Обработчик {name} должен быть корутиной")
+            if mode != ExecutionMode.ASYNC and asyncio.iscoroutinefunction(func):
+                raise ValueError(f"Обработчик {name} не должен быть корутиной")
+
+            self.handlers[name] = TaskHandler(name=name, func=func, mode=mode)
+            return func
+
+        return decorator
+
+    def get(self, name: str | None, priority: str | None = None) -> TaskHandler:
+        if handler := self.handlers.get(name):
+            return handler
+        return self.handlers[self.priority_defaults.get(priority, self.default)]
+
+
+def sleep_cancellable(seconds: float, is_cancelled: Callable[[], bool]) -> None:
+    interval = settings.TASKS_CANCEL_CHECK_INTERVAL_MS / 1000
+    while seconds > 0:
+        if is_cancelled():
+            raise TaskCancelledError
+
+        chunk = min(seconds, interval)
+        time.sleep(chunk)
+        seconds -= chunk
+
+    if is_cancelled():
+        raise TaskCancelledError
+
+
+handlers = HandlerRegistry(
+    default=settings.TASKS_DEFAULT_HANDLER,
+    priority_defaults=settings.TASKS_PRIORITY_HANDLERS,
+)
+
+
+@handlers.register("sum_of_squares", ExecutionMode.PROCESS)
+def sum_of_squares(task: dict, is_cancelled: Callable[[], bool]) -> str:
+    result = sum(array([10, 20, 30, 40, 50, 60, 70, 80, 90, 100]) ** 2)
+    sleep_cancellable(10.0, is_cancelled)
+    return f"Получена сумма квадратов = {result}"
+
+
+@handlers.register("fetch_user", ExecutionMode.ASYNC)
+async def fetch_user(task: dict) -> str:
+    await asyncio.sleep(10)
+    return "Получен id пользователя = 555"
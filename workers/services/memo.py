@@ -0,0 +1,44 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+
+class ResultMemo:
+    def __init__(self, handlers: list[str], ttl: float, size: int) -> None:
+        self.handlers = set(handlers)
+        self.ttl = ttl
+        self.size = size
+        self.results: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+    def key(self, handler: str, task: dict) -> str | None:
+        if handler not in self.handlers:
+            return None
+
+        inputs = {
+            "handler": handler,
+            "name": task.get("name"),
+            "description": task.get("description"),
+        }
+        body = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        self._prune()
+        item = self.results.get(key)
+        return item[0] if item is not None else None
+
+    def put(self, key: str, result_fields: dict) -> None:
+        self.results[key] = (result_fields, time.monotonic() + self.ttl)
+        self.results.move_to_end(key)
+        self._prune()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        while self.results and (
+            len(self.results) > self.size or next(iter(self.results.values()))[1] <= now
+        ):
+            self.results.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.results)
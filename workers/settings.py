@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
 
+from enums import BrokerBackend, DatabaseBackend
+
 
 class Settings(BaseSettings):
     WORKERS: int = 1
@@ -14,6 +16,56 @@ class Settings(BaseSettings):
     POSTGRES_POOL_SIZE: int = 20
     POSTGRES_MAX_OVERFLOW: int = 5
 
+    DATABASE_BACKEND: DatabaseBackend = DatabaseBackend.POSTGRES
+    SQLITE_PATH: str = "tasks.db"
+    SQLITE_BUSY_TIMEOUT: float = 30.0
+    BROKER_BACKEND: BrokerBackend = BrokerBackend.RABBITMQ
+
+    TASKS_THREAD_WORKERS: int = 8
+    TASKS_ASYNC_CONCURRENCY: int = 100
+    TASKS_STATS_LOG_INTERVAL: float = 60.0
+    TASKS_DEFAULT_HANDLER: str = "fetch_user"
+    TASKS_PRIORITY_HANDLERS: dict[str, str] = {"HIGH": "sum_of_squares"}
+
+    TASKS_FLUSH_INTERVAL_MS: int = 5
+    TASKS_FLUSH_BATCH_SIZE: int = 500
+    TASKS_FLUSH_RETRY_INTERVAL: float = 1.0
+    TASKS_FLUSH_MAX_RETRIES: int = 60
+    TASKS_RESULT_INLINE_MAX_SIZE: int = 4096
+    TASKS_RESULT_COMPRESSION_LEVEL: int = 6
+    TASKS_RESULT_GC_INTERVAL: float = 3600.0
+    TASKS_RESULT_GC_GRACE: float = 3600.0
+    TASKS_RESULT_GC_BATCH_SIZE: int = 500
+    TASKS_CANCEL_SLOTS: int = 4096
+    TASKS_CANCEL_CHECK_INTERVAL_MS: int = 5
+    TASKS_TOMBSTONE_TTL: float = 3600.0
+    TASKS_TOMBSTONE_SIZE: int = 100_000
+    TASKS_RESULT_MEMO_HANDLERS: list[str] = []
+    TASKS_RESULT_MEMO_TTL: float = 3600.0
+    TASKS_RESULT_MEMO_SIZE: int = 10_000
+
+    TASKS_PRIORITY_QUEUES: bool = False
+    TASKS_PRIORITY_WEIGHTS: dict[str, int] = {"HIGH": 6, "MEDIUM": 3, "LOW": 1}
+    TASKS_PRIORITY_AGING: float = 5.0
+    TASKS_FAIR_DISPATCH_CONCURRENCY: int = 4
+
+    TASKS_ACK_ON_COMPLETION: bool = False
+    TASKS_ACK_FLUSH_INTERVAL_MS: int = 10
+    TASKS_LEASE_TTL: float = 30.0
+    TASKS_LEASE_HEARTBEAT: float = 10.0
+    TASKS_REAPER_INTERVAL: float = 15.0
+    TASKS_REAPER_BATCH_SIZE: int = 500
+
+    METRICS_ENABLED: bool = True
+    METRICS_HOST: str = "0.0.0.0"
+    METRICS_PORT: int = 9100
+
+    TRACING_EXPORTER: str = ""
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_BUFFER_SIZE: int = 100
+    TRACING_JSONL_PATH: str = "traces.jsonl"
+    TRACING_CLOSE_TIMEOUT: float = 5.0
+
     RABBITMQ_DEFAULT_USER: str = "admin"
     RABBITMQ_DEFAULT_PASS: str = "admin"
     RABBITMQ_DEFAULT_VHOST: str = "/"
@@ -24,6 +76,10 @@ class Settings(BaseSettings):
     def get_postgres_uri_asyncpg(self):
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def get_sqlite_uri_aiosqlite(self):
+        return f"sqlite+aiosqlite:///{self.SQLITE_PATH}"
+
     @property
     def get_rabbitmq_uri(self):
         return f"amqp://{self.RABBITMQ_DEFAULT_USER}:{self.RABBITMQ_DEFAULT_PASS}@{self.RABBITMQ_HOST}:{self.RABBITMQ_PORT}/"
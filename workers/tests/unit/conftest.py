@@ -0,0 +1,42 @@
+import os
+import sys
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from repositories import TasksRepository
+
+
+@pytest.fixture
+def mock_db_session():
+    session = AsyncMock(spec=AsyncSession)
+    session.select = AsyncMock()
+    session.execute = AsyncMock()
+    session.transaction = MagicMock()
+    session.transaction.return_value.__aenter__.return_value = session
+    return session
+
+
+@pytest.fixture
+async def tasks_repository(mock_db_session):
+    repo = TasksRepository()
+    repo.db = mock_db_session
+    yield repo
+    repo.pending_updates.clear()
+    await repo.close()
+
+
+@pytest.fixture
+async def task_consumer(mock_db_session):
+    from services.consumer import TaskConsumer
+
+    consumer = TaskConsumer(queue_name="tasks", max_workers=1)
+    consumer.tasks_repository.db = mock_db_session
+    consumer.results_repository.db = mock_db_session
+    yield consumer
+    consumer.tasks_repository.pending_updates.clear()
+    await consumer.stop()
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+from aio_pika import Message
+
+from engines.memory_broker import MemoryBrokerEngine
+from engines.rabbitmq_storage import ConsumerEngine
+
+
+async def wait_until(predicate) -> None:
+    for _ in range(100):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def engine():
+    engine = ConsumerEngine()
+    engine.connector = MemoryBrokerEngine()
+    await engine.setup_queue(queue_name="task", exchange_name="tasks")
+    yield engine
+    await engine.stop_consuming()
+
+
+async def publish(engine: ConsumerEngine, body: dict) -> None:
+    async with engine.connector.channel_pool.acquire() as channel:
+        exchange = await channel.get_exchange("tasks")
+        await exchange.publish(
+            Message(body=json.dumps(body).encode()), routing_key="task"
+        )
+
+
+class TestConsumerEnginePrefetch:
+    @pytest.mark.asyncio
+    async def test_zero_prefetch_pauses_queue(self, engine):
+        received = []
+
+        async def callback(body: dict) -> None:
+            received.append(body["id"])
+
+        engine.set_callback(queue_name="task", callback=callback)
+        engine.set_prefetch("task", 0)
+        await engine.consume_multiple(["task"])
+        await wait_until(lambda: "task" in engine.channels)
+
+        await publish(engine, {"id": 1})
+        await asyncio.sleep(0.05)
+        assert received == []
+        assert "task" not in engine.consumer_tags
+
+        engine.set_prefetch("task", 1)
+        await wait_until(lambda: received)
+        assert received == [1]
+        assert engine.applied_prefetch["task"] == 1
+
+        engine.set_prefetch("task", 0)
+        await wait_until(lambda: "task" not in engine.consumer_tags)
+        await publish(engine, {"id": 2})
+        await asyncio.sleep(0.05)
+        assert received == [1]
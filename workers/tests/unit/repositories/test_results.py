@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.exc import OperationalError
+
+from repositories import TaskResultsRepository
+
+NOW = datetime(2025, 1, 1, 10, 20, 0)
+
+
+@pytest.fixture
+def results_repository(mock_db_session):
+    repo = TaskResultsRepository()
+    repo.db = mock_db_session
+    repo.inline_max_size = 4
+    return repo
+
+
+class TestTaskResultsRepository:
+    @pytest.mark.asyncio
+    async def test_store_keeps_small_result_inline(
+        self, results_repository, mock_db_session
+    ):
+        assert await results_repository.store("ok") == {
+            "result": "ok",
+            "result_size": 2,
+        }
+        mock_db_session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("result, text", [(42, "42"), ({"a": 1}, "{'a': 1}")])
+    async def test_store_stringifies_non_str_result(
+        self, results_repository, mock_db_session, result, text
+    ):
+        results_repository.inline_max_size = 100
+
+        assert await results_repository.store(result) == {
+            "result": text,
+            "result_size": len(text),
+        }
+
+    @pytest.mark.asyncio
+    async def test_store_falls_back_to_inline_text_on_error(
+        self, results_repository, mock_db_session
+    ):
+        mock_db_session.execute.side_effect = OperationalError(
+            "INSERT", {}, Exception("connection lost")
+        )
+
+        assert await results_repository.store(123456) == {
+            "result": "123456",
+            "result_size": 6,
+        }
+
+    @pytest.mark.asyncio
+    async def test_store_refreshes_existing_blob(
+        self, results_repository, mock_db_session
+    ):
+        fields = await results_repository.store("large result")
+
+        assert fields["result_size"] == len("large result")
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=asyncpg.dialect()))
+        assert "ON CONFLICT (digest) DO UPDATE SET update_date = now()" in sql
+        assert fields["result_ref"] in stmt.compile().params.values()
+
+    @pytest.mark.asyncio
+    async def test_purge_unreferenced_deletes_orphaned_blobs(
+        self, results_repository, mock_db_session
+    ):
+        mock_db_session.execute.return_value = ["a", "b"]
+
+        assert (
+            await results_repository.purge_unreferenced(older_than=NOW, limit=10) == 2
+        )
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=asyncpg.dialect()))
+        assert sql.startswith("DELETE FROM task_results")
+        assert "NOT (EXISTS (SELECT" in sql
+        assert "tasks.result_ref = task_results.digest" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
@@ -0,0 +1,145 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.exc import DataError, OperationalError
+from unittest.mock import AsyncMock
+
+from enums import StatusType
+
+NOW = datetime(2025, 1, 1, 10, 20, 0)
+
+
+class TestTasksRepository:
+    @pytest.mark.asyncio
+    async def test_schedule_update_merges_fields(self, tasks_repository):
+        tasks_repository.schedule_update(
+            1, status=StatusType.IN_PROGRESS, stared_at=NOW, worker_id="worker"
+        )
+        tasks_repository.schedule_update(
+            1, status=StatusType.COMPLETED, completed_at=NOW, unknown="skipped"
+        )
+
+        assert tasks_repository.pending_updates == {
+            1: {
+                "status": StatusType.COMPLETED,
+                "stared_at": NOW,
+                "worker_id": "worker",
+                "completed_at": NOW,
+            }
+        }
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_one_batch_update(
+        self, tasks_repository, mock_db_session
+    ):
+        tasks_repository.schedule_update(1, status=StatusType.IN_PROGRESS)
+        tasks_repository.schedule_update(
+            2, status=StatusType.COMPLETED, error_info=None
+        )
+
+        assert await tasks_repository.flush()
+
+        mock_db_session.transaction.assert_called_once()
+        mock_db_session.execute.assert_called_once()
+        stmt = mock_db_session.execute.call_args[0][0]
+        compiled = stmt.compile(dialect=asyncpg.dialect())
+        sql = str(compiled)
+        assert "FROM (VALUES" in sql
+        assert "CASE WHEN batch.error_info_set THEN" in sql
+        assert "coalesce" not in sql.lower()
+        assert [
+            value for value in compiled.params.values() if isinstance(value, bool)
+        ].count(True) == 3
+        assert tasks_repository.pending_updates == {}
+
+    @pytest.mark.asyncio
+    async def test_flush_failure_keeps_updates(self, tasks_repository, mock_db_session):
+        async def fail(*args, **kwargs):
+            tasks_repository.schedule_update(1, status=StatusType.COMPLETED)
+            raise OperationalError("UPDATE", {}, Exception("connection lost"))
+
+        listener = AsyncMock()
+        tasks_repository.add_flush_listener(listener)
+        mock_db_session.execute.side_effect = fail
+        tasks_repository.schedule_update(
+            1, status=StatusType.IN_PROGRESS, stared_at=NOW
+        )
+
+        assert not await tasks_repository.flush()
+
+        assert tasks_repository.pending_updates == {
+            1: {"status": StatusType.COMPLETED, "stared_at": NOW}
+        }
+        listener.assert_not_called()
+
+        mock_db_session.execute.side_effect = None
+        assert await tasks_repository.flush()
+        listener.assert_called_once_with(
+            {1: {"status": StatusType.COMPLETED, "stared_at": NOW}}
+        )
+
+    @pytest.mark.asyncio
+    async def test_flush_drops_only_invalid_update(
+        self, tasks_repository, mock_db_session
+    ):
+        async def execute(batch, **kwargs):
+            if any(task_id == 3 for task_id, _ in batch):
+                raise DataError("UPDATE", {}, Exception("invalid input"))
+
+        listener = AsyncMock()
+        tasks_repository.add_flush_listener(listener)
+        tasks_repository._build_batch_updates = lambda batch: [batch]
+        mock_db_session.execute.side_effect = execute
+        for task_id in range(1, 6):
+            tasks_repository.schedule_update(task_id, status=StatusType.COMPLETED)
+
+        assert await tasks_repository.flush()
+
+        assert tasks_repository.pending_updates == {}
+        assert sorted(listener.call_args[0][0]) == [1, 2, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_flush_drops_update_after_max_retries(
+        self, tasks_repository, mock_db_session
+    ):
+        tasks_repository.flush_max_retries = 2
+        mock_db_session.execute.side_effect = OperationalError(
+            "UPDATE", {}, Exception("connection lost")
+        )
+        tasks_repository.schedule_update(1, status=StatusType.COMPLETED)
+
+        assert not await tasks_repository.flush()
+        assert not await tasks_repository.flush()
+        assert 1 in tasks_repository.pending_updates
+
+        assert not await tasks_repository.flush()
+        assert tasks_repository.pending_updates == {}
+        assert tasks_repository.flush_attempts == {}
+
+    @pytest.mark.asyncio
+    async def test_extend_leases_only_owned_tasks(
+        self, tasks_repository, mock_db_session
+    ):
+        await tasks_repository.extend_leases(
+            task_ids=[1, 2], worker_id="worker", lease_expires_at=NOW
+        )
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=asyncpg.dialect()))
+        assert "tasks.worker_id = $" in sql
+        assert "tasks.status = $" in sql
+
+    @pytest.mark.asyncio
+    async def test_requeue_expired_leases_skips_locked_rows(
+        self, tasks_repository, mock_db_session
+    ):
+        mock_db_session.execute.return_value = None
+
+        assert await tasks_repository.requeue_expired_leases(now=NOW, limit=10) == []
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=asyncpg.dialect()))
+        assert "tasks.lease_expires_at < $" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "RETURNING" in sql
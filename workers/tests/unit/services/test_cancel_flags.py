@@ -0,0 +1,56 @@
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+
+from services import CancelFlags
+from services import cancel_flags as cancel_flags_module
+
+
+@pytest.fixture
+def cancel_flags():
+    flags = CancelFlags(size=2)
+    yield flags
+    flags.close()
+
+
+class TestCancelFlags:
+    def test_cancel_sets_flag_for_acquired_slot(self, cancel_flags):
+        slot = cancel_flags.acquire(task_id=1)
+
+        assert CancelFlags.is_cancelled(cancel_flags.name, slot) is False
+        assert cancel_flags.cancel(task_id=1) is True
+        assert CancelFlags.is_cancelled(cancel_flags.name, slot) is True
+
+    def test_cancel_unknown_task(self, cancel_flags):
+        assert cancel_flags.cancel(task_id=1) is False
+
+    def test_released_slot_is_reset_on_acquire(self, cancel_flags):
+        slot = cancel_flags.acquire(task_id=1)
+        cancel_flags.cancel(task_id=1)
+        cancel_flags.release(task_id=1)
+
+        assert cancel_flags.acquire(task_id=2) == slot
+        assert CancelFlags.is_cancelled(cancel_flags.name, slot) is False
+
+    def test_acquire_without_free_slots(self, cancel_flags):
+        cancel_flags.acquire(task_id=1)
+        cancel_flags.acquire(task_id=2)
+
+        with pytest.raises(RuntimeError):
+            cancel_flags.acquire(task_id=3)
+
+    @pytest.mark.skipif(
+        sys.version_info < (3, 13), reason="track появился в Python 3.13"
+    )
+    def test_is_cancelled_attaches_without_tracking(self):
+        shm = MagicMock()
+        shm.buf = bytearray(1)
+        with (
+            patch.object(cancel_flags_module, "_attached", {}),
+            patch.object(
+                cancel_flags_module, "SharedMemory", return_value=shm
+            ) as shared_memory,
+        ):
+            assert CancelFlags.is_cancelled("psm_test", 0) is False
+
+        shared_memory.assert_called_once_with(name="psm_test", track=False)
@@ -0,0 +1,227 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from enums import ExchangeType, ExecutionMode, PriorityType, StatusType
+from models import TasksDB
+from services.handlers import HandlerRegistry
+from settings import settings
+
+NOW = datetime(2025, 1, 1, 10, 20, 0)
+
+
+@pytest.fixture
+def registry():
+    registry = HandlerRegistry(default="echo", priority_defaults={"HIGH": "blocking"})
+
+    @registry.register("echo", ExecutionMode.ASYNC)
+    async def echo(task: dict) -> str:
+        return "echo"
+
+    @registry.register("blocking", ExecutionMode.THREAD)
+    def blocking(task: dict, is_cancelled) -> str:
+        return "blocking"
+
+    with patch("services.consumer.handlers", registry):
+        yield registry
+
+
+class TestTaskConsumerLeases:
+    @pytest.mark.asyncio
+    async def test_requeue_expired_tasks_republishes_tasks(
+        self, task_consumer, mock_db_session
+    ):
+        task = MagicMock(spec=TasksDB)
+        task.id = 1
+        task.name = "echo"
+        task.description = None
+        task.priority = PriorityType.HIGH
+        task.created_at = NOW
+        mock_db_session.execute.return_value = [task]
+
+        with patch("services.consumer.producer.publish", AsyncMock()) as publish:
+            assert await task_consumer.requeue_expired_tasks() == 1
+
+        task_publish, events_publish = publish.call_args_list
+        assert task_publish.kwargs["exchange"] == ExchangeType.TASKS
+        assert task_publish.kwargs["body"]["id"] == 1
+        assert events_publish.kwargs["body"] == {
+            "events": [{"id": 1, "status": StatusType.PENDING}]
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("ack_on_completion", [False, True])
+    async def test_start_runs_reaper_without_ack_on_completion(
+        self, task_consumer, ack_on_completion
+    ):
+        with patch.object(settings, "TASKS_ACK_ON_COMPLETION", ack_on_completion):
+            await task_consumer.start()
+
+        assert (task_consumer._reaper_task is None) is ack_on_completion
+        assert task_consumer._lease_task is not None
+
+    @pytest.mark.asyncio
+    async def test_process_message_takes_lease(self, task_consumer, registry):
+        completion = await task_consumer.process_message({"id": 1, "name": "echo"})
+
+        fields = task_consumer.tasks_repository.pending_updates[1]
+        assert fields["status"] == StatusType.IN_PROGRESS
+        assert fields["worker_id"] == task_consumer.worker_id
+        assert fields["lease_expires_at"] == (
+            fields["stared_at"] + task_consumer.lease_ttl
+        )
+
+        await asyncio.wait_for(completion, timeout=1.0)
+        assert (
+            task_consumer.tasks_repository.pending_updates[1]["status"]
+            == StatusType.COMPLETED
+        )
+        assert task_consumer.credits.in_use[ExecutionMode.ASYNC] == 0
+
+    @pytest.mark.asyncio
+    async def test_process_message_tracks_dispatched_task_on_error(
+        self, task_consumer, registry
+    ):
+        with (
+            patch.object(
+                task_consumer, "_observe_start", side_effect=ValueError("boom")
+            ),
+            pytest.raises(ValueError),
+        ):
+            await task_consumer.process_message({"id": 1, "name": "echo"})
+
+        await asyncio.wait_for(task_consumer.completions[1], timeout=1.0)
+        assert (
+            task_consumer.tasks_repository.pending_updates[1]["status"]
+            == StatusType.COMPLETED
+        )
+        assert task_consumer.credits.in_use[ExecutionMode.ASYNC] == 0
+
+
+class TestTaskConsumerThreadTier:
+    @pytest.mark.asyncio
+    async def test_stats_report_every_tier(self, task_consumer):
+        assert task_consumer.stats() == {
+            "async": {
+                "capacity": task_consumer.credits.capacity[ExecutionMode.ASYNC],
+                "in_use": 0,
+                "waiting": 0,
+            },
+            "thread": {
+                "capacity": task_consumer.credits.capacity[ExecutionMode.THREAD],
+                "in_use": 0,
+                "waiting": 0,
+            },
+            "process": {"capacity": 1, "in_use": 0, "waiting": 0},
+        }
+
+    @pytest.mark.asyncio
+    async def test_thread_handler_runs_in_thread_pool(self, task_consumer, registry):
+        completion = await task_consumer.process_message({"id": 1, "name": "blocking"})
+
+        assert task_consumer.credits.in_use[ExecutionMode.THREAD] == 1
+        await asyncio.wait_for(completion, timeout=1.0)
+        assert task_consumer.tasks_repository.pending_updates[1]["status"] == (
+            StatusType.COMPLETED
+        )
+        assert task_consumer.credits.in_use[ExecutionMode.THREAD] == 0
+        assert task_consumer.cancel_flags.slots == {}
+
+
+class TestTaskConsumerHandlers:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "priority, mode",
+        [
+            (PriorityType.LOW, ExecutionMode.ASYNC),
+            (PriorityType.MEDIUM, ExecutionMode.ASYNC),
+            (PriorityType.HIGH, ExecutionMode.THREAD),
+        ],
+    )
+    async def test_unregistered_task_dispatched_by_priority(
+        self, task_consumer, registry, priority, mode
+    ):
+        completion = await task_consumer.process_message(
+            {"id": 1, "name": "unknown", "priority": priority}
+        )
+
+        assert task_consumer.credits.in_use[mode] == 1
+        await asyncio.wait_for(completion, timeout=1.0)
+        assert task_consumer.credits.in_use[mode] == 0
+
+    @pytest.mark.asyncio
+    async def test_non_str_result_is_stored_as_text(self, task_consumer, registry):
+        @registry.register("number", ExecutionMode.ASYNC)
+        async def number(task: dict) -> int:
+            return 42
+
+        completion = await task_consumer.process_message({"id": 1, "name": "number"})
+        await asyncio.wait_for(completion, timeout=1.0)
+
+        fields = task_consumer.tasks_repository.pending_updates[1]
+        assert fields["status"] == StatusType.COMPLETED
+        assert fields["result"] == "42"
+
+
+class TestTaskConsumerMetrics:
+    @pytest.mark.asyncio
+    async def test_invalid_created_at_does_not_fail_task(self, task_consumer, registry):
+        completion = await task_consumer.process_message(
+            {"id": 1, "name": "echo", "created_at": "not a date"}
+        )
+
+        assert task_consumer.tasks_repository.pending_updates[1]["status"] == (
+            StatusType.IN_PROGRESS
+        )
+        await asyncio.wait_for(completion, timeout=1.0)
+        assert task_consumer.tasks_repository.pending_updates[1]["status"] == (
+            StatusType.COMPLETED
+        )
+
+
+class TestTaskConsumerResultsGc:
+    @pytest.mark.asyncio
+    async def test_purge_unreferenced_results_runs_in_batches(self, task_consumer):
+        task_consumer.results_repository.purge_unreferenced = AsyncMock(
+            side_effect=[2, 1]
+        )
+
+        with patch.object(settings, "TASKS_RESULT_GC_BATCH_SIZE", 2):
+            assert await task_consumer.purge_unreferenced_results() == 3
+
+        assert task_consumer.results_repository.purge_unreferenced.await_count == 2
+
+
+class TestTaskConsumerResultMemo:
+    @pytest.mark.asyncio
+    async def test_memo_hit_skips_executor(self, task_consumer, registry):
+        message = {"id": 2, "name": "echo", "description": "hello"}
+        task_consumer.result_memo.handlers = {"echo"}
+        key = task_consumer.result_memo.key("echo", message)
+        task_consumer.result_memo.put(key, {"result": "echo", "result_size": 4})
+        dispatch = MagicMock()
+        task_consumer.dispatchers = dict.fromkeys(task_consumer.dispatchers, dispatch)
+
+        assert await task_consumer.process_message(message) is None
+
+        dispatch.assert_not_called()
+        assert task_consumer.credits.used == 0
+        fields = task_consumer.tasks_repository.pending_updates[2]
+        assert fields["status"] == StatusType.COMPLETED
+        assert fields["result"] == "echo"
+
+    @pytest.mark.asyncio
+    async def test_memo_miss_stores_completed_result(self, task_consumer, registry):
+        message = {"id": 3, "name": "echo", "description": "hello"}
+        task_consumer.result_memo.handlers = {"echo"}
+
+        completion = await task_consumer.process_message(message)
+        await asyncio.wait_for(completion, timeout=1.0)
+
+        key = task_consumer.result_memo.key("echo", message)
+        assert task_consumer.result_memo.get(key) == {
+            "result": "echo",
+            "result_size": 4,
+        }
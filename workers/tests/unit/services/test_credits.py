@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from enums import ExecutionMode
+from services import TierCredits
+
+
+@pytest.fixture
+def credits():
+    return TierCredits(
+        capacity={
+            ExecutionMode.ASYNC: 3,
+            ExecutionMode.THREAD: 2,
+            ExecutionMode.PROCESS: 1,
+        }
+    )
+
+
+class TestTierCredits:
+    @pytest.mark.asyncio
+    async def test_free_sums_every_tier(self, credits):
+        assert credits.free == 6
+
+        await credits.acquire(ExecutionMode.PROCESS)
+
+        assert credits.free == 5
+        assert credits.used == 1
+
+    @pytest.mark.asyncio
+    async def test_saturated_tier_does_not_block_others(self, credits):
+        await credits.acquire(ExecutionMode.PROCESS)
+        waiter = asyncio.create_task(credits.acquire(ExecutionMode.PROCESS))
+        await asyncio.sleep(0)
+
+        await asyncio.wait_for(credits.acquire(ExecutionMode.ASYNC), timeout=1.0)
+
+        assert not waiter.done()
+        assert credits.free == 4
+        waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_release(self, credits):
+        await credits.acquire(ExecutionMode.THREAD)
+        await credits.acquire(ExecutionMode.THREAD)
+
+        waiter = asyncio.create_task(credits.acquire(ExecutionMode.THREAD))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert credits.snapshot()[ExecutionMode.THREAD] == {
+            "capacity": 2,
+            "in_use": 2,
+            "waiting": 1,
+        }
+
+        await credits.release(ExecutionMode.THREAD)
+        await asyncio.wait_for(waiter, timeout=1.0)
+        assert credits.snapshot()[ExecutionMode.THREAD] == {
+            "capacity": 2,
+            "in_use": 2,
+            "waiting": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_listeners_receive_free_credits(self, credits):
+        free = []
+        credits.add_listener(free.append)
+
+        await credits.acquire(ExecutionMode.PROCESS)
+        await credits.release(ExecutionMode.PROCESS)
+
+        assert free == [6, 5, 6]
@@ -0,0 +1,78 @@
+import pytest
+
+from enums import ExecutionMode
+from services.handlers import (
+    HandlerRegistry,
+    TaskCancelledError,
+    handlers,
+    sleep_cancellable,
+)
+from settings import settings
+
+
+@pytest.fixture
+def registry():
+    registry = HandlerRegistry(default="fetch", priority_defaults={"HIGH": "crunch"})
+
+    @registry.register("crunch", ExecutionMode.PROCESS)
+    def crunch(task: dict, is_cancelled) -> str:
+        return "crunch"
+
+    @registry.register("fetch", ExecutionMode.ASYNC)
+    async def fetch(task: dict) -> str:
+        return "fetch"
+
+    return registry
+
+
+class TestHandlerRegistry:
+    def test_get_registered_handler(self, registry):
+        handler = registry.get("fetch")
+
+        assert handler.name == "fetch"
+        assert handler.mode == ExecutionMode.ASYNC
+
+    @pytest.mark.parametrize("name", [None, "unknown"])
+    @pytest.mark.parametrize("priority", [None, "LOW", "MEDIUM"])
+    def test_get_falls_back_to_default(self, registry, name, priority):
+        assert registry.get(name, priority).name == "fetch"
+
+    def test_get_falls_back_to_priority_default(self, registry):
+        assert registry.get("unknown", "HIGH").name == "crunch"
+        assert registry.get("fetch", "HIGH").name == "fetch"
+
+    def test_register_rejects_sync_async_handler(self, registry):
+        with pytest.raises(ValueError):
+
+            @registry.register("sync", ExecutionMode.ASYNC)
+            def sync(task: dict) -> str:
+                return "sync"
+
+    def test_register_rejects_coroutine_process_handler(self, registry):
+        with pytest.raises(ValueError):
+
+            @registry.register("coroutine", ExecutionMode.PROCESS)
+            async def coroutine(task: dict) -> str:
+                return "coroutine"
+
+    @pytest.mark.parametrize("priority", ["LOW", "MEDIUM"])
+    def test_default_handler_runs_inline_async(self, priority):
+        handler = handlers.get("unknown", priority)
+
+        assert handler.name == settings.TASKS_DEFAULT_HANDLER
+        assert handler.mode == ExecutionMode.ASYNC
+
+    def test_high_priority_default_handler_runs_in_process_pool(self):
+        handler = handlers.get("unknown", "HIGH")
+
+        assert handler.name == settings.TASKS_PRIORITY_HANDLERS["HIGH"]
+        assert handler.mode == ExecutionMode.PROCESS
+
+
+class TestSleepCancellable:
+    def test_raises_when_cancelled(self):
+        with pytest.raises(TaskCancelledError):
+            sleep_cancellable(10.0, lambda: True)
+
+    def test_returns_when_not_cancelled(self):
+        sleep_cancellable(0.0, lambda: False)
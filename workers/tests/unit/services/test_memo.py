@@ -0,0 +1,40 @@
+from unittest.mock import patch
+
+from services import ResultMemo
+
+
+class TestResultMemo:
+    def test_key_only_for_memoized_handlers(self):
+        memo = ResultMemo(handlers=["echo"], ttl=60.0, size=10)
+        task = {"id": 1, "name": "echo", "description": "hello"}
+
+        assert memo.key("other", task) is None
+        assert memo.key("echo", task) == memo.key("echo", {**task, "id": 2})
+        assert memo.key("echo", task) != memo.key(
+            "echo", {**task, "description": "bye"}
+        )
+
+    def test_entries_expire_after_ttl(self):
+        memo = ResultMemo(handlers=["echo"], ttl=60.0, size=10)
+
+        with patch("services.memo.time.monotonic", return_value=100.0):
+            memo.put("key", {"result": "ok"})
+        with patch("services.memo.time.monotonic", return_value=159.0):
+            assert memo.get("key") == {"result": "ok"}
+        with patch("services.memo.time.monotonic", return_value=160.0):
+            assert memo.get("key") is None
+
+        assert len(memo) == 0
+
+    def test_size_cap_evicts_oldest_entries(self):
+        memo = ResultMemo(handlers=["echo"], ttl=60.0, size=2)
+
+        memo.put("first", {"result": "1"})
+        memo.put("second", {"result": "2"})
+        memo.put("first", {"result": "1"})
+        memo.put("third", {"result": "3"})
+
+        assert len(memo) == 2
+        assert memo.get("second") is None
+        assert memo.get("first") == {"result": "1"}
+        assert memo.get("third") == {"result": "3"}
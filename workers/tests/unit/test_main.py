@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import patch
+
+from main import WorkerApplication
+
+WEIGHTS = {"task": 1, "high": 6, "medium": 3, "low": 1}
+
+
+class TestWorkerApplication:
+    @pytest.mark.parametrize(
+        "prefetch_count, expected",
+        [
+            (10, {"task": 1, "high": 5, "medium": 3, "low": 1}),
+            (11, {"task": 1, "high": 6, "medium": 3, "low": 1}),
+            (22, {"task": 2, "high": 12, "medium": 6, "low": 2}),
+        ],
+    )
+    def test_set_prefetch_splits_credits_by_weight(self, prefetch_count, expected):
+        with patch("main.consumer") as consumer:
+            WorkerApplication._set_prefetch(WEIGHTS, prefetch_count)
+
+        assert {
+            call.args[0]: call.args[1] for call in consumer.set_prefetch.call_args_list
+        } == expected
+
+    @pytest.mark.parametrize(
+        "prefetch_count, expected",
+        [
+            (0, {"task": 0, "high": 0, "medium": 0, "low": 0}),
+            (1, {"task": 0, "high": 1, "medium": 0, "low": 0}),
+            (2, {"task": 0, "high": 1, "medium": 1, "low": 0}),
+            (3, {"task": 0, "high": 2, "medium": 1, "low": 0}),
+        ],
+    )
+    def test_set_prefetch_smaller_than_queues(self, prefetch_count, expected):
+        with patch("main.consumer") as consumer:
+            WorkerApplication._set_prefetch(WEIGHTS, prefetch_count)
+
+        assert {
+            call.args[0]: call.args[1] for call in consumer.set_prefetch.call_args_list
+        } == expected
+
+    def test_set_prefetch_single_queue(self):
+        with patch("main.consumer") as consumer:
+            WorkerApplication._set_prefetch({"task": 1}, 7)
+
+        consumer.set_prefetch.assert_called_once_with("task", 7)